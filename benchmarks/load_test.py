@@ -0,0 +1,103 @@
+"""آزمون بار سرویس تایید لایسنس
+
+    python -m license_core serve &
+    python benchmarks/load_test.py --connections 50 --duration 10
+
+جفت‌های معتبر از همان ذخیره‌ساز خوانده و با درصد مشخصی جفت نامعتبر ترکیب می‌شوند.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from license_core import create_store
+from license_core.server import DEFAULT_HOST, DEFAULT_PORT
+
+SAMPLE_SIZE = 10000
+
+
+def load_pairs(data_dir, invalid_ratio, seed=302):
+    """نمونه‌ی جفت‌های (hardware_id, access_code) برای درخواست‌ها"""
+    customers, _ = create_store(data_dir).read()
+    rng = random.Random(seed)
+    pairs = [(customer["hardware_id"], customer["access_code"]) for customer in customers]
+    if len(pairs) > SAMPLE_SIZE:
+        pairs = rng.sample(pairs, SAMPLE_SIZE)
+    invalid = max(int(len(pairs) * invalid_ratio), 1 if not pairs else 0)
+    pairs += [(f"{rng.getrandbits(64):016X}", "0000-0000-0000") for _ in range(invalid)]
+    rng.shuffle(pairs)
+    return pairs
+
+
+async def worker(host, port, pairs, deadline, latencies, counters):
+    reader, writer = await asyncio.open_connection(host, port)
+    index = random.randrange(len(pairs))
+    try:
+        while time.perf_counter() < deadline:
+            hardware_id, access_code = pairs[index % len(pairs)]
+            index += 1
+            request = (f"GET /verify?hardware_id={hardware_id}&access_code={access_code} HTTP/1.1\r\n"
+                       f"Host: {host}\r\n\r\n").encode("latin-1")
+            started = time.perf_counter()
+            writer.write(request)
+            status_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            body = await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+            if not status_line.startswith(b"HTTP/1.1 200"):
+                counters["errors"] += 1
+            elif b'"valid": true' in body:
+                counters["valid"] += 1
+            else:
+                counters["invalid"] += 1
+    finally:
+        writer.close()
+
+
+async def run(args):
+    pairs = load_pairs(args.data_dir, args.invalid_ratio)
+    latencies = []
+    counters = {"valid": 0, "invalid": 0, "errors": 0}
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(worker(args.host, args.port, pairs, deadline, latencies, counters)
+                           for _ in range(args.connections)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    count = len(latencies)
+    print(f"requests     {count}")
+    print(f"elapsed      {elapsed:.2f} s")
+    print(f"throughput   {count / elapsed:,.0f} req/s")
+    if count:
+        print(f"latency p50  {statistics.median(latencies) * 1000:.2f} ms")
+        print(f"latency p99  {latencies[min(int(count * 0.99), count - 1)] * 1000:.2f} ms")
+        print(f"latency max  {latencies[-1] * 1000:.2f} ms")
+    print(f"valid {counters['valid']}  invalid {counters['invalid']}  errors {counters['errors']}")
+    return 1 if counters["errors"] else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test for the license verification service")
+    parser.add_argument("--data-dir", default="license_data", help="store to sample hardware IDs from")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--connections", type=int, default=50, help="concurrent keep-alive connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--invalid-ratio", type=float, default=0.1, help="share of requests with bad codes")
+    return asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
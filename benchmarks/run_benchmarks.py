@@ -0,0 +1,465 @@
+"""بنچمارک مسیرهای پرکاربرد مدیر لایسنس با داده‌ی مصنوعی
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 1000,100000 --output baseline.json
+    python benchmarks/run_benchmarks.py --compare baseline.json --threshold 0.2
+    python benchmarks/run_benchmarks.py --no-gui
+
+نتایج به صورت JSON نوشته می‌شوند. با --compare هر مورد کندتر از آستانه گزارش و کد خروج 1 برگردانده می‌شود.
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from license_core import (
+    BACKENDS, EXPORTERS, CustomerCollection, CustomerStats, create_store, export_customers, format_jalali,
+    generate_access_code, import_customers, jalali_month_range, validate_hardware_id,
+)
+
+DEFAULT_SIZES = (1000, 100000, 1000000)
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.2
+MICRO_SAMPLE = 20000
+RESHAPE_SAMPLE = 2000
+DIALOG_SAMPLE = 200
+TEXTURE_SAMPLE = 200
+SEED = 302
+# زمان ایجاد نخستین مشتری مصنوعی (1399/06/23)؛ هر مشتری بعدی تا پنج دقیقه بعد ساخته می‌شود
+START_TIME = 1600000000
+
+FIRST_NAMES = ("علی", "محمد", "زهرا", "فاطمه", "رضا", "مریم", "حسین", "سارا", "مهدی", "نرگس")
+COMPANY_WORDS = ("شرکت", "صنایع", "آزمایشگاه", "مهندسی", "فولاد", "سیمان", "بتن", "خاک")
+
+
+# ==================== داده‌ی مصنوعی ====================
+def synthetic_customers(count, seed=SEED):
+    """تولید رکوردهای مشتری قطعی و یکتا؛ کد دسترسی برای سرعت با md5 شبیه‌سازی می‌شود"""
+    rng = random.Random(seed)
+    created_at = START_TIME
+    for i in range(count):
+        created_at += rng.randrange(1, 300)
+        hardware_id = f"{rng.getrandbits(32):08X}{i:08X}"
+        digest = hashlib.md5(hardware_id.encode()).hexdigest().upper()
+        yield {
+            "name": f"{rng.choice(COMPANY_WORDS)} {rng.choice(FIRST_NAMES)} {i}",
+            "phone": f"09{rng.randrange(10 ** 9):09d}",
+            "hardware_id": hardware_id,
+            "access_code": f"{digest[0:4]}-{digest[4:8]}-{digest[8:12]}",
+            "created_at": created_at,
+        }
+
+
+# ==================== اندازه‌گیری ====================
+def measure(func, repeat=DEFAULT_REPEAT, ops=1):
+    """اجرای func به تعداد repeat و برگرداندن خلاصه‌ی زمان‌ها؛ ops تعداد عملیات هر اجراست"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    median = statistics.median(timings)
+    result = {
+        "runs": repeat,
+        "ops": ops,
+        "min": min(timings),
+        "median": median,
+        "max": max(timings),
+    }
+    if ops > 1:
+        result["ops_per_second"] = ops / median if median else None
+    return result
+
+
+def report(results, name, result):
+    results[name] = result
+    line = f"{name:<40} median {result['median'] * 1000:>10.2f} ms"
+    if "ops_per_second" in result:
+        line += f"  {result['ops_per_second']:>12,.0f} ops/s"
+    print(line, flush=True)
+
+
+# ==================== هسته ====================
+def bench_micro(results, repeat):
+    """توابع تک‌رکوردی؛ مستقل از اندازه‌ی داده"""
+    hardware_ids = [customer["hardware_id"] for customer in synthetic_customers(MICRO_SAMPLE)]
+
+    def generate_all():
+        for hardware_id in hardware_ids:
+            generate_access_code(hardware_id)
+
+    def validate_all():
+        for hardware_id in hardware_ids:
+            validate_hardware_id(hardware_id)
+
+    report(results, "generate_access_code", measure(generate_all, repeat, len(hardware_ids)))
+    report(results, "validate_hardware_id", measure(validate_all, repeat, len(hardware_ids)))
+
+
+def bench_store(results, customers, repeat, work_dir, backend):
+    """نوشتن ژورنال، فشرده‌سازی به اسنپ‌شات و بارگذاری"""
+    size = len(customers)
+    data_dir = os.path.join(work_dir, f"store_{size}")
+    store = create_store(data_dir, backend)
+    store.load()
+
+    def add_many():
+        store.add_many(customers)
+        store.flush()
+
+    report(results, f"journal_add_many[{size}]", measure(add_many, repeat, size))
+    report(results, f"save_customers[{size}]", measure(lambda: store.compact(wait=True), repeat, size))
+    store.close()
+
+    # هر ذخیره‌ساز رشته‌ی کارگر خود را دارد؛ بستن آن خارج از زمان‌سنجی انجام می‌شود
+    loaded = []
+
+    def load_and_keep():
+        loaded_store = create_store(data_dir, backend)
+        loaded_store.load()
+        loaded.append(loaded_store)
+
+    report(results, f"load_customers[{size}]", measure(load_and_keep, repeat, size))
+    for loaded_store in loaded:
+        loaded_store.close()
+    return data_dir
+
+
+def bench_import(results, customers, repeat, work_dir, backend):
+    """ورود customers.json دفتر دیگر به ذخیره‌ساز خالی و ورود دوباره‌ی همان فایل (همه بدون تغییر)"""
+    size = len(customers)
+    source = os.path.join(work_dir, f"office_{size}.json")
+    # کدهای دسترسی مصنوعی معتبر نیستند؛ ورود آنها را از شناسه می‌سازد
+    rows = [{key: customer[key] for key in ("name", "phone", "hardware_id", "created_at")} for customer in customers]
+    with open(source, 'w', encoding='utf-8') as f:
+        json.dump({"format": 1, "seq": size, "customers": rows}, f, ensure_ascii=False)
+    del rows
+    runs = []
+
+    def import_into_new_store():
+        store = create_store(os.path.join(work_dir, f"import_{size}_{len(runs)}"), backend)
+        store.load()
+        runs.append(store)
+        import_customers(source, store.customers, store.add_many)
+        store.flush()
+
+    report(results, f"import_customers[{size}]", measure(import_into_new_store, repeat, size))
+    store = runs[-1]
+    report(results, f"import_customers[unchanged][{size}]",
+           measure(lambda: import_customers(source, store.customers, store.add_many), repeat, size))
+    for store in runs:
+        store.close()
+    os.remove(source)
+
+
+def bench_dates(results, customers, repeat):
+    """مشتریان یک ماه: تجزیه‌ی تاریخ شمسی متنی همه‌ی رکوردها با jdatetime در برابر نمایه‌ی مرتب تاریخ"""
+    import jdatetime
+
+    size = len(customers)
+    texts = [format_jalali(customer["created_at"]) for customer in customers]
+    year, month = (int(part) for part in texts[size // 2].split("/")[:2])
+    start, end = jalali_month_range(year, month)
+    first, following = (jdatetime.datetime.fromtimestamp(bound) for bound in (start, end))
+
+    def scan():
+        return [text for text in texts if first <= jdatetime.datetime.strptime(text, "%Y/%m/%d %H:%M:%S") < following]
+
+    collection = CustomerCollection(customers)
+    collection.created_between(start, end)
+    report(results, f"month_scan_jdatetime[{size}]", measure(scan, 1, size))
+    report(results, f"created_between[{size}]", measure(lambda: collection.created_between(start, end), repeat))
+
+
+def bench_stats(results, customers, repeat):
+    """آمار داشبورد: شمارش دوباره‌ی همه‌ی مشتریان در برابر پرس‌وجوی شمارنده‌های افزایشی"""
+    size = len(customers)
+    stats = CustomerStats(customers)
+
+    def dashboard():
+        return (stats.total, stats.day_count(), stats.month_count(), stats.recent_months(6), stats.top_names(6))
+
+    report(results, f"stats_recount[{size}]", measure(lambda: CustomerStats(customers), 1, size))
+    report(results, f"stats_dashboard[{size}]", measure(dashboard, repeat))
+
+
+def bench_memory(memory, size):
+    """حافظه‌ی مجموعه‌ی مشتریان با دیکشنری و با CustomerRecord فشرده"""
+    for label, compact in (("dict", False), ("compact", True)):
+        tracemalloc.start()
+        collection = CustomerCollection(synthetic_customers(size), compact=compact)
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del collection
+        name = f"customers[{label}][{size}]"
+        memory[name] = {"bytes": used, "bytes_per_record": used / size if size else 0}
+        print(f"{name:<40} {used / 2 ** 20:>10.1f} MB  {used / max(size, 1):>8.0f} B/record", flush=True)
+
+
+def bench_export(results, customers, repeat, work_dir, formats):
+    size = len(customers)
+    for fmt in formats:
+        filepath = os.path.join(work_dir, f"export_{size}.{EXPORTERS[fmt].extension}")
+        report(results, f"export_customers[{fmt}][{size}]",
+               measure(lambda: export_customers(customers, filepath, fmt), repeat, size))
+        os.remove(filepath)
+
+
+# ==================== رابط کاربری ====================
+def import_gui(work_dir):
+    """بارگذاری main.py بدون پنجره‌ی قابل مشاهده؛ در نبود Kivy None برمی‌گردد"""
+    os.environ.setdefault("KIVY_NO_ARGS", "1")
+    os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+    os.environ.setdefault("LICENSE_MANAGER_LOG_LEVEL", "WARNING")
+    previous_dir = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        import main
+    except Exception as e:
+        print(f"skipping GUI benchmarks: {e}", file=sys.stderr)
+        return None
+    finally:
+        os.chdir(previous_dir)
+    return main
+
+
+def bench_reshape(results, main, repeat):
+    texts = [customer["name"] for customer in synthetic_customers(RESHAPE_SAMPLE)]
+
+    def cold():
+        cache = main.ReshapeCache(maxsize=len(texts))
+        for text in texts:
+            cache.get(text)
+
+    def warm():
+        for text in texts:
+            main.reshape_bidi(text)
+
+    report(results, "reshape_bidi[cold]", measure(cold, repeat, len(texts)))
+    warm()
+    report(results, "reshape_bidi[warm]", measure(warm, repeat, len(texts)))
+
+
+def bench_textures(results, main, repeat):
+    """رندر متن یک ردیف لیست با کش تکسچر خالی و با کش گرم"""
+    texts = [customer["name"] for customer in synthetic_customers(TEXTURE_SAMPLE)]
+    label = main.PersianLabel(text="", font_size=14, size=(400, 25))
+
+    def render():
+        for text in texts:
+            label.text = text
+            label.texture_update()
+
+    def cold():
+        main.texture_cache = main.TextureCache()
+        render()
+
+    report(results, "text_texture[cold]", measure(cold, repeat, len(texts)))
+    report(results, "text_texture[warm]", measure(render, repeat, len(texts)))
+
+
+def bench_dialogs(results, main, repeat):
+    """باز و بسته کردن پیام و تایید حذف از استخر پاپ‌آپ‌ها"""
+    main.dialogs.prewarm()
+    names = [customer["name"] for customer in synthetic_customers(DIALOG_SAMPLE)]
+
+    def close_all(cls):
+        for dialog in main.dialogs._pools[cls]:
+            dialog.dismiss(animation=False)
+
+    def messages():
+        for name in names:
+            main.dialogs.message("موفق", f"مشتری '{name}' با موفقیت حذف شد")
+            close_all(main.MessageDialog)
+
+    def confirms():
+        for name in names:
+            main.dialogs.confirm("تایید حذف", f"آیا از حذف مشتری '{name}' مطمئن هستید؟", None, "حذف")
+            close_all(main.ConfirmDialog)
+
+    report(results, "dialog_message", measure(messages, repeat, len(names)))
+    report(results, "dialog_confirm", measure(confirms, repeat, len(names)))
+
+
+def bench_refresh(results, main, data_dir, size, repeat, backend):
+    """نمایش لیست از ابتدا (همه‌ی مشتریان یا صفحه‌ی اول در حالت صفحه‌ای) همراه با یک فریم چیدمان RecycleView"""
+    from kivy.clock import Clock
+
+    screen = main.MainScreen()
+    try:
+        screen.store.close()
+        screen.store = create_store(data_dir, backend)
+        screen.customers = getattr(screen.store, "open", screen.store.load)()
+        screen.paged = hasattr(screen.customers, "page")
+
+        def refresh():
+            # لیست خالی می‌شود تا حالت همگام با مجموعه هم هر بار از نو ساخته شود
+            screen.customer_list.set_customers(())
+            screen.refresh_customers_list()
+            while screen.customer_list._loading:
+                Clock.tick()
+            Clock.tick()
+
+        report(results, f"refresh_customers_list[{size}]", measure(refresh, repeat, size))
+    finally:
+        screen.store.close()
+
+
+# ==================== بررسی درستی ====================
+def check_form_search(main, work_dir, backend):
+    """مشتری ساخته‌شده با فرم (تایپ حرف‌به‌حرف در کادر فارسی) باید با نامش در جستجو پیدا شود؛ پیام‌های خطا برگردانده می‌شوند"""
+    from kivy.clock import Clock
+
+    def settle(seconds):
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            Clock.tick()
+
+    check_dir = os.path.join(work_dir, f"form_check_{backend}")
+    os.makedirs(check_dir, exist_ok=True)
+    previous_dir = os.getcwd()
+    previous_backend = os.environ.get("LICENSE_MANAGER_BACKEND")
+    os.chdir(check_dir)
+    os.environ["LICENSE_MANAGER_BACKEND"] = backend
+    errors = []
+    try:
+        screen = main.MainScreen()
+        try:
+            for widget, text in ((screen.buyer_name, "علی رضایی"), (screen.phone, "09121234567"),
+                                 (screen.hardware_id, "0123456789ABCDEF")):
+                for char in text:
+                    widget.insert_text(char)
+                    settle(main.PersianTextInput.RESHAPE_DELAY * 1.5)
+            screen.generate_license(None)
+            settle(0.5)
+            for query in ("علی", "علي", "رضایی", "0912"):
+                screen.search_input.text = query
+                settle(main.SEARCH_DELAY * 2)
+                if not screen.customer_list.data:
+                    errors.append(f"customer created through the form not found by {query!r} ({backend})")
+        finally:
+            screen.store.close()
+    finally:
+        os.chdir(previous_dir)
+        if previous_backend is None:
+            os.environ.pop("LICENSE_MANAGER_BACKEND", None)
+        else:
+            os.environ["LICENSE_MANAGER_BACKEND"] = previous_backend
+    return errors
+
+
+# ==================== مقایسه ====================
+def compare(results, baseline, threshold):
+    """مقایسه‌ی میانه‌ها با خط مبنا؛ فهرست موارد کندشده برگردانده می‌شود"""
+    regressions = []
+    print(f"\n{'benchmark':<40} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None or not base.get("median"):
+            print(f"{name:<40} {'-':>12} {result['median'] * 1000:>10.2f}ms {'new':>9}")
+            continue
+        change = result["median"] / base["median"] - 1
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"{name:<40} {base['median'] * 1000:>10.2f}ms {result['median'] * 1000:>10.2f}ms {change:>+8.1%}{flag}")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def parse_sizes(value):
+    return [int(size) for size in value.split(",") if size.strip()]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="License manager benchmarks")
+    parser.add_argument("--sizes", type=parse_sizes, default=list(DEFAULT_SIZES),
+                        help="comma separated customer counts (default 1000,100000,1000000)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="runs per benchmark")
+    parser.add_argument("--formats", default=",".join(EXPORTERS), help="export formats to measure")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="json", help="customer store to measure")
+    parser.add_argument("--no-gui", action="store_true", help="skip benchmarks that need Kivy")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc memory measurement")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON results file")
+    parser.add_argument("--compare", metavar="BASELINE", help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before a benchmark counts as a regression (0.2 = 20%%)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    formats = [fmt for fmt in args.formats.split(",") if fmt]
+    results = {}
+    memory = {}
+    errors = []
+    with tempfile.TemporaryDirectory(prefix="license_bench_") as work_dir:
+        gui = None if args.no_gui else import_gui(work_dir)
+        bench_micro(results, args.repeat)
+        if gui is not None:
+            bench_reshape(results, gui, args.repeat)
+            bench_dialogs(results, gui, args.repeat)
+            bench_textures(results, gui, args.repeat)
+            errors.extend(check_form_search(gui, work_dir, args.backend))
+        for size in args.sizes:
+            customers = list(synthetic_customers(size))
+            # یک میلیون رکورد چند ثانیه برای هر اجرا لازم دارد؛ یک اجرا کافی است
+            repeat = args.repeat if size < 1000000 else 1
+            data_dir = bench_store(results, customers, repeat, work_dir, args.backend)
+            bench_export(results, customers, repeat, work_dir, formats)
+            bench_import(results, customers, repeat, work_dir, args.backend)
+            bench_dates(results, customers, repeat)
+            bench_stats(results, customers, repeat)
+            if not args.no_memory:
+                bench_memory(memory, size)
+            if gui is not None:
+                previous_dir = os.getcwd()
+                os.chdir(work_dir)
+                try:
+                    bench_refresh(results, gui, data_dir, size, repeat, args.backend)
+                finally:
+                    os.chdir(previous_dir)
+
+    output = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": args.sizes,
+            "repeat": args.repeat,
+            "backend": args.backend,
+        },
+        "results": results,
+        "memory": memory,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(output, f, indent=2)
+    print(f"\nresults written to {args.output}")
+
+    for error in errors:
+        print(f"CHECK FAILED: {error}", file=sys.stderr)
+    if errors:
+        return 1
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressions over {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
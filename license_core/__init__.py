@@ -0,0 +1,38 @@
+"""هسته‌ی مستقل از رابط کاربری سیستم مدیریت لایسنس"""
+import importlib
+
+from .batch import BatchReport, generate_batch
+from .bundle import BundleError, BundleReader
+from .changes import ChangeLog
+from .codes import generate_access_code, jalali_now, make_customer, validate_hardware_id
+from .collection import CustomerCollection
+from .dates import (
+    DateIndex, display_date, format_jalali, jalali_day_key, jalali_month_range, jalali_range, parse_jalali,
+)
+from .export import EXPORTERS, ExportCancelled, default_export_path, export_customers, export_text
+from .importer import ImportReport, import_customers, join_index
+from .journal import JournalStore
+from .metrics import Metrics, metrics
+from .search import SearchIndex, filter_customers, normalize_text
+from .sqlite_store import SqliteStore
+from .stats import CustomerStats
+from .storage import BACKENDS, create_store
+
+# replication به asyncio وابسته است و فقط هنگام نیاز وارد می‌شود (PEP 562)
+_LAZY = dict.fromkeys(("ReplicationServer", "SyncError", "SyncReport", "pull"), "replication")
+
+__all__ = [
+    "BACKENDS", "EXPORTERS", "BatchReport", "BundleError", "BundleReader", "ChangeLog", "CustomerCollection",
+    "CustomerStats", "DateIndex", "ExportCancelled", "ImportReport", "JournalStore", "Metrics",
+    "ReplicationServer", "SearchIndex", "SqliteStore", "SyncError", "SyncReport", "create_store",
+    "default_export_path", "display_date", "export_customers", "export_text", "filter_customers", "format_jalali",
+    "generate_access_code", "generate_batch", "import_customers", "jalali_day_key", "jalali_month_range",
+    "jalali_now", "jalali_range", "join_index", "make_customer", "metrics", "normalize_text", "parse_jalali",
+    "pull", "validate_hardware_id",
+]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        return getattr(importlib.import_module(f".{_LAZY[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
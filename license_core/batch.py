@@ -0,0 +1,165 @@
+"""تولید گروهی لایسنس از فایل CSV یا JSONL"""
+import csv
+import json
+import logging
+import os
+import time
+
+from .codes import generate_access_code, validate_hardware_id
+
+logger = logging.getLogger(__name__)
+
+BATCH_FIELDS = ("name", "phone", "hardware_id")
+DEFAULT_CHUNK_SIZE = 500
+
+
+class BatchReport:
+    """نتیجه‌ی یک اجرای گروهی: مشتریان ساخته‌شده، خطاهای هر ردیف و سرعت پردازش"""
+
+    def __init__(self, source):
+        self.source = source
+        self.rows = 0
+        self.customers = []
+        self.errors = []
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    def add_error(self, line_no, hardware_id, message):
+        self.errors.append((line_no, hardware_id, message))
+
+    def summary(self):
+        return (f"{self.rows} rows, {len(self.customers)} generated, {len(self.errors)} errors "
+                f"in {self.elapsed:.2f}s ({self.rows_per_second:.0f} rows/s)")
+
+
+# ==================== خواندن جریانی ورودی ====================
+def iter_rows(path):
+    """خواندن ردیف‌ها به‌صورت جریانی؛ خروجی (شماره خط، دیکشنری ردیف)"""
+    if os.path.splitext(path)[1].lower() in (".jsonl", ".ndjson", ".json"):
+        yield from _iter_jsonl(path)
+    else:
+        yield from _iter_csv(path)
+
+
+def _iter_jsonl(path):
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_no, {"_error": f"invalid JSON: {e}"}
+                continue
+            yield line_no, row if isinstance(row, dict) else {"_error": "row is not an object"}
+
+
+def _iter_csv(path):
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = None
+        for line_no, values in enumerate(reader, 1):
+            if not values or not any(v.strip() for v in values):
+                continue
+            if line_no == 1 and "hardware_id" in (v.strip().lower() for v in values):
+                header = [v.strip().lower() for v in values]
+                continue
+            yield line_no, dict(zip(header or BATCH_FIELDS, values))
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ==================== پردازش ====================
+def process_chunk(rows):
+    """اعتبارسنجی و تولید کد برای یک دسته ردیف؛ در پروسه‌های کارگر اجرا می‌شود"""
+    results = []
+    for line_no, row in rows:
+        if "_error" in row:
+            results.append((line_no, row.get("hardware_id", ""), None, row["_error"]))
+            continue
+        name = str(row.get("name") or "").strip()
+        phone = str(row.get("phone") or "").strip()
+        hardware_id = str(row.get("hardware_id") or "").strip().upper()
+        if not (name and phone and hardware_id):
+            results.append((line_no, hardware_id, None, "empty field"))
+        elif not validate_hardware_id(hardware_id):
+            results.append((line_no, hardware_id, None, "invalid hardware ID"))
+        else:
+            record = (name, phone, hardware_id, generate_access_code(hardware_id))
+            results.append((line_no, hardware_id, record, None))
+    return results
+
+
+def generate_batch(path, existing=(), created_at=None, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """تولید لایسنس برای همه‌ی ردیف‌های فایل؛ ورودی هرگز کامل در حافظه بارگذاری نمی‌شود
+
+    existing مجموعه‌ای از شناسه‌های موجود است (مثلاً CustomerCollection) تا ردیف‌های تکراری گزارش شوند.
+    """
+    report = BatchReport(path)
+    if created_at is None:
+        created_at = int(time.time())
+    seen = set()
+    started = time.perf_counter()
+
+    def collect(results):
+        for line_no, hardware_id, record, error in results:
+            report.rows += 1
+            if error is None and (hardware_id in existing or hardware_id in seen):
+                error = "duplicate hardware ID"
+            if error is not None:
+                report.add_error(line_no, hardware_id, error)
+                continue
+            seen.add(hardware_id)
+            name, phone, hardware_id, access_code = record
+            report.customers.append({
+                "name": name,
+                "phone": phone,
+                "hardware_id": hardware_id,
+                "access_code": access_code,
+                "created_at": created_at
+            })
+
+    chunks = _chunks(iter_rows(path), chunk_size)
+    workers = workers or os.cpu_count() or 1
+    executor = _create_executor(workers)
+    if executor is None:
+        for chunk in chunks:
+            collect(process_chunk(chunk))
+    else:
+        with executor:
+            max_in_flight = workers * 2
+            in_flight = []
+            for chunk in chunks:
+                in_flight.append(executor.submit(process_chunk, chunk))
+                if len(in_flight) >= max_in_flight:
+                    collect(in_flight.pop(0).result())
+            for future in in_flight:
+                collect(future.result())
+
+    report.elapsed = time.perf_counter() - started
+    logger.info("Batch %s: %s", path, report.summary())
+    return report
+
+
+def _create_executor(workers):
+    if workers == 1:
+        return None
+    try:
+        from concurrent.futures import ProcessPoolExecutor
+        return ProcessPoolExecutor(max_workers=workers)
+    except (OSError, NotImplementedError, ImportError) as e:
+        logger.warning("Process pool unavailable, running batch in-process: %s", e)
+        return None
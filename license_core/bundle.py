@@ -0,0 +1,132 @@
+"""بسته‌ی فشرده‌ی تایید آفلاین: آرایه‌ی مرتب با عرض ثابت از هش شناسه و کد دسترسی
+
+ساختار فایل (little-endian):
+
+    سرآیند  magic(8) | format(u16) | scheme(u16) | count(u32) | salt(16)
+    رکوردها count × [hash(hardware_id)(8) | hash(hardware_id, access_code)(8)] مرتب بر اساس هش شناسه
+
+نام و تلفن مشتری و خود کد دسترسی در بسته نیستند. خواننده فایل را mmap می‌کند و با جستجوی دودویی
+در O(log n) و بدون تجزیه‌ی فایل پاسخ می‌دهد.
+"""
+import hashlib
+import mmap
+import os
+import struct
+
+from .codes import ACCESS_CODE_SCHEME
+
+MAGIC = b"LMBUNDLE"
+BUNDLE_FORMAT = 1
+HEADER = struct.Struct("<8sHHI16s")
+HASH_SIZE = 8
+RECORD_SIZE = HASH_SIZE * 2
+SALT_SIZE = 16
+
+
+class BundleError(Exception):
+    """فایل بسته نامعتبر است یا با نسخه‌ی برنامه سازگار نیست"""
+
+
+def _normalize(value):
+    return value.strip().upper().encode("utf-8")
+
+
+def hash_hardware_id(salt, hardware_id):
+    return hashlib.blake2b(_normalize(hardware_id), digest_size=HASH_SIZE, key=salt, person=b"hardware_id").digest()
+
+
+def hash_access_code(salt, hardware_id, access_code):
+    data = _normalize(hardware_id) + b"\0" + _normalize(access_code)
+    return hashlib.blake2b(data, digest_size=HASH_SIZE, key=salt, person=b"access_code").digest()
+
+
+# ==================== نوشتن ====================
+class BundleWriter:
+    """نویسنده‌ی بسته با رابط نویسنده‌های خروجی؛ رکوردها در close مرتب و نوشته می‌شوند"""
+    extension = "lmb"
+    binary = True
+
+    def __init__(self, f, salt=None):
+        self.f = f
+        self.salt = salt if salt is not None else os.urandom(SALT_SIZE)
+        self.records = []
+
+    def write(self, customer):
+        hardware_id = customer["hardware_id"]
+        self.records.append(hash_hardware_id(self.salt, hardware_id)
+                            + hash_access_code(self.salt, hardware_id, customer["access_code"]))
+
+    def close(self):
+        self.records.sort()
+        self.f.write(HEADER.pack(MAGIC, BUNDLE_FORMAT, ACCESS_CODE_SCHEME, len(self.records), self.salt))
+        self.f.write(b"".join(self.records))
+
+
+# ==================== خواندن ====================
+class BundleReader:
+    """خواننده‌ی mmap شده‌ی بسته؛ scheme سرآیند باید با ACCESS_CODE_SCHEME برنامه یکی باشد"""
+
+    def __init__(self, filepath, scheme=ACCESS_CODE_SCHEME):
+        self.filepath = filepath
+        self._file = open(filepath, 'rb')
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            if size < HEADER.size:
+                raise BundleError(f"bundle too small: {filepath}")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self.format, self.scheme, self.count, self.salt = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise BundleError(f"not a license bundle: {filepath}")
+            if self.format != BUNDLE_FORMAT:
+                raise BundleError(f"unsupported bundle format {self.format}")
+            if scheme is not None and self.scheme != scheme:
+                raise BundleError(f"bundle uses access code scheme {self.scheme}, expected {scheme}")
+            if size != HEADER.size + self.count * RECORD_SIZE:
+                raise BundleError(f"bundle size does not match its {self.count} records")
+        except BaseException:
+            self.close()
+            raise
+
+    def __len__(self):
+        return self.count
+
+    def _find(self, key):
+        data = self._map
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = HEADER.size + mid * RECORD_SIZE
+            probe = data[offset:offset + HASH_SIZE]
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return offset
+        return None
+
+    def __contains__(self, hardware_id):
+        return self._find(hash_hardware_id(self.salt, hardware_id)) is not None
+
+    def verify(self, hardware_id, access_code):
+        """آیا access_code برای hardware_id در بسته معتبر است"""
+        offset = self._find(hash_hardware_id(self.salt, hardware_id))
+        if offset is None:
+            return False
+        expected = self._map[offset + HASH_SIZE:offset + RECORD_SIZE]
+        return expected == hash_access_code(self.salt, hardware_id, access_code)
+
+    def close(self):
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+        return False
@@ -0,0 +1,138 @@
+"""فهرست تغییرات برای همگام‌سازی بین گره‌ها: آخرین تغییر هر شناسه با seq محلی و نسخه‌ی (clock، node)
+
+هر نوشتن در ذخیره‌ساز یک ردیف در جدول changes را جایگزین می‌کند؛ حذف‌ها به صورت ردیف بدون مشتری (tombstone)
+می‌مانند. برخلاف ژورنال با فشرده‌سازی پاک نمی‌شود، پس «تغییرات پس از seq» همیشه قابل پاسخ است.
+نسخه‌ی هر تغییر ساعت لمپورت (clock) و گره‌ی مبدأ آن است و در تعارض بین گره‌ها نسخه‌ی بزرگ‌تر برنده است.
+برای ذخیره‌ساز JSON فایل جداگانه‌ی customers.changes.db است و برای SQLite جدولی در همان customers.db.
+"""
+import json
+import logging
+import sqlite3
+import uuid
+
+logger = logging.getLogger(__name__)
+
+CHANGES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS changes (
+    hardware_id TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    clock INTEGER NOT NULL,
+    node TEXT NOT NULL,
+    customer TEXT
+);
+CREATE INDEX IF NOT EXISTS changes_seq ON changes(seq);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+UPSERT_CHANGE = "INSERT OR REPLACE INTO changes (hardware_id, seq, clock, node, customer) VALUES (?, ?, ?, ?, ?)"
+FETCH_SIZE = 1000
+# محدودیت تعداد پارامترهای SQLite در IN (...)
+LOOKUP_SIZE = 500
+
+
+def _encode(customer):
+    return json.dumps(customer, ensure_ascii=False, default=dict) if customer is not None else None
+
+
+class ChangeLog:
+    """جدول changes روی یک اتصال SQLite؛ متدهای نوشتن تراکنش را به فراخواننده واگذار می‌کنند"""
+
+    def __init__(self, db):
+        self.db = db
+        db.executescript(CHANGES_SCHEMA)
+        self.node = self._meta("node")
+        if self.node is None:
+            self.node = uuid.uuid4().hex[:16]
+            with db:
+                db.execute("INSERT OR IGNORE INTO meta VALUES ('node', ?)", (self.node,))
+            # ایستگاه دیگری ممکن است هم‌زمان شناسه‌ی گره را ساخته باشد
+            self.node = self._meta("node")
+            logger.info("Created replication node id %s", self.node)
+
+    @classmethod
+    def open(cls, path):
+        """فایل جداگانه‌ی تغییرات با همان تنظیمات اتصال ذخیره‌ساز SQLite"""
+        db = sqlite3.connect(path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=FULL")
+        db.execute("PRAGMA busy_timeout=5000")
+        return cls(db)
+
+    def close(self):
+        self.db.close()
+
+    def _meta(self, key):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @property
+    def seq(self):
+        """بزرگ‌ترین seq ثبت‌شده؛ هر بار از پایگاه داده خوانده می‌شود چون ایستگاه‌های دیگر هم می‌نویسند"""
+        return int(self._meta("changes_seq") or 0)
+
+    def _set_seq(self, seq):
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES ('changes_seq', ?)", (str(max(self.seq, seq)),))
+
+    # ==================== نوشتن ====================
+    def record(self, records, seq):
+        """ثبت رکوردهای ژورنال با seq؛ رکورد بدون version تغییر محلی با نسخه‌ی (seq، این گره) است
+
+        seq آخرین seq ذخیره‌ساز است و ممکن است از رکوردها بزرگ‌تر باشد (تغییرات دریافتی کنارگذاشته‌شده).
+        """
+        rows = []
+        for record in records:
+            clock, node = record.get("version") or (record["seq"], self.node)
+            if record["op"] == "add":
+                customer = record["customer"]
+                rows.append((customer["hardware_id"], record["seq"], clock, node, _encode(customer)))
+            else:
+                rows.append((record["hardware_id"], record["seq"], clock, node, None))
+        self.db.executemany(UPSERT_CHANGE, rows)
+        self._set_seq(seq)
+
+    def seed(self, customers, seq):
+        """هم‌ترازی با وضعیت کامل ذخیره‌ساز وقتی تاریخچه‌ی ژورنال در دسترس نیست (نخستین اجرا یا شکاف)
+
+        هر مشتری که محتوایش با آخرین تغییر ثبت‌شده فرق دارد و هر شناسه‌ی حذف‌شده با seq داده‌شده ثبت می‌شود.
+        تعداد ردیف‌های ثبت‌شده برگردانده می‌شود.
+        """
+        known = dict(self.db.execute("SELECT hardware_id, customer FROM changes"))
+        rows = []
+        for customer in customers:
+            encoded = _encode(customer)
+            if known.pop(customer["hardware_id"], None) != encoded:
+                rows.append((customer["hardware_id"], seq, seq, self.node, encoded))
+        rows.extend((hardware_id, seq, seq, self.node, None) for hardware_id, encoded in known.items()
+                    if encoded is not None)
+        self.db.executemany(UPSERT_CHANGE, rows)
+        self._set_seq(seq)
+        return len(rows)
+
+    # ==================== خواندن ====================
+    def versions(self, hardware_ids):
+        """نسخه‌ی (clock، node) آخرین تغییر هر شناسه"""
+        hardware_ids = list(hardware_ids)
+        found = {}
+        for i in range(0, len(hardware_ids), LOOKUP_SIZE):
+            part = hardware_ids[i:i + LOOKUP_SIZE]
+            rows = self.db.execute(
+                f"SELECT hardware_id, clock, node FROM changes WHERE hardware_id IN ({','.join('?' * len(part))})",
+                part,
+            )
+            found.update((hardware_id, (clock, node)) for hardware_id, clock, node in rows)
+        return found
+
+    def since(self, seq, until, exclude_node=None):
+        """(seq، clock، node، hardware_id، متن JSON مشتری یا None) تغییرات seq < ... <= until به ترتیب seq
+
+        تغییرهایی که مبدأشان exclude_node است برگردانده نمی‌شوند؛ آن گره خودشان یا نسخه‌ی جدیدترشان را دارد.
+        """
+        cursor = self.db.execute(
+            "SELECT seq, clock, node, hardware_id, customer FROM changes WHERE seq > ? AND seq <= ? AND node != ? "
+            "ORDER BY seq",
+            (seq, until, exclude_node or ""),
+        )
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                return
+            yield from rows
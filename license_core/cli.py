@@ -0,0 +1,328 @@
+"""رابط خط فرمان بدون وابستگی به Kivy
+
+    python -m license_core generate --name NAME --phone PHONE --hardware-id HWID
+    python -m license_core generate --batch devices.csv
+    python -m license_core import other_office/customers.json [--policy keep|overwrite|newest]
+    python -m license_core list [--limit N]
+    python -m license_core count
+    python -m license_core stats [--days N] [--months N] [--top N]
+    python -m license_core --backend sqlite count    # نخستین اجرا customers.json را به customers.db منتقل می‌کند
+    python -m license_core find QUERY
+    python -m license_core delete HWID
+    python -m license_core export [--format txt|csv|jsonl|xlsx] [--output PATH]
+    python -m license_core export --format bundle --output licenses.lmb
+    python -m license_core verify licenses.lmb HWID ACCESS_CODE
+    python -m license_core serve [--host HOST] [--port PORT]
+    python -m license_core sync-serve [--host HOST] [--port PORT] [--key KEY]
+    python -m license_core sync HOST[:PORT] [--interval SECONDS] [--key KEY]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+from .batch import generate_batch
+from .bundle import BundleError, BundleReader
+from .codes import make_customer, validate_hardware_id
+from .dates import display_date, jalali_range, parse_jalali, this_month_range
+from .export import EXPORTERS, default_export_path, export_customers
+from .importer import COMMIT_BATCH_SIZE, DEFAULT_POLICY, POLICIES, import_customers
+from .storage import BACKENDS, create_store
+from .search import filter_customers
+
+DEFAULT_DATA_DIR = "license_data"
+# فرمان‌هایی که ذخیره‌ساز نویسنده را باز نمی‌کنند
+STORELESS_COMMANDS = ("verify", "serve")
+
+
+def format_customer(customer):
+    return "\t".join([*(str(customer.get(field, "")) for field in ("hardware_id", "access_code", "name", "phone")),
+                      display_date(customer)])
+
+
+def jalali_date(text):
+    """نوع argparse برای تاریخ شمسی 1403/01/15"""
+    try:
+        parse_jalali(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return text
+
+
+def selected_customers(store, args):
+    """همه‌ی مشتریان یا مشتریان بازه‌ی --from/--to/--this-month به ترتیب زمان ایجاد"""
+    if args.this_month:
+        return store.customers.created_between(*this_month_range())
+    if args.since or args.until:
+        return store.customers.created_between(*jalali_range(args.since, args.until))
+    return store.customers
+
+
+# ==================== فرمان‌ها ====================
+def cmd_generate(store, args):
+    if args.batch:
+        report = generate_batch(args.batch, existing=store.customers, workers=args.workers)
+        store.add_many(report.customers)
+        for line_no, hardware_id, error in report.errors:
+            print(f"line {line_no}: {hardware_id}: {error}", file=sys.stderr)
+        print(report.summary())
+        return 0 if not report.errors else 1
+
+    if not (args.name and args.phone and args.hardware_id):
+        print("generate needs --name, --phone and --hardware-id (or --batch FILE)", file=sys.stderr)
+        return 2
+    hardware_id = args.hardware_id.strip().upper()
+    if not validate_hardware_id(hardware_id):
+        print(f"invalid hardware ID: {hardware_id}", file=sys.stderr)
+        return 1
+    existing = store.customers.get(hardware_id)
+    if existing is not None:
+        print(f"hardware ID already licensed: {format_customer(existing)}", file=sys.stderr)
+        return 1
+    customer = make_customer(args.name.strip(), args.phone.strip(), hardware_id)
+    store.add(customer)
+    print(customer["access_code"])
+    return 0
+
+
+def cmd_import(store, args):
+    try:
+        report = import_customers(args.file, store.customers, store.add_many, policy=args.policy,
+                                  workers=args.workers, batch_size=args.batch_size)
+    except (OSError, ValueError) as e:
+        # گروه‌هایی که پیش از خطا ثبت شده‌اند در ذخیره‌ساز می‌مانند
+        store.flush()
+        print(f"cannot import {args.file}: {e}", file=sys.stderr)
+        return 2
+    if not store.flush():
+        print(f"could not save imported customers: {store.last_error}", file=sys.stderr)
+        return 2
+    for line_no, hardware_id, error in report.errors:
+        print(f"line {line_no}: {hardware_id}: {error}", file=sys.stderr)
+    print(report.summary())
+    return 0 if not report.errors else 1
+
+
+def cmd_list(store, args):
+    for count, customer in enumerate(selected_customers(store, args), 1):
+        if args.limit is not None and count > args.limit:
+            break
+        print(format_customer(customer))
+    return 0
+
+
+def cmd_count(store, args):
+    print(len(selected_customers(store, args)))
+    return 0
+
+
+def cmd_stats(store, args):
+    stats = store.stats
+    print(f"total\t{stats.total}")
+    print(f"today\t{stats.day_count()}")
+    print(f"this month\t{stats.month_count()}")
+    for title, rows in (("days", stats.recent_days(args.days)), ("months", stats.recent_months(args.months)),
+                        ("top customers", stats.top_names(args.top))):
+        print(f"\n{title}")
+        for key, value in rows:
+            print(f"{key}\t{value}")
+    return 0
+
+
+def cmd_find(store, args):
+    query = args.query.strip()
+    exact = store.customers.get(query.upper()) or store.customers.find_by_access_code(query.upper())
+    if exact is not None:
+        matches = [exact]
+    elif hasattr(store.customers, "search"):
+        matches = store.customers.search(query)
+    else:
+        matches = filter_customers(store.customers, query)
+    for customer in matches:
+        print(format_customer(customer))
+    return 0 if matches else 1
+
+
+def cmd_delete(store, args):
+    removed = store.remove(args.hardware_id.strip().upper())
+    if removed is None:
+        print(f"no customer with hardware ID {args.hardware_id}", file=sys.stderr)
+        return 1
+    print(f"removed {format_customer(removed)}")
+    return 0
+
+
+def cmd_export(store, args):
+    fmt = args.format
+    if fmt is None:
+        extension = args.output.rsplit(".", 1)[-1].lower() if args.output and "." in args.output else ""
+        fmt = extension if extension in EXPORTERS else "txt"
+    filepath = args.output or default_export_path(store.data_dir, fmt)
+    count = export_customers(store.customers, filepath, fmt)
+    print(f"exported {count} customers to {filepath}")
+    return 0
+
+
+def cmd_verify(args):
+    try:
+        with BundleReader(args.bundle) as bundle:
+            valid = bundle.verify(args.hardware_id, args.access_code)
+    except (OSError, BundleError) as e:
+        print(f"cannot read bundle: {e}", file=sys.stderr)
+        return 2
+    print("valid" if valid else "invalid")
+    return 0 if valid else 1
+
+
+def cmd_serve(args):
+    # asyncio فقط برای همین فرمان لازم است و بقیه‌ی فرمان‌ها هزینه‌ی وارد کردن آن را نمی‌پردازند
+    from .server import DEFAULT_HOST, DEFAULT_PORT, run as run_server
+    run_server(args.data_dir, args.host or DEFAULT_HOST, args.port or DEFAULT_PORT)
+    return 0
+
+
+def peer_address(text):
+    """نوع argparse برای HOST[:PORT]"""
+    host, _, port = text.rpartition(":") if ":" in text else (text, "", "")
+    try:
+        return host, int(port) if port else None
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid peer address: {text}")
+
+
+def sync_key(args):
+    from .replication import ENV_KEY
+    return args.key or os.environ.get(ENV_KEY)
+
+
+def cmd_sync_serve(store, args):
+    # مانند serve، asyncio فقط برای فرمان‌های همگام‌سازی وارد می‌شود
+    from .replication import DEFAULT_HOST, DEFAULT_SYNC_PORT, serve as serve_sync
+    serve_sync(store.changes_file, args.host or DEFAULT_HOST, args.port or DEFAULT_SYNC_PORT, sync_key(args))
+    return 0
+
+
+def cmd_sync(store, args):
+    from .replication import DEFAULT_SYNC_PORT, SyncError, pull
+    host, port = args.peer
+    port = port or DEFAULT_SYNC_PORT
+    key = sync_key(args)
+    while True:
+        try:
+            report = pull(store, host, port, key)
+        except (OSError, ValueError, SyncError) as e:
+            print(f"sync with {host}:{port} failed: {e}", file=sys.stderr)
+            if args.interval is None:
+                return 1
+        else:
+            applied = store.apply_changes()
+            print(f"{report.summary()}, {len(applied)} applied")
+        if args.interval is None:
+            return 0
+        try:
+            time.sleep(args.interval)
+        except KeyboardInterrupt:
+            return 0
+
+
+# ==================== ورودی ====================
+def build_parser():
+    parser = argparse.ArgumentParser(prog="license_core", description="License manager command line")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="customer data directory")
+    parser.add_argument("--backend", choices=sorted(BACKENDS),
+                        help="customer store (default: LICENSE_MANAGER_BACKEND, else sqlite if customers.db exists)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log to stderr")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="generate a license")
+    generate.add_argument("--name")
+    generate.add_argument("--phone")
+    generate.add_argument("--hardware-id")
+    generate.add_argument("--batch", metavar="FILE", help="CSV or JSONL file of name, phone, hardware_id")
+    generate.add_argument("--workers", type=int, help="worker processes for --batch")
+    generate.set_defaults(handler=cmd_generate)
+
+    import_cmd = commands.add_parser("import", help="merge customers from another office's file")
+    import_cmd.add_argument("file", help="customers.json, JSONL or CSV (name, phone, hardware_id[, access_code, ...])")
+    import_cmd.add_argument("--policy", choices=POLICIES, default=DEFAULT_POLICY,
+                            help="on an existing hardware ID: keep it, overwrite it or keep the newest created_at")
+    import_cmd.add_argument("--workers", type=int, help="worker processes for validation")
+    import_cmd.add_argument("--batch-size", type=int, default=COMMIT_BATCH_SIZE, help="customers per store commit")
+    import_cmd.set_defaults(handler=cmd_import)
+
+    list_cmd = commands.add_parser("list", help="list customers")
+    list_cmd.add_argument("--limit", type=int)
+    list_cmd.set_defaults(handler=cmd_list)
+
+    count = commands.add_parser("count", help="print the number of customers")
+    count.set_defaults(handler=cmd_count)
+
+    stats = commands.add_parser("stats", help="licenses per day, per month and top customers")
+    stats.add_argument("--days", type=int, default=7, help="recent days to show")
+    stats.add_argument("--months", type=int, default=6, help="recent months to show")
+    stats.add_argument("--top", type=int, default=10, help="customers with the most licenses")
+    stats.set_defaults(handler=cmd_stats)
+
+    for command in (list_cmd, count):
+        command.add_argument("--from", dest="since", type=jalali_date, metavar="DATE",
+                             help="created on or after this Jalali date (1403/01/15)")
+        command.add_argument("--to", dest="until", type=jalali_date, metavar="DATE",
+                             help="created on or before this Jalali date")
+        command.add_argument("--this-month", action="store_true", help="created in the current Jalali month")
+
+    find = commands.add_parser("find", help="find customers by name, phone, hardware ID or access code")
+    find.add_argument("query")
+    find.set_defaults(handler=cmd_find)
+
+    delete = commands.add_parser("delete", help="delete a customer by hardware ID")
+    delete.add_argument("hardware_id")
+    delete.set_defaults(handler=cmd_delete)
+
+    export = commands.add_parser("export", help="export customers")
+    export.add_argument("--format", choices=sorted(EXPORTERS), help="defaults to the --output extension, else txt")
+    export.add_argument("--output")
+    export.set_defaults(handler=cmd_export)
+
+    verify = commands.add_parser("verify", help="check an access code against an offline bundle")
+    verify.add_argument("bundle")
+    verify.add_argument("hardware_id")
+    verify.add_argument("access_code")
+    verify.set_defaults(handler=cmd_verify)
+
+    serve = commands.add_parser("serve", help="run the local license verification service")
+    serve.add_argument("--host", help="default 127.0.0.1")
+    serve.add_argument("--port", type=int, help="default 8302")
+    serve.set_defaults(handler=cmd_serve)
+
+    sync_serve = commands.add_parser("sync-serve", help="send this store's changes to other nodes on request")
+    sync_serve.add_argument("--host", help="default 127.0.0.1")
+    sync_serve.add_argument("--port", type=int, help="default 8303")
+    sync_serve.set_defaults(handler=cmd_sync_serve)
+
+    sync = commands.add_parser("sync", help="pull changes from another node since the last sync")
+    sync.add_argument("peer", type=peer_address, metavar="HOST[:PORT]", help="PORT defaults to 8303")
+    sync.add_argument("--interval", type=float, help="keep pulling every SECONDS")
+    sync.set_defaults(handler=cmd_sync)
+
+    for command in (sync_serve, sync):
+        command.add_argument("--key", help="shared secret between nodes (default: LICENSE_MANAGER_SYNC_KEY)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.ERROR,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        stream=sys.stderr
+    )
+    if args.command in STORELESS_COMMANDS:
+        return args.handler(args)
+    store = create_store(args.data_dir, args.backend)
+    try:
+        # SQLite بدون بارگذاری همه‌ی مشتریان با پرس‌وجوهای نمایه‌دار پاسخ می‌دهد
+        getattr(store, "open", store.load)()
+        return args.handler(store, args)
+    finally:
+        store.close()
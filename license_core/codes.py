@@ -0,0 +1,73 @@
+"""تولید و اعتبارسنجی کد دسترسی"""
+import hashlib
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+ACCESS_CODE_SALT = "SIEVE_ANALYSIS_APP_SECURE_SALT_2024"
+# نسخه‌ی الگوریتم generate_access_code؛ با هر تغییر در الگوریتم یا نمک باید افزایش یابد
+ACCESS_CODE_SCHEME = 1
+HEX_DIGITS = "0123456789ABCDEF"
+_HEX_SET = frozenset(HEX_DIGITS)
+
+
+def generate_access_code(hardware_id):
+    """تولید کد دسترسی بر اساس شناسه سخت‌افزاری"""
+    logger.debug("Generating access code for hardware ID: %s", hardware_id)
+    try:
+        combined = hardware_id + ACCESS_CODE_SALT
+
+        hash1 = hashlib.sha512(combined.encode()).hexdigest()
+        hash2 = hashlib.md5(hash1.encode()).hexdigest()
+        hash3 = hashlib.sha256((hash2 + hardware_id).encode()).hexdigest()
+
+        access_code = ""
+        for i in range(0, len(hash3), 4):
+            if len(access_code) >= 12:
+                break
+            segment = hash3[i:i+4]
+            access_code += segment.upper() + "-"
+
+        access_code = access_code.rstrip("-")
+
+        if len(access_code) < 8:
+            alternative_code = hashlib.sha384((hardware_id + "BACKUP_SALT").encode()).hexdigest()[:12].upper()
+            access_code = '-'.join([alternative_code[i:i+4] for i in range(0, len(alternative_code), 4)])
+
+        logger.debug("Generated access code: %s", access_code)
+        return access_code[:15]
+    except Exception as e:
+        logger.error("Error generating access code: %s", e)
+        raise
+
+
+def validate_hardware_id(hardware_id):
+    """اعتبارسنجی شناسه سخت‌افزاری"""
+    logger.debug("Validating hardware ID: %s", hardware_id)
+    if not hardware_id or len(hardware_id) != 16:
+        logger.warning("Invalid hardware ID length: %s", hardware_id)
+        return False
+    valid = set(hardware_id.upper()) <= _HEX_SET
+    if not valid:
+        logger.warning("Invalid hardware ID characters: %s", hardware_id)
+    return valid
+
+
+def jalali_now():
+    """تاریخ و زمان فعلی شمسی در قالب قدیمی created_date"""
+    import jdatetime
+    return jdatetime.datetime.now().strftime("%Y/%m/%d %H:%M:%S")
+
+
+def make_customer(name, phone, hardware_id, created_at=None):
+    """ساخت رکورد مشتری همراه با کد دسترسی و زمان ایجاد (ثانیه‌ی epoch)"""
+    if created_at is None:
+        created_at = int(time.time())
+    return {
+        "name": name,
+        "phone": phone,
+        "hardware_id": hardware_id,
+        "access_code": generate_access_code(hardware_id),
+        "created_at": created_at
+    }
@@ -0,0 +1,89 @@
+"""مجموعه‌ی نمایه‌شده‌ی مشتریان"""
+from .dates import DateIndex
+from .records import CustomerRecord, pack_access_code, pack_hardware_id
+
+
+def _same(value):
+    return value
+
+
+class CustomerCollection:
+    """مجموعه‌ی مشتریان با نمایه‌ی هش بر اساس شناسه سخت‌افزاری و کد دسترسی
+
+    ترتیب پیمایش همان ترتیب درج است؛ به‌روزرسانی یک شناسه‌ی موجود جایگاه آن را تغییر نمی‌دهد.
+    ناظرها (مثل نمایه‌ی جستجو) با on_upsert(customer, previous) و on_remove(customer) باخبر می‌شوند.
+    با compact=True مشتریان به صورت CustomerRecord و با کلیدهای بایتی نگه داشته می‌شوند.
+    """
+
+    def __init__(self, customers=(), compact=False):
+        self.compact = compact
+        self._hardware_key = pack_hardware_id if compact else _same
+        self._access_key = pack_access_code if compact else _same
+        self._by_hardware_id = {}
+        self._by_access_code = {}
+        self._observers = []
+        self._date_index = None
+        for customer in customers:
+            self.upsert(customer)
+
+    def add_observer(self, observer):
+        """ثبت ناظر برای تغییرات مجموعه"""
+        self._observers.append(observer)
+
+    def remove_observer(self, observer):
+        if observer in self._observers:
+            self._observers.remove(observer)
+
+    def __len__(self):
+        return len(self._by_hardware_id)
+
+    def __iter__(self):
+        return iter(self._by_hardware_id.values())
+
+    def __contains__(self, hardware_id):
+        return self._hardware_key(hardware_id) in self._by_hardware_id
+
+    def get(self, hardware_id):
+        """یافتن مشتری بر اساس شناسه سخت‌افزاری"""
+        return self._by_hardware_id.get(self._hardware_key(hardware_id))
+
+    def find_by_access_code(self, access_code):
+        """یافتن مشتری بر اساس کد دسترسی"""
+        return self._by_access_code.get(self._access_key(access_code))
+
+    def created_between(self, start, end):
+        """مشتریان با start <= created_at < end (ثانیه‌ی epoch) به ترتیب زمان؛ نمایه در اولین پرس‌وجو ساخته می‌شود"""
+        if self._date_index is None:
+            self._date_index = DateIndex(self)
+            self.add_observer(self._date_index)
+        return self._date_index.between(start, end)
+
+    def upsert(self, customer):
+        """افزودن یا جایگزینی مشتری؛ مشتری قبلی با همان شناسه برگردانده می‌شود"""
+        if self.compact:
+            customer = CustomerRecord.from_mapping(customer)
+            hardware_key, access_key = customer.hardware_key, customer.access_key
+        else:
+            hardware_key, access_key = customer["hardware_id"], customer["access_code"]
+        previous = self._by_hardware_id.get(hardware_key)
+        if previous is not None:
+            self._unindex_access_code(previous)
+        self._by_hardware_id[hardware_key] = customer
+        self._by_access_code[access_key] = customer
+        for observer in self._observers:
+            observer.on_upsert(customer, previous)
+        return previous
+
+    def remove(self, hardware_id):
+        """حذف مشتری؛ در صورت نبودن None برگردانده می‌شود"""
+        customer = self._by_hardware_id.pop(self._hardware_key(hardware_id), None)
+        if customer is not None:
+            self._unindex_access_code(customer)
+            for observer in self._observers:
+                observer.on_remove(customer)
+        return customer
+
+    def _unindex_access_code(self, customer):
+        access_key = customer.access_key if self.compact else customer["access_code"]
+        if self._by_access_code.get(access_key) is customer:
+            del self._by_access_code[access_key]
@@ -0,0 +1,150 @@
+"""زمان ایجاد مشتریان به صورت ثانیه‌ی epoch، تبدیل شمسی و نمایه‌ی مرتب تاریخ
+
+رکوردها created_at (عدد صحیح) دارند و تاریخ شمسی فقط هنگام نمایش ساخته و نگه داشته می‌شود. رکوردهای
+قدیمی که فقط created_date متنی دارند با backfill_created_at یک بار تجزیه می‌شوند.
+"""
+import bisect
+import functools
+import re
+from datetime import date, datetime, timedelta
+
+DISPLAY_CACHE_SIZE = 4096
+MAX_TIMESTAMP = 2 ** 63 - 1
+_JALALI = re.compile(r"\s*(\d{4})/(\d{1,2})/(\d{1,2})(?:\s+(\d{1,2}):(\d{1,2})(?::(\d{1,2}))?)?\s*$")
+
+
+# ==================== تبدیل تاریخ ====================
+@functools.lru_cache(maxsize=DISPLAY_CACHE_SIZE)
+def _day_start(year, month, day):
+    """epoch نیمه‌شب محلی یک روز شمسی؛ تبدیل تقویم برای هر روز فقط یک بار انجام می‌شود"""
+    import jdatetime
+    gregorian = jdatetime.date(year, month, day).togregorian()
+    return int(datetime(gregorian.year, gregorian.month, gregorian.day).timestamp())
+
+
+@functools.lru_cache(maxsize=DISPLAY_CACHE_SIZE)
+def _jalali_day(gregorian):
+    import jdatetime
+    jalali = jdatetime.date.fromgregorian(date=gregorian)
+    return jalali.year, jalali.month, jalali.day
+
+
+@functools.lru_cache(maxsize=DISPLAY_CACHE_SIZE)
+def _day_key(gregorian):
+    year, month, day = _jalali_day(gregorian)
+    return f"{year:04d}/{month:02d}/{day:02d}"
+
+
+def jalali_day_key(timestamp=None):
+    """روز شمسی محلی یک epoch (پیش‌فرض امروز) به صورت '1403/01/15'؛ هفت نویسه‌ی اول کلید ماه است"""
+    return _day_key(date.today() if timestamp is None else date.fromtimestamp(timestamp))
+
+
+def parse_jalali(text):
+    """'1403/01/15' یا '1403/01/15 10:20:30' به epoch محلی؛ برای متن نامعتبر ValueError"""
+    match = _JALALI.match(text)
+    if match is None:
+        raise ValueError(f"invalid Jalali date: {text!r}")
+    year, month, day, hour, minute, second = (int(group or 0) for group in match.groups())
+    return _day_start(year, month, day) + hour * 3600 + minute * 60 + second
+
+
+@functools.lru_cache(maxsize=DISPLAY_CACHE_SIZE)
+def format_jalali(timestamp):
+    """epoch به متن شمسی در قالب قدیمی created_date؛ فقط برای نمایش"""
+    local = datetime.fromtimestamp(timestamp)
+    year, month, day = _jalali_day(local.date())
+    return f"{year:04d}/{month:02d}/{day:02d} {local.hour:02d}:{local.minute:02d}:{local.second:02d}"
+
+
+def display_date(customer):
+    """تاریخ ایجاد برای نمایش: متن ذخیره‌شده‌ی رکوردهای قدیمی یا قالب‌بندی created_at"""
+    text = customer.get("created_date")
+    if text:
+        return text
+    timestamp = customer.get("created_at")
+    return format_jalali(timestamp) if timestamp is not None else ""
+
+
+def jalali_range(start=None, end=None):
+    """بازه‌ی [start, end) برای دو تاریخ شمسی که هر دو روز را شامل می‌شود؛ طرف تعیین‌نشده باز است"""
+    return (parse_jalali(start) if start else 0,
+            _next_day(parse_jalali(end)) if end else MAX_TIMESTAMP)
+
+
+def jalali_month_range(year, month):
+    """بازه‌ی [start, end) یک ماه شمسی"""
+    start = _day_start(year, month, 1)
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return start, _day_start(next_year, next_month, 1)
+
+
+def this_month_range():
+    """بازه‌ی ماه شمسی جاری"""
+    year, month, _ = _jalali_day(date.today())
+    return jalali_month_range(year, month)
+
+
+def _next_day(timestamp):
+    local = datetime.fromtimestamp(timestamp)
+    return int(datetime.combine(local.date() + timedelta(days=1), datetime.min.time()).timestamp())
+
+
+def backfill_created_at(customers):
+    """افزودن created_at به دیکشنری‌های قدیمی از روی created_date؛ تعداد رکوردهای تکمیل‌شده برگردانده می‌شود"""
+    filled = 0
+    for customer in customers:
+        if customer.get("created_at") is None and customer.get("created_date"):
+            try:
+                customer["created_at"] = parse_jalali(customer["created_date"])
+            except ValueError:
+                continue
+            filled += 1
+    return filled
+
+
+# ==================== نمایه‌ی تاریخ ====================
+class DateIndex:
+    """فهرست مرتب (created_at، مشتری) برای پرس‌وجوی بازه با جستجوی دودویی
+
+    ناظر CustomerCollection است؛ مشتریان تازه معمولاً در انتهای فهرست قرار می‌گیرند و درج آنها ارزان است.
+    مشتریان بدون created_at در نمایه نمی‌آیند.
+    """
+
+    def __init__(self, customers=()):
+        pairs = sorted(((customer["created_at"], i, customer) for i, customer in enumerate(customers)
+                        if customer.get("created_at") is not None), key=lambda pair: pair[:2])
+        self._times = [pair[0] for pair in pairs]
+        self._customers = [pair[2] for pair in pairs]
+
+    def __len__(self):
+        return len(self._times)
+
+    def on_upsert(self, customer, previous):
+        if previous is not None:
+            self.on_remove(previous)
+        timestamp = customer.get("created_at")
+        if timestamp is None:
+            return
+        i = bisect.bisect_right(self._times, timestamp)
+        self._times.insert(i, timestamp)
+        self._customers.insert(i, customer)
+
+    def on_remove(self, customer):
+        timestamp = customer.get("created_at")
+        if timestamp is None:
+            return
+        i = bisect.bisect_left(self._times, timestamp)
+        while i < len(self._times) and self._times[i] == timestamp:
+            if self._customers[i] is customer:
+                del self._times[i]
+                del self._customers[i]
+                return
+            i += 1
+
+    def between(self, start, end):
+        """مشتریان با start <= created_at < end به ترتیب زمان"""
+        return self._customers[bisect.bisect_left(self._times, start):bisect.bisect_left(self._times, end)]
+
+    def count_between(self, start, end):
+        return bisect.bisect_left(self._times, end) - bisect.bisect_left(self._times, start)
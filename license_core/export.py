@@ -0,0 +1,212 @@
+"""صدور جریانی لیست مشتریان در قالب‌های متنی، CSV، JSONL و XLSX"""
+import csv
+import json
+import logging
+import os
+import zipfile
+from datetime import datetime
+
+from .bundle import BundleWriter
+from .dates import display_date
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FIELDS = ("name", "phone", "hardware_id", "access_code", "created_date", "created_at")
+PROGRESS_INTERVAL = 5000
+
+
+class ExportCancelled(Exception):
+    """صدور توسط کاربر لغو شد"""
+
+
+def _escape(text):
+    """همان xml.sax.saxutils.escape بدون وارد کردن xml.sax که urllib و http.client را هم بارگذاری می‌کند"""
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def export_values(customer):
+    """مقادیر EXPORT_FIELDS؛ تاریخ شمسی رکوردهای تازه فقط هنگام صدور از created_at ساخته می‌شود"""
+    return [display_date(customer) if field == "created_date" else customer.get(field, "") for field in EXPORT_FIELDS]
+
+
+# ==================== نویسنده‌ها ====================
+class Exporter:
+    """پایه‌ی نویسنده‌های خروجی؛ هر ردیف با write نوشته و در پایان close فراخوانی می‌شود"""
+    extension = None
+    binary = False
+    encoding = 'utf-8'
+    newline = None
+
+    def write(self, customer):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class TextExporter(Exporter):
+    """قالب متنی فارسی قدیمی برنامه"""
+    extension = "txt"
+
+    def __init__(self, f):
+        self.f = f
+        self.count = 0
+        f.write("=" * 60 + "\n")
+        f.write("     لیست مشتریان انطباق302\n")
+        f.write("=" * 60 + "\n\n")
+
+    def write(self, customer):
+        self.count += 1
+        self.f.write(f"ردیف: {self.count}\n"
+                     f"نام: {customer['name']}\n"
+                     f"تلفن: {customer['phone']}\n"
+                     f"شناسه: {customer['hardware_id']}\n"
+                     f"رمز: {customer['access_code']}\n"
+                     f"تاریخ ایجاد: {display_date(customer)}\n"
+                     + "-" * 40 + "\n")
+
+
+class CsvExporter(Exporter):
+    extension = "csv"
+    # BOM تا اکسل متن فارسی را درست تشخیص دهد
+    encoding = 'utf-8-sig'
+    newline = ''
+
+    def __init__(self, f):
+        self.writer = csv.writer(f)
+        self.writer.writerow(EXPORT_FIELDS)
+
+    def write(self, customer):
+        self.writer.writerow(export_values(customer))
+
+
+class JsonlExporter(Exporter):
+    extension = "jsonl"
+
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, customer):
+        self.f.write(json.dumps(dict(zip(EXPORT_FIELDS, export_values(customer))), ensure_ascii=False))
+        self.f.write("\n")
+
+
+class XlsxExporter(Exporter):
+    """XLSX حداقلی بدون وابستگی خارجی؛ برگه مستقیماً داخل فایل zip نوشته می‌شود"""
+    extension = "xlsx"
+    binary = True
+
+    _CONTENT_TYPES = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    )
+    _ROOT_RELS = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    )
+    _WORKBOOK = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="customers" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    )
+    _WORKBOOK_RELS = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    )
+
+    def __init__(self, f):
+        self.zip = zipfile.ZipFile(f, 'w', compression=zipfile.ZIP_DEFLATED)
+        self.zip.writestr("[Content_Types].xml", self._CONTENT_TYPES)
+        self.zip.writestr("_rels/.rels", self._ROOT_RELS)
+        self.zip.writestr("xl/workbook.xml", self._WORKBOOK)
+        self.zip.writestr("xl/_rels/workbook.xml.rels", self._WORKBOOK_RELS)
+        self.sheet = self.zip.open("xl/worksheets/sheet1.xml", 'w', force_zip64=True)
+        self.sheet.write(
+            b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+        )
+        self._row(EXPORT_FIELDS)
+
+    def _row(self, values):
+        cells = "".join(f'<c t="inlineStr"><is><t>{_escape(str(value))}</t></is></c>' for value in values)
+        self.sheet.write(f"<row>{cells}</row>".encode("utf-8"))
+
+    def write(self, customer):
+        self._row(export_values(customer))
+
+    def close(self):
+        self.sheet.write(b"</sheetData></worksheet>")
+        self.sheet.close()
+        self.zip.close()
+
+
+EXPORTERS = {
+    "txt": TextExporter,
+    "csv": CsvExporter,
+    "jsonl": JsonlExporter,
+    "xlsx": XlsxExporter,
+    # بسته‌ی تایید آفلاین؛ فقط هش شناسه‌ها و کدها
+    "bundle": BundleWriter,
+}
+
+
+# ==================== اجرا ====================
+def default_export_path(data_dir, extension="txt"):
+    """مسیر پیش‌فرض فایل خروجی با برچسب زمانی"""
+    filename = f"customers_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    return os.path.join(data_dir, filename)
+
+
+def export_customers(customers, filepath, fmt="txt", progress=None, cancel_event=None):
+    """صدور جریانی مشتریان؛ تعداد ردیف‌ها برگردانده می‌شود
+
+    progress(count) هر PROGRESS_INTERVAL ردیف فراخوانی می‌شود. با set شدن cancel_event
+    صدور متوقف، فایل ناقص حذف و ExportCancelled برانگیخته می‌شود.
+    """
+    exporter_class = EXPORTERS[fmt]
+    count = 0
+    try:
+        if exporter_class.binary:
+            f = open(filepath, 'wb')
+        else:
+            f = open(filepath, 'w', encoding=exporter_class.encoding, newline=exporter_class.newline)
+        with f:
+            exporter = exporter_class(f)
+            for count, customer in enumerate(customers, 1):
+                exporter.write(customer)
+                if count % PROGRESS_INTERVAL == 0:
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise ExportCancelled()
+                    if progress is not None:
+                        progress(count)
+            exporter.close()
+    except BaseException:
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        raise
+    if progress is not None:
+        progress(count)
+    logger.info("Exported %s customers to %s (%s)", count, filepath, fmt)
+    return count
+
+
+def export_text(customers, filepath):
+    """صدور لیست مشتریان به فایل متنی؛ تعداد ردیف‌های نوشته‌شده برگردانده می‌شود"""
+    return export_customers(customers, filepath, "txt")
@@ -0,0 +1,305 @@
+"""ورود و ادغام جریانی فایل مشتریان دفترهای دیگر (customers.json، JSONL یا CSV)
+
+ردیف‌ها جریانی خوانده، در پروسه‌های کارگر عادی‌سازی و اعتبارسنجی می‌شوند و با hash join روی hardware_id
+با مشتریان موجود ادغام می‌شوند. سمت ساخت جدول join_index است (hardware_id → زمان ایجاد و اثر نام و
+تلفن) و ردیف‌های پذیرفته‌شده‌ی همین فایل هم به آن اضافه می‌شوند، پس تکرار داخل فایل با همان سیاست حل می‌شود.
+نتیجه در گروه‌های batch_size با commit (معمولاً store.add_many) ثبت می‌شود.
+"""
+import json
+import logging
+import os
+import time
+
+from .batch import DEFAULT_CHUNK_SIZE, _chunks, _create_executor, iter_rows
+from .codes import generate_access_code, validate_hardware_id
+from .dates import parse_jalali
+
+logger = logging.getLogger(__name__)
+
+# keep: رکورد موجود می‌ماند، overwrite: ردیف ورودی جایگزین می‌شود، newest: created_at بزرگ‌تر برنده است
+POLICIES = ("keep", "overwrite", "newest")
+DEFAULT_POLICY = "keep"
+COMMIT_BATCH_SIZE = 5000
+READ_SIZE = 1024 * 1024
+
+
+class ImportReport:
+    """نتیجه‌ی یک ورود: شمار ردیف‌های افزوده، جایگزین، بدون تغییر و ردشده، خطاها و سرعت"""
+
+    def __init__(self, source, policy):
+        self.source = source
+        self.policy = policy
+        self.rows = 0
+        self.added = 0
+        self.replaced = 0
+        self.unchanged = 0
+        self.kept = 0
+        self.batches = 0
+        self.errors = []
+        self.elapsed = 0.0
+
+    @property
+    def committed(self):
+        return self.added + self.replaced
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    def add_error(self, line_no, hardware_id, message):
+        self.errors.append((line_no, hardware_id, message))
+
+    def summary(self):
+        return (f"{self.rows} rows, {self.added} added, {self.replaced} replaced, {self.unchanged} unchanged, "
+                f"{self.kept} kept ({self.policy}), {len(self.errors)} errors in {self.batches} batches, "
+                f"{self.elapsed:.2f}s ({self.rows_per_second:.0f} rows/s)")
+
+
+# ==================== خواندن جریانی customers.json ====================
+class _JsonStream:
+    """خواندن تکه‌ای یک سند JSON؛ مقادیر با raw_decode یکی‌یکی و بدون بارگذاری کل فایل تجزیه می‌شوند"""
+
+    def __init__(self, f):
+        self.f = f
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        data = self.f.read(READ_SIZE)
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+        self.eof = not data
+
+    def peek(self):
+        """نخستین نویسه‌ی غیرفاصله؛ در پایان فایل رشته‌ی خالی"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer) or self.eof:
+                return self.buffer[self.pos:self.pos + 1]
+            self._fill()
+
+    def expect(self, chars):
+        ch = self.peek()
+        if not ch or ch not in chars:
+            raise ValueError(f"expected {chars!r} in {self.f.name}, found {ch!r}")
+        self.pos += 1
+        return ch
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self._fill()
+                continue
+            # عددی که به انتهای تکه رسیده ممکن است در تکه‌ی بعد ادامه داشته باشد
+            if end == len(self.buffer) and not self.eof:
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+    def array(self):
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(",]") == "]":
+                return
+
+
+def iter_json_document(path):
+    """مشتریان customers.json (قالب اسنپ‌شات یا فهرست قدیمی) به صورت جریانی؛ خروجی (شماره رکورد، ردیف)"""
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        stream = _JsonStream(f)
+        if stream.peek() == "[":
+            rows = stream.array()
+        else:
+            rows = _snapshot_customers(stream)
+        for number, row in enumerate(rows, 1):
+            yield number, row if isinstance(row, dict) else {"_error": "row is not an object"}
+
+
+def _snapshot_customers(stream):
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        key = stream.value()
+        stream.expect(":")
+        if key == "customers":
+            yield from stream.array()
+        else:
+            stream.value()
+        if stream.expect(",}") == "}":
+            return
+
+
+def iter_import_rows(path):
+    """ردیف‌های فایل ورودی؛ .json سند کامل customers.json است و بقیه مانند تولید گروهی JSONL یا CSV"""
+    if os.path.splitext(path)[1].lower() == ".json":
+        return iter_json_document(path)
+    return iter_rows(path)
+
+
+# ==================== عادی‌سازی ====================
+def _created_at(row):
+    """created_at عددی یا تجزیه‌ی created_date شمسی؛ None اگر ردیف تاریخی نداشته باشد"""
+    value = row.get("created_at")
+    if value not in (None, ""):
+        return int(value)
+    text = row.get("created_date")
+    if text:
+        return parse_jalali(str(text))
+    return None
+
+
+def check_chunk(rows):
+    """عادی‌سازی و اعتبارسنجی یک دسته ردیف؛ در پروسه‌های کارگر اجرا می‌شود
+
+    کد دسترسی هر ردیف دوباره با generate_access_code ساخته می‌شود؛ ردیف بدون کد آن را می‌گیرد و
+    ردیفی که کدش با آن یکی نیست رد می‌شود.
+    """
+    results = []
+    for line_no, row in rows:
+        if "_error" in row:
+            results.append((line_no, str(row.get("hardware_id", "")), None, row["_error"]))
+            continue
+        name = str(row.get("name") or "").strip()
+        phone = str(row.get("phone") or "").strip()
+        hardware_id = str(row.get("hardware_id") or "").strip().upper()
+        access_code = str(row.get("access_code") or "").strip().upper()
+        if not (name and phone and hardware_id):
+            results.append((line_no, hardware_id, None, "empty field"))
+            continue
+        if not validate_hardware_id(hardware_id):
+            results.append((line_no, hardware_id, None, "invalid hardware ID"))
+            continue
+        expected = generate_access_code(hardware_id)
+        if access_code and access_code != expected:
+            results.append((line_no, hardware_id, None, "access code does not match hardware ID"))
+            continue
+        try:
+            created_at = _created_at(row)
+        except (ValueError, TypeError):
+            # مقدار غیرعددی مثل فهرست یا شیء در created_at فقط همین ردیف را رد می‌کند
+            results.append((line_no, hardware_id, None, "invalid created_at/created_date"))
+            continue
+        results.append((line_no, hardware_id, (name, phone, hardware_id, expected, created_at), None))
+    return results
+
+
+# ==================== ادغام ====================
+def _fingerprint(name, phone):
+    return hash((name, phone))
+
+
+def join_index(customers):
+    """سمت ساخت hash join: hardware_id → (created_at، اثر نام و تلفن) برای مشتریان موجود
+
+    منبعی که merge_keys() دارد (SQLite) فقط همین ستون‌ها را می‌خواند و دیکشنری مشتری نمی‌سازد.
+    """
+    if hasattr(customers, "merge_keys"):
+        rows = customers.merge_keys()
+    else:
+        rows = ((customer["hardware_id"], customer.get("name", ""), customer.get("phone", ""),
+                 customer.get("created_at")) for customer in customers)
+    return {hardware_id: (created_at, _fingerprint(name, phone)) for hardware_id, name, phone, created_at in rows}
+
+
+def _wins(policy, current_at, incoming_at):
+    """آیا ردیف ورودی بر رکورد موجود با همان شناسه غلبه می‌کند"""
+    if policy == "overwrite":
+        return True
+    if policy == "newest":
+        return incoming_at is not None and (current_at is None or incoming_at > current_at)
+    return False
+
+
+def import_customers(path, existing, commit, policy=DEFAULT_POLICY, created_at=None, workers=None,
+                     chunk_size=DEFAULT_CHUNK_SIZE, batch_size=COMMIT_BATCH_SIZE, progress=None):
+    """ورود جریانی فایل و ادغام با مشتریان موجود؛ ImportReport برگردانده می‌شود
+
+    existing مجموعه‌ی مشتریان یا خروجی join_index است. commit(customers) هر batch_size رکورد پذیرفته‌شده
+    و یک بار در پایان فراخوانی می‌شود و progress(rows) پس از هر commit. ردیف بدون تاریخ ایجاد،
+    created_at رکورد جایگزین‌شده یا created_at این ورود (پیش‌فرض اکنون) را می‌گیرد.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"unknown conflict policy: {policy}")
+    report = ImportReport(path, policy)
+    if created_at is None:
+        created_at = int(time.time())
+    started = time.perf_counter()
+    index = existing if isinstance(existing, dict) else join_index(existing)
+    pending = []
+
+    def flush():
+        if pending:
+            commit(list(pending))
+            report.batches += 1
+            pending.clear()
+        if progress is not None:
+            progress(report.rows)
+
+    def merge(results):
+        for line_no, hardware_id, record, error in results:
+            report.rows += 1
+            if error is not None:
+                report.add_error(line_no, hardware_id, error)
+                continue
+            name, phone, hardware_id, access_code, incoming_at = record
+            fingerprint = _fingerprint(name, phone)
+            current = index.get(hardware_id)
+            if current is None:
+                report.added += 1
+            elif current[1] == fingerprint and incoming_at in (None, current[0]):
+                report.unchanged += 1
+                continue
+            elif not _wins(policy, current[0], incoming_at):
+                report.kept += 1
+                continue
+            else:
+                report.replaced += 1
+            if incoming_at is None:
+                incoming_at = current[0] if current is not None and current[0] is not None else created_at
+            index[hardware_id] = (incoming_at, fingerprint)
+            pending.append({
+                "name": name,
+                "phone": phone,
+                "hardware_id": hardware_id,
+                "access_code": access_code,
+                "created_at": incoming_at
+            })
+            if len(pending) >= batch_size:
+                flush()
+
+    chunks = _chunks(iter_import_rows(path), chunk_size)
+    workers = workers or os.cpu_count() or 1
+    executor = _create_executor(workers)
+    if executor is None:
+        for chunk in chunks:
+            merge(check_chunk(chunk))
+    else:
+        with executor:
+            # نتیجه‌ها به ترتیب فایل ادغام می‌شوند تا سیاست‌ها بین ردیف‌های تکراری قطعی باشند
+            max_in_flight = workers * 2
+            in_flight = []
+            for chunk in chunks:
+                in_flight.append(executor.submit(check_chunk, chunk))
+                if len(in_flight) >= max_in_flight:
+                    merge(in_flight.pop(0).result())
+            for future in in_flight:
+                merge(future.result())
+    flush()
+
+    report.elapsed = time.perf_counter() - started
+    logger.info("Import %s: %s", path, report.summary())
+    return report
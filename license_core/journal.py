@@ -0,0 +1,546 @@
+"""ذخیره‌سازی ژورنالی اطلاعات مشتریان (اسنپ‌شات + لاگ افزایشی)"""
+import json
+import logging
+import os
+import threading
+
+from .changes import ChangeLog
+from .collection import CustomerCollection
+from .dates import backfill_created_at
+from .locking import FileLock
+from .metrics import metrics
+from .stats import CustomerStats, load_stats, save_stats
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+DEFAULT_COMPACT_THRESHOLD = 256 * 1024
+# ژورنال تا این نسبت از اندازه‌ی اسنپ‌شات رشد می‌کند تا هزینه‌ی بازنویسی اسنپ‌شات بزرگ بین نوشتن‌ها سرشکن شود
+COMPACT_RATIO = 0.5
+RETRY_DELAY = 1.0
+POLL_INTERVAL = 1.0
+LOCK_NAME = "customers.lock"
+
+
+def _stat(path):
+    """امضای فایل برای تشخیص جایگزینی یا تغییر؛ None اگر فایل وجود نداشته باشد"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def _size(path):
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+def _hardware_id(record):
+    return record.get("hardware_id") or record["customer"]["hardware_id"]
+
+
+class JournalStore:
+    """ذخیره‌ساز مشتریان با ژورنال افزایشی، نوشتن تاخیری و فشرده‌سازی پس‌زمینه
+
+    on_error در صورت تعیین، با خطای نوشتن از رشته‌ی کارگر فقط هنگام شروع خرابی یا تغییر خطا فراخوانی
+    می‌شود (نه در هر تلاش دوباره)؛ نخستین نوشتن موفق این وضعیت را پاک می‌کند. on_written پس از هر نوشتن
+موفق تغییرات محلی؛ رابط کاربری به جای flush() منتظر این فراخوانی می‌ماند.
+
+    چند ایستگاه (فرایند) می‌توانند یک پوشه‌ی داده را هم‌زمان باز کنند: نوشتن و فشرده‌سازی زیر قفل
+    فایل customers.lock انجام می‌شوند و seq هنگام نوشتن و پس از خواندن تغییرات دیگران تعیین می‌شود.
+    اگر on_change تعیین شده باشد، رشته‌ی کارگر هر poll_interval ثانیه با stat تغییر فایل‌ها را بررسی
+    می‌کند، فقط رکوردهای تازه‌ی ژورنال را می‌خواند و on_change را فراخوانی می‌کند؛ apply_changes() آنها را
+    روی مجموعه‌ی حافظه اعمال می‌کند.
+
+    هر نوشتن در فهرست تغییرات (changes) هم ثبت می‌شود تا گره‌های دیگر تغییرات پس از یک seq را دریافت کنند.
+    merge_remote() تغییرات گره‌های دیگر را با version می‌پذیرد؛ seq مانند ساعت لمپورت از هر نسخه‌ی دیده‌شده
+    جلو می‌افتد و تغییر دریافتی فقط اگر نسخه‌اش از آخرین تغییر همان شناسه بزرگ‌تر باشد نوشته می‌شود.
+
+    store.stats آمار افزایشی مجموعه است و با هر فشرده‌سازی همراه seq اسنپ‌شات در customers.stats.json
+    نوشته می‌شود؛ load() تا وقتی این فایل با اسنپ‌شات می‌خواند مشتریان را برای آمار نمی‌شمارد.
+    """
+
+    def __init__(self, data_dir, snapshot_name="customers.json", compact_threshold=DEFAULT_COMPACT_THRESHOLD,
+                 compact_records=False, poll_interval=POLL_INTERVAL):
+        self.data_dir = data_dir
+        os.makedirs(self.data_dir, exist_ok=True)
+        self.snapshot_file = os.path.join(self.data_dir, snapshot_name)
+        self.journal_file = os.path.splitext(self.snapshot_file)[0] + ".journal"
+        self.changes_file = os.path.splitext(self.snapshot_file)[0] + ".changes.db"
+        self.changes = None
+        self.stats_file = os.path.splitext(self.snapshot_file)[0] + ".stats.json"
+        self.compact_threshold = compact_threshold
+        self.compact_records = compact_records
+        self.customers = CustomerCollection()
+        self.stats = CustomerStats()
+        self.customers.add_observer(self.stats)
+        self.seq = 0
+        self.poll_interval = poll_interval
+        self.on_error = None
+        self.on_written = None
+        self.on_change = None
+        self.last_error = None
+        self._lock = threading.RLock()
+        self._wakeup = threading.Condition(self._lock)
+        self._queue = []
+        self._inflight = []
+        self._busy = False
+        self._compact_requested = False
+        self._stopping = False
+        self._writer = None
+        self._journal = None
+        self._journal_size = 0
+        self._file_lock = FileLock(os.path.join(self.data_dir, LOCK_NAME))
+        # بایت‌های خوانده‌شده‌ی ژورنال و امضای اسنپ‌شات در آخرین همگام‌سازی با دیسک
+        self._offset = 0
+        self._snapshot_stat = None
+        self._snapshot_seq = 0
+        # تغییرات ایستگاه‌های دیگر در انتظار apply_changes و seq آخرین نوشتن محلی هر شناسه
+        self._incoming = []
+        self._local_seq = {}
+
+    # ==================== بارگذاری ====================
+    def load(self):
+        """بارگذاری اسنپ‌شات و اجرای دوباره‌ی ژورنال"""
+        with self._file_lock, self._lock:
+            self._snapshot_stat = _stat(self.snapshot_file)
+            records, snapshot_seq, legacy = self._read_snapshot()
+            customers = CustomerCollection(records, compact=self.compact_records)
+            # پیش از اجرای ژورنال شمرده می‌شود؛ پس از آن افزودن و حذف‌های ژورنال هم در len(customers) آمده‌اند
+            dropped = len(records) - len(customers)
+            if dropped:
+                logger.warning("Dropped %s duplicate hardware IDs from snapshot", dropped)
+            # آمار از اسنپ‌شات شروع می‌شود و ناظر اجرای دوباره‌ی ژورنال است
+            stats = load_stats(self.stats_file, snapshot_seq, len(customers)) or CustomerStats(customers)
+            customers.add_observer(stats)
+            journal, self._offset = self._read_journal(truncate=True)
+            replayed, self.seq = self._replay(customers, journal, snapshot_seq)
+            self.customers = customers
+            self.stats = stats
+            self._open_journal()
+            self._snapshot_seq = snapshot_seq
+            self._sync_changes(journal, customers)
+            self._start_writer()
+            logger.info("Loaded %s customers (snapshot seq %s, %s journal records)", len(customers), snapshot_seq, replayed)
+            if (legacy and records) or dropped:
+                logger.info("Rewriting customers.json as journaled snapshot with created_at")
+                self.compact()
+            return self.customers
+
+    def read(self):
+        """خواندن اسنپ‌شات و ژورنال بدون هیچ نوشتنی؛ برای خواننده‌های فرایندهای دیگر
+
+        مجموعه‌ی تازه و آخرین seq برگردانده می‌شود؛ دنباله‌ی ناقص ژورنال فقط نادیده گرفته می‌شود.
+        """
+        records, snapshot_seq, _ = self._read_snapshot()
+        customers = CustomerCollection(records)
+        journal, _ = self._read_journal()
+        _, seq = self._replay(customers, journal, snapshot_seq)
+        return customers, seq
+
+    def snapshot(self):
+        """مشتریان در یک لحظه برای پیمایش در رشته‌ای جز رشته‌ی نویسنده‌ی مجموعه (مثلاً صدور پس‌زمینه)"""
+        with self._lock:
+            return list(self.customers)
+
+    def _read_snapshot(self):
+        """(رکوردها، seq، نیاز به بازنویسی)؛ قالب فهرستی قدیمی یا رکورد بدون created_at بازنویسی لازم دارد"""
+        if not os.path.exists(self.snapshot_file):
+            return [], 0, False
+        with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        records, seq = (data, 0) if isinstance(data, list) else (data.get("customers", []), data.get("seq", 0))
+        filled = backfill_created_at(records)
+        if filled:
+            logger.info("Derived created_at for %s customers from created_date", filled)
+        return records, seq, isinstance(data, list) or filled > 0
+
+    def _read_journal(self, offset=0, truncate=False):
+        """رکوردهای کامل ژورنال از بایت offset؛ (رکوردها، بایت پایان آخرین رکورد کامل)
+
+        truncate فقط زیر قفل فایل مجاز است؛ در غیر این صورت ممکن است نوشتن در حال انجام ایستگاه دیگری بریده شود.
+        """
+        records = []
+        if not os.path.exists(self.journal_file):
+            return records, 0
+        valid_size = offset
+        with open(self.journal_file, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete line")
+                    record = json.loads(line)
+                except ValueError:
+                    logger.warning("Truncated journal record at byte %s, discarding tail", valid_size)
+                    break
+                valid_size += len(line)
+                if record.get("op") == "add":
+                    backfill_created_at((record["customer"],))
+                records.append(record)
+        if truncate and valid_size != os.path.getsize(self.journal_file):
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(valid_size)
+        return records, valid_size
+
+    def _replay(self, customers, records, snapshot_seq):
+        seq = snapshot_seq
+        replayed = 0
+        for record in records:
+            if record.get("seq", 0) <= snapshot_seq:
+                continue
+            self._apply(customers, record)
+            seq = record["seq"]
+            replayed += 1
+        return replayed, seq
+
+    @staticmethod
+    def _apply(customers, record):
+        if record["op"] == "add":
+            customers.upsert(record["customer"])
+        elif record["op"] == "delete":
+            customers.remove(_hardware_id(record))
+
+    # ==================== ثبت تغییرات ====================
+    # تغییرات فوراً در حافظه اعمال و در صف نوشتن قرار می‌گیرند؛ دیسک فقط در رشته‌ی کارگر لمس می‌شود
+    def add(self, customer):
+        """افزودن یا جایگزینی مشتری و ثبت آن در ژورنال"""
+        with self._lock:
+            previous = self.customers.upsert(customer)
+            self._enqueue([{"op": "add", "customer": customer}])
+            return previous
+
+    def merge_remote(self, records):
+        """پذیرش تغییرات گره دیگر: رکوردهای add/delete با version = [clock، node]
+
+        تعارض روی hardware_id در رشته‌ی کارگر و زیر قفل فایل حل می‌شود؛ تغییرهای نوشته‌شده مانند تغییرات
+        ایستگاه‌های دیگر با apply_changes() به مجموعه‌ی حافظه می‌رسند.
+        """
+        with self._lock:
+            self._enqueue(records)
+
+    def add_many(self, customers):
+        """افزودن گروهی مشتریان؛ همه‌ی رکوردها با یک نوشتن و یک fsync ثبت می‌شوند
+
+        customers فقط یک بار پیمایش می‌شود و می‌تواند مولد باشد.
+        """
+        with self._lock:
+            records = []
+            for customer in customers:
+                self.customers.upsert(customer)
+                records.append({"op": "add", "customer": customer})
+            self._enqueue(records)
+
+    def remove(self, hardware_id):
+        """حذف مشتری بر اساس شناسه سخت‌افزاری و ثبت آن در ژورنال"""
+        with self._lock:
+            removed = self.customers.remove(hardware_id)
+            if removed is not None:
+                self._enqueue([{"op": "delete", "hardware_id": hardware_id}])
+            return removed
+
+    def _enqueue(self, records):
+        # seq در رشته‌ی کارگر و زیر قفل فایل تعیین می‌شود تا بین ایستگاه‌ها یکتا و صعودی بماند
+        self._queue.extend(records)
+        self._wakeup.notify_all()
+
+    # ==================== رشته‌ی کارگر ====================
+    def _start_writer(self):
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._run_writer, name="journal-writer", daemon=True)
+            self._writer.start()
+
+    def _run_writer(self):
+        while True:
+            with self._lock:
+                # بدون on_change کسی منتظر تغییرات دیگران نیست و نیازی به بررسی دوره‌ای نیست
+                timeout = self.poll_interval if self.on_change is not None else None
+                self._wakeup.wait_for(lambda: self._queue or self._compact_requested or self._stopping, timeout)
+                if self._stopping and (self.last_error is not None or not (self._queue or self._compact_requested)):
+                    return
+                records, self._queue = self._queue, []
+                self._inflight = records
+                compact = self._compact_requested
+                self._busy = True
+            error = None
+            changed = False
+            written = False
+            try:
+                if records or compact or self._changed_on_disk():
+                    with self._file_lock:
+                        changed = self._catch_up()
+                        self._sync_changes()
+                        if records:
+                            self._assign_seq(records)
+                            records, replicated = self._resolve_versions(records)
+                            if records:
+                                self._write(records)
+                                self._remember_local(records)
+                                written = True
+                            else:
+                                with self.changes.db:
+                                    self.changes.record([], self.seq)
+                            records = []
+                            if replicated:
+                                with self._lock:
+                                    self._incoming.extend(replicated)
+                                changed = True
+                        if compact or self._compact_due():
+                            self._compact()
+            except Exception as e:
+                error = e
+            with self._lock:
+                self._busy = False
+                self._inflight = []
+                previous_error = self.last_error
+                if error is None:
+                    self.last_error = None
+                    if compact:
+                        self._compact_requested = False
+                else:
+                    self._queue[:0] = records
+                    self.last_error = error
+                self._wakeup.notify_all()
+            if error is not None:
+                # تلاش‌های دوباره با همان خطا دوباره گزارش نمی‌شوند تا رابط کاربری پیام‌های پیاپی نشان ندهد
+                if repr(error) != repr(previous_error):
+                    logger.error("Error writing journal: %s", error)
+                    if self.on_error is not None:
+                        self.on_error(error)
+                else:
+                    logger.debug("Retrying journal write after: %s", error)
+                with self._lock:
+                    self._wakeup.wait_for(lambda: self._stopping, RETRY_DELAY)
+            if written and error is None and self.on_written is not None:
+                self.on_written()
+            if changed and self.on_change is not None:
+                self.on_change()
+
+    def _assign_seq(self, records):
+        for record in records:
+            version = record.get("version")
+            if version is not None:
+                # ساعت لمپورت: تغییر محلی بعدی از هر نسخه‌ی دیده‌شده بزرگ‌تر است و بر آن غلبه می‌کند
+                self.seq = max(self.seq, version[0])
+            self.seq += 1
+            record["seq"] = self.seq
+
+    def _resolve_versions(self, records):
+        """کنار گذاشتن تغییرات دریافتی که نسخه‌ی برابر یا جدیدتری از شناسه‌شان ثبت شده است
+
+        (رکوردهای نوشتنی، تغییرات دریافتی پذیرفته‌شده) برگردانده می‌شود؛ تغییرات محلی همیشه نوشته می‌شوند.
+        """
+        if not any("version" in record for record in records):
+            return records, []
+        latest = self.changes.versions({_hardware_id(record) for record in records if "version" in record})
+        kept = []
+        replicated = []
+        for record in records:
+            hardware_id = _hardware_id(record)
+            version = tuple(record.get("version") or (record["seq"], self.changes.node))
+            if "version" in record:
+                current = latest.get(hardware_id)
+                if current is not None and version <= tuple(current):
+                    continue
+                replicated.append(record)
+            latest[hardware_id] = version
+            kept.append(record)
+        if len(replicated) != len(records):
+            logger.info("Skipped %s remote changes with older versions",
+                        sum(1 for record in records if "version" in record) - len(replicated))
+        return kept, replicated
+
+    def _remember_local(self, records):
+        with self._lock:
+            for record in records:
+                self._local_seq[_hardware_id(record)] = record["seq"]
+
+    def _open_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(self.journal_file, 'ab')
+        self._journal_size = self._journal.tell()
+        if self.changes is None:
+            self.changes = ChangeLog.open(self.changes_file)
+
+    @metrics.timed("journal_write")
+    def _write(self, records):
+        metrics.inc("journal_records", len(records))
+        data = b"".join((json.dumps(record, ensure_ascii=False, default=dict) + "\n").encode("utf-8")
+                        for record in records)
+        self._journal.write(data)
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._journal_size += len(data)
+        self._offset += len(data)
+        with self.changes.db:
+            self.changes.record(records, self.seq)
+
+    # ==================== همگام‌سازی بین ایستگاه‌ها ====================
+    def _changed_on_disk(self):
+        """بررسی ارزان با stat؛ بدون قفل و بدون خواندن فایل‌ها"""
+        return _stat(self.snapshot_file) != self._snapshot_stat or _size(self.journal_file) != self._offset
+
+    @metrics.timed("journal_catch_up")
+    def _catch_up(self):
+        """خواندن تغییرات ایستگاه‌های دیگر زیر قفل فایل؛ True اگر تغییر تازه‌ای رسیده باشد"""
+        snapshot_stat = _stat(self.snapshot_file)
+        journal_size = _size(self.journal_file)
+        if snapshot_stat == self._snapshot_stat and journal_size == self._offset:
+            return False
+        if snapshot_stat != self._snapshot_stat or journal_size < self._offset:
+            # ایستگاه دیگری فشرده‌سازی کرده و مکان خواندن ژورنال دیگر معتبر نیست؛ وضعیت کامل خوانده
+            # و فقط تفاوت آن با حافظه به صورت رکورد تغییر برداشته می‌شود
+            records, snapshot_seq, _ = self._read_snapshot()
+            state = CustomerCollection(records)
+            journal, offset = self._read_journal(truncate=True)
+            _, seq = self._replay(state, journal, snapshot_seq)
+            changes = self._diff(state, seq)
+            self._snapshot_seq = snapshot_seq
+        else:
+            changes, offset = self._read_journal(self._offset, truncate=True)
+            seq = changes[-1]["seq"] if changes else self.seq
+        self._snapshot_stat = snapshot_stat
+        self._offset = self._journal_size = offset
+        with self._lock:
+            self.seq = max(self.seq, seq)
+            self._incoming.extend(changes)
+        if changes:
+            metrics.inc("journal_remote_records", len(changes))
+            logger.info("Read %s changes from other stations (seq %s)", len(changes), seq)
+        return bool(changes)
+
+    def _diff(self, state, seq):
+        """رکوردهای add/delete که مجموعه‌ی حافظه را به state می‌رسانند، همه با seq داده‌شده"""
+        changes = []
+        with self._lock:
+            for customer in state:
+                if self.customers.get(customer["hardware_id"]) != customer:
+                    changes.append({"op": "add", "customer": customer, "seq": seq})
+            for customer in self.customers:
+                if customer["hardware_id"] not in state:
+                    changes.append({"op": "delete", "hardware_id": customer["hardware_id"], "seq": seq})
+        return changes
+
+    def _sync_changes(self, journal=None, state=None):
+        """ثبت تغییراتی که در فهرست تغییرات نیامده‌اند؛ نخستین اجرا یا قطع برنامه پس از نوشتن ژورنال
+
+        تا وقتی ژورنال همه‌ی تغییرات پس از آخرین ثبت را دارد همان رکوردها ثبت می‌شوند؛ در غیر این صورت
+        وضعیت کامل (state یا خواندن از دیسک) با فهرست مقایسه می‌شود. فقط زیر قفل فایل.
+        """
+        recorded = self.changes.seq
+        if recorded >= self.seq:
+            # seq تغییرات دریافتی کنارگذاشته‌شده فقط در فهرست تغییرات ثبت شده است
+            self.seq = recorded
+            return
+        if recorded >= self._snapshot_seq:
+            if journal is None:
+                journal, _ = self._read_journal()
+            with self.changes.db:
+                self.changes.record([record for record in journal if record.get("seq", 0) > recorded], self.seq)
+            return
+        if state is None:
+            state, _ = self.read()
+        with self.changes.db:
+            count = self.changes.seed(state, self.seq)
+        logger.info("Recorded %s customers in the change list at seq %s", count, self.seq)
+
+    def apply_changes(self):
+        """اعمال تغییرات ایستگاه‌های دیگر روی store.customers؛ از همان رشته‌ای که مجموعه را تغییر می‌دهد
+
+        تغییری که برای شناسه‌اش نوشتن محلی جدیدتر یا در صف وجود دارد کنار گذاشته می‌شود (آخرین نوشتن برنده است).
+        رکوردهای اعمال‌شده برگردانده می‌شوند.
+        """
+        with self._lock:
+            incoming, self._incoming = self._incoming, []
+            if not incoming:
+                return []
+            pending = {_hardware_id(record) for record in self._queue + self._inflight}
+            applied = []
+            for record in incoming:
+                hardware_id = _hardware_id(record)
+                if hardware_id in pending or self._local_seq.get(hardware_id, 0) > record["seq"]:
+                    continue
+                self._apply(self.customers, record)
+                applied.append(record)
+            # تغییرات بعدی دیگران seq بزرگ‌تری دارند و نوشتن‌های محلی قدیمی‌تر دیگر لازم نیستند
+            last_seq = incoming[-1]["seq"]
+            self._local_seq = {key: seq for key, seq in self._local_seq.items() if seq > last_seq}
+            return applied
+
+    # ==================== فشرده‌سازی ====================
+    def compact(self, wait=False):
+        """درخواست ادغام ژورنال در اسنپ‌شات؛ در رشته‌ی کارگر انجام می‌شود"""
+        with self._lock:
+            self._compact_requested = True
+            self._wakeup.notify_all()
+            if wait:
+                self._wakeup.wait_for(lambda: not self._compact_requested or self.last_error is not None)
+                return self.last_error is None
+        return True
+
+    def _compact_due(self):
+        snapshot_size = self._snapshot_stat[1] if self._snapshot_stat is not None else 0
+        return self._journal_size >= max(self.compact_threshold, snapshot_size * COMPACT_RATIO)
+
+    @metrics.timed("journal_compact")
+    def _compact(self):
+        with self._lock:
+            # تا تغییرات دیگران اعمال نشده‌اند حافظه کامل نیست و اسنپ‌شات از فایل‌ها ساخته می‌شود
+            snapshot = list(self.customers) if not self._incoming else None
+            stats = self.stats.to_dict() if snapshot is not None else None
+            seq = self.seq
+        if snapshot is None:
+            state, seq = self.read()
+            snapshot = list(state)
+            stats = CustomerStats(state).to_dict()
+        logger.info("Compacting journal into snapshot at seq %s", seq)
+        tmp = self.snapshot_file + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            # رکوردهای فشرده (CustomerRecord) با default=dict به شیء JSON تبدیل می‌شوند. dumps رمزگذار C را به کار
+            # می‌برد و برای اسنپ‌شات‌های بزرگ چند برابر سریع‌تر از dump جریانی است
+            f.write(json.dumps({"format": SNAPSHOT_FORMAT, "seq": seq, "customers": snapshot}, ensure_ascii=False,
+                               default=dict))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_file)
+        save_stats(self.stats_file, stats, seq)
+        # هر رکوردی که تاکنون در ژورنال نوشته شده seq <= seq دارد و در اسنپ‌شات آمده است
+        self._journal.truncate(0)
+        os.fsync(self._journal.fileno())
+        self._journal_size = self._offset = 0
+        self._snapshot_stat = _stat(self.snapshot_file)
+        self._snapshot_seq = seq
+        logger.info("Journal compacted, %s customers in snapshot", len(snapshot))
+
+    # ==================== تخلیه و بستن ====================
+    def flush(self, timeout=None):
+        """انتظار تا نوشته شدن همه‌ی تغییرات صف؛ در صورت خطای نوشتن False برمی‌گرداند"""
+        with self._lock:
+            done = self._wakeup.wait_for(
+                lambda: (not self._queue and not self._busy) or self.last_error is not None, timeout
+            )
+            return bool(done) and self.last_error is None
+
+    def close(self):
+        """تخلیه‌ی صف، توقف رشته‌ی کارگر و بستن ژورنال"""
+        flushed = self.flush()
+        with self._lock:
+            if not flushed:
+                logger.error("Closing journal with %s unwritten changes", len(self._queue))
+            self._stopping = True
+            self._wakeup.notify_all()
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+        with self._lock:
+            if self.changes is not None:
+                self.changes.close()
+                self.changes = None
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+        return flushed
@@ -0,0 +1,78 @@
+"""قفل فایل بین فرایندها و ایستگاه‌ها (fcntl در لینوکس/اندروید، msvcrt در ویندوز)"""
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+RETRY_INTERVAL = 0.05
+
+
+class FileLock:
+    """قفل انحصاری روی یک فایل کمکی؛ در یک فرایند بازگشتی است و بین فرایندها انحصاری"""
+
+    def __init__(self, path, timeout=30.0):
+        self.path = path
+        self.timeout = timeout
+        self._file = None
+        self._depth = 0
+        self._thread_lock = threading.RLock()
+
+    def acquire(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        self._thread_lock.acquire()
+        if self._depth:
+            self._depth += 1
+            return
+        deadline = time.monotonic() + timeout
+        f = open(self.path, 'a+b')
+        try:
+            while not self._try_lock(f):
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"could not lock {self.path} within {timeout}s")
+                time.sleep(RETRY_INTERVAL)
+        except BaseException:
+            f.close()
+            self._thread_lock.release()
+            raise
+        self._file = f
+        self._depth = 1
+
+    def release(self):
+        self._depth -= 1
+        if not self._depth:
+            self._unlock(self._file)
+            self._file.close()
+            self._file = None
+        self._thread_lock.release()
+
+    @staticmethod
+    def _try_lock(f):
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    @staticmethod
+    def _unlock(f):
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.release()
+        return False
@@ -0,0 +1,141 @@
+"""لاگ‌گیری غیرمسدودکننده: صف در رشته‌ی فراخوان، نوشتن فایل در رشته‌ی پس‌زمینه
+
+سطح‌ها از فایل تنظیمات JSON و متغیرهای محیطی خوانده می‌شوند:
+
+    LICENSE_MANAGER_LOG_CONFIG=log_config.json
+    LICENSE_MANAGER_LOG_LEVEL=INFO
+    LICENSE_MANAGER_LOG_LEVELS=license_core.journal=DEBUG,__main__=WARNING
+"""
+import atexit
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import sys
+from datetime import datetime
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+ENV_CONFIG = "LICENSE_MANAGER_LOG_CONFIG"
+ENV_LEVEL = "LICENSE_MANAGER_LOG_LEVEL"
+ENV_LEVELS = "LICENSE_MANAGER_LOG_LEVELS"
+DEFAULT_CONFIG_FILE = "log_config.json"
+DEFAULT_CONFIG = {
+    "level": "INFO",
+    "levels": {},
+    "max_bytes": 5 * 1024 * 1024,
+    "backup_count": 14,
+}
+
+
+class CompressingRotatingFileHandler(logging.FileHandler):
+    """فایل لاگ با چرخش بر اساس حجم یا تغییر روز و فشرده‌سازی gzip نسخه‌های قدیمی"""
+
+    def __init__(self, log_dir, prefix="license_manager", max_bytes=DEFAULT_CONFIG["max_bytes"],
+                 backup_count=DEFAULT_CONFIG["backup_count"]):
+        self.log_dir = log_dir
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._day = datetime.now().strftime('%Y%m%d')
+        os.makedirs(log_dir, exist_ok=True)
+        super().__init__(os.path.join(log_dir, f"{prefix}.log"), encoding='utf-8')
+
+    def emit(self, record):
+        try:
+            if self._should_rollover():
+                self._rollover()
+        except Exception:
+            self.handleError(record)
+        super().emit(record)
+
+    def _should_rollover(self):
+        if datetime.now().strftime('%Y%m%d') != self._day:
+            return True
+        return self.max_bytes > 0 and self.stream is not None and self.stream.tell() >= self.max_bytes
+
+    def _rollover(self):
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+            archive = os.path.join(self.log_dir, f"{self.prefix}_{self._day}_{datetime.now().strftime('%H%M%S%f')}.log.gz")
+            with open(self.baseFilename, 'rb') as src, gzip.open(archive, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(self.baseFilename)
+            self._prune()
+        self._day = datetime.now().strftime('%Y%m%d')
+        self.stream = self._open()
+
+    def _prune(self):
+        archives = sorted(name for name in os.listdir(self.log_dir)
+                          if name.startswith(self.prefix + "_") and name.endswith(".log.gz"))
+        for name in archives[:max(len(archives) - self.backup_count, 0)]:
+            os.remove(os.path.join(self.log_dir, name))
+
+
+def load_log_config(config_path=None):
+    """خواندن تنظیمات لاگ از فایل JSON و سپس بازنویسی با متغیرهای محیطی"""
+    config = dict(DEFAULT_CONFIG, levels={})
+    config_path = config_path or os.environ.get(ENV_CONFIG) or DEFAULT_CONFIG_FILE
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                loaded = json.load(f)
+            config.update({key: value for key, value in loaded.items() if key != "levels"})
+            config["levels"].update(loaded.get("levels", {}))
+        except (OSError, ValueError) as e:
+            print(f"Ignoring invalid log config {config_path}: {e}", file=sys.stderr)
+    if os.environ.get(ENV_LEVEL):
+        config["level"] = os.environ[ENV_LEVEL]
+    for item in os.environ.get(ENV_LEVELS, "").split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip():
+            config["levels"][name.strip()] = level.strip()
+    return config
+
+
+def _level(value, name):
+    """سطح معتبر logging برای مقدار تنظیمات؛ مقدار نامعتبر با هشدار INFO می‌شود تا برنامه بالا بیاید"""
+    level = value if isinstance(value, int) and not isinstance(value, bool) else str(value).strip().upper()
+    if isinstance(level, int) or isinstance(logging.getLevelName(level), int):
+        return level
+    logging.getLogger(__name__).warning("Invalid log level %r for %s, using INFO", value, name)
+    return logging.INFO
+
+
+def apply_levels(config):
+    """اعمال سطح کلی و سطح هر زیرسیستم"""
+    logging.getLogger().setLevel(_level(config["level"], "root"))
+    for name, level in config["levels"].items():
+        logging.getLogger(name).setLevel(_level(level, name))
+
+
+def setup_logging(log_dir="logs", config_path=None):
+    """راه‌اندازی صف لاگ؛ هندلرهای موجود روی root (مثل کنسول Kivy) هم پشت صف منتقل می‌شوند"""
+    config = load_log_config(config_path)
+    root = logging.getLogger()
+
+    file_handler = CompressingRotatingFileHandler(
+        log_dir, max_bytes=config["max_bytes"], backup_count=config["backup_count"]
+    )
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    handlers = list(root.handlers)
+    if not handlers:
+        console = logging.StreamHandler(sys.stdout)
+        console.setFormatter(logging.Formatter(LOG_FORMAT))
+        handlers.append(console)
+    handlers.append(file_handler)
+
+    log_queue = queue.SimpleQueue()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    apply_levels(config)
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,175 @@
+"""متریک‌های سبک: شمارنده و زمان‌سنج با هیستوگرام و خروجی متنی Prometheus"""
+import bisect
+import functools
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "license_manager"
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RECENT_SIZE = 1024
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """هیستوگرام تجمعی با بازه‌های ثابت و نمونه‌های اخیر برای صدک‌ها"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, recent_size=RECENT_SIZE):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=recent_size)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def quantiles(self, quantiles=QUANTILES):
+        """صدک‌های نمونه‌های اخیر؛ در نبود نمونه دیکشنری خالی"""
+        values = sorted(self.recent)
+        if not values:
+            return {}
+        return {q: values[min(int(q * len(values)), len(values) - 1)] for q in quantiles}
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "started")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.metrics.observe(self.name, time.perf_counter() - self.started)
+        if exc_type is not None:
+            self.metrics.inc(self.name + "_errors")
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """ثبت شمارنده‌ها و زمان‌ها؛ با enabled=False همه‌ی فراخوانی‌ها بی‌اثرند"""
+
+    def __init__(self, prefix=PREFIX, enabled=True):
+        self.prefix = prefix
+        self.enabled = enabled
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    # ==================== ثبت ====================
+    def inc(self, name, amount=1):
+        """افزایش شمارنده"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name, seconds):
+        """ثبت یک مدت زمان در هیستوگرام name"""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def timer(self, name):
+        """زمان‌سنج برای with؛ خطاها در شمارنده‌ی name_errors شمرده می‌شوند"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def timed(self, name):
+        """دکوراتور زمان‌سنجی تابع"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    # ==================== گزارش ====================
+    def snapshot(self):
+        """خلاصه‌ی فعلی برای نمایش: شمارنده‌ها و برای هر زمان‌سنج تعداد، میانگین و صدک‌ها"""
+        with self._lock:
+            counters = dict(self.counters)
+            timers = {}
+            for name, histogram in self.histograms.items():
+                timers[name] = {
+                    "count": histogram.count,
+                    "mean": histogram.sum / histogram.count if histogram.count else 0.0,
+                    "max": max(histogram.recent) if histogram.recent else 0.0,
+                    "quantiles": histogram.quantiles(),
+                }
+        return {"counters": counters, "timers": timers}
+
+    def render_prometheus(self):
+        """متن قالب نمایش Prometheus"""
+        lines = []
+        with self._lock:
+            for name in sorted(self.counters):
+                metric = f"{self.prefix}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {self.counters[name]}")
+            for name in sorted(self.histograms):
+                histogram = self.histograms[name]
+                metric = f"{self.prefix}_{name}_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, count in zip(self._bucket_labels(histogram), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f"{metric}_sum {histogram.sum:.6f}")
+                lines.append(f"{metric}_count {histogram.count}")
+                recent = f"{self.prefix}_{name}_recent_seconds"
+                lines.append(f"# TYPE {recent} gauge")
+                for q, value in histogram.quantiles().items():
+                    lines.append(f'{recent}{{quantile="{q}"}} {value:.6f}')
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _bucket_labels(histogram):
+        return [repr(bound) for bound in histogram.buckets] + ["+Inf"]
+
+    def dump(self, filepath):
+        """نوشتن متریک‌ها در فایل متنی Prometheus (مثلاً برای textfile collector)"""
+        tmp = filepath + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp, filepath)
+        logger.info("Metrics written to %s", filepath)
+        return filepath
+
+
+metrics = Metrics(enabled=os.environ.get("LICENSE_MANAGER_METRICS", "1") != "0")
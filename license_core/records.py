@@ -0,0 +1,101 @@
+"""رکورد فشرده‌ی مشتری با __slots__ و شناسه/کد بسته‌بندی‌شده به بایت"""
+from collections.abc import Mapping
+
+FIELDS = ("name", "phone", "hardware_id", "access_code", "created_date", "created_at")
+HARDWARE_ID_LENGTH = 16
+ACCESS_CODE_GROUPS = 3
+ACCESS_CODE_GROUP_LENGTH = 4
+
+
+def pack_hardware_id(value):
+    """شناسه‌ی 16 رقمی هگز با حروف بزرگ به 8 بایت؛ هر مقدار دیگر بدون تغییر برگردانده می‌شود"""
+    if len(value) == HARDWARE_ID_LENGTH and value == value.upper():
+        try:
+            return bytes.fromhex(value)
+        except ValueError:
+            pass
+    return value
+
+
+def unpack_hardware_id(value):
+    return value.hex().upper() if isinstance(value, bytes) else value
+
+
+def pack_access_code(value):
+    """کد XXXX-XXXX-XXXX به 6 بایت؛ هر مقدار دیگر بدون تغییر برگردانده می‌شود"""
+    groups = value.split("-")
+    if (len(groups) == ACCESS_CODE_GROUPS and value == value.upper()
+            and all(len(group) == ACCESS_CODE_GROUP_LENGTH for group in groups)):
+        try:
+            return bytes.fromhex("".join(groups))
+        except ValueError:
+            pass
+    return value
+
+
+def unpack_access_code(value):
+    if not isinstance(value, bytes):
+        return value
+    digits = value.hex().upper()
+    return "-".join(digits[i:i + ACCESS_CODE_GROUP_LENGTH] for i in range(0, len(digits), ACCESS_CODE_GROUP_LENGTH))
+
+
+class CustomerRecord(Mapping):
+    """مشتری با دسترسی شبیه دیکشنری (customer["name"]، get، items، dict(customer))
+
+    شناسه و کد بسته‌بندی‌شده و سایر فیلدهای متنی به صورت UTF-8 نگه داشته می‌شوند؛ سربار bytes
+    نصف str غیر ASCII است. created_date و created_at فقط در صورت داشتن مقدار جزو کلیدها هستند.
+    فیلدهای ناشناخته در extra می‌مانند. رکوردها تغییرناپذیرند و برای ویرایش
+    رکورد تازه ساخته و upsert می‌شود.
+    """
+    __slots__ = ("_name", "_phone", "hardware_key", "access_key", "_created_date", "created_at", "extra")
+
+    def __init__(self, name, phone, hardware_id, access_code, created_date="", created_at=None, extra=None):
+        self._name = name.encode("utf-8")
+        self._phone = phone.encode("utf-8")
+        self.hardware_key = pack_hardware_id(hardware_id)
+        self.access_key = pack_access_code(access_code)
+        self._created_date = created_date.encode("utf-8")
+        self.created_at = created_at
+        self.extra = extra or None
+
+    @classmethod
+    def from_mapping(cls, customer):
+        if isinstance(customer, cls):
+            return customer
+        extra = {key: value for key, value in customer.items() if key not in FIELDS}
+        return cls(str(customer.get("name", "")), str(customer.get("phone", "")), customer["hardware_id"],
+                   customer.get("access_code", ""), str(customer.get("created_date", "")),
+                   customer.get("created_at"), extra)
+
+    def __getitem__(self, key):
+        if key == "name":
+            return self._name.decode("utf-8")
+        if key == "phone":
+            return self._phone.decode("utf-8")
+        if key == "hardware_id":
+            return unpack_hardware_id(self.hardware_key)
+        if key == "access_code":
+            return unpack_access_code(self.access_key)
+        if key == "created_date" and self._created_date:
+            return self._created_date.decode("utf-8")
+        if key == "created_at" and self.created_at is not None:
+            return self.created_at
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield from FIELDS[:4]
+        if self._created_date:
+            yield "created_date"
+        if self.created_at is not None:
+            yield "created_at"
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"CustomerRecord({dict(self)!r})"
@@ -0,0 +1,247 @@
+"""همگام‌سازی تغییرات بین گره‌های مدیر لایسنس روی سوکت TCP
+
+    python -m license_core sync-serve [--host 127.0.0.1] [--port 8303]
+    python -m license_core sync HOST[:PORT] [--interval SECONDS]
+
+پروتکل (هر پیام یک خط JSON):
+
+    سرور   {"node": ..., "seq": ..., "nonce": ...}
+    کلاینت {"since": آخرین seq دریافتی از این گره, "node": ..., "auth": HMAC-SHA256(key, nonce)}
+    سرور   جریان deflate از خطوط [seq, clock, node, hardware_id, مشتری یا null] و در پایان {"end": seq, "count": n}
+
+فقط تغییرات پس از since از فهرست تغییرات گره ارسال می‌شوند، نه کل مشتریان؛ تغییرهایی که مبدأشان خود کلاینت
+است هم کنار گذاشته می‌شوند. کلاینت تغییرات را با store.merge_remote ثبت می‌کند (تعارض روی hardware_id با
+نسخه‌ی بزرگ‌تر) و پس از ثبت کامل، seq پایان را برای آن گره در peers.json نگه می‌دارد. کلید مشترک اختیاری
+است؛ بدون آن هر کسی که به پورت دسترسی دارد کدهای دسترسی را دریافت می‌کند.
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import socket
+import time
+import zlib
+
+from .changes import ChangeLog
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_SYNC_PORT = 8303
+ENV_KEY = "LICENSE_MANAGER_SYNC_KEY"
+PEERS_NAME = "peers.json"
+REQUEST_TIMEOUT = 10.0
+CONNECT_TIMEOUT = 10.0
+READ_SIZE = 64 * 1024
+MERGE_BATCH_SIZE = 5000
+MAX_LINE = 64 * 1024
+
+
+class SyncError(Exception):
+    """گره مقابل درخواست همگام‌سازی را رد کرد یا پاسخ نامعتبر داد"""
+
+
+def sign(key, nonce):
+    return hmac.new(key.encode("utf-8"), nonce.encode("ascii"), hashlib.sha256).hexdigest()
+
+
+def _line(item):
+    return (json.dumps(item, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+# ==================== سرور ====================
+class ReplicationServer:
+    """ارسال تغییرات فهرست تغییرات یک پوشه‌ی داده به گره‌های دیگر؛ هر اتصال یک درخواست"""
+
+    def __init__(self, changes_file, host=DEFAULT_HOST, port=DEFAULT_SYNC_PORT, key=None):
+        self.changes_file = changes_file
+        self.host = host
+        self.port = port
+        self.key = key
+        self._server = None
+
+    async def handle(self, reader, writer):
+        changes = ChangeLog.open(self.changes_file)
+        compressor = zlib.compressobj()
+        try:
+            nonce = os.urandom(16).hex()
+            writer.write(_line({"node": changes.node, "seq": changes.seq, "nonce": nonce}))
+            await writer.drain()
+            try:
+                request = json.loads(await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT))
+                since = int(request.get("since", 0))
+            except (ValueError, TypeError, AttributeError, asyncio.TimeoutError):
+                writer.write(compressor.compress(_line({"error": "bad request"})) + compressor.flush())
+                return
+            if self.key and not hmac.compare_digest(sign(self.key, nonce), str(request.get("auth", ""))):
+                logger.warning("Rejected sync request from node %s: bad key", request.get("node"))
+                writer.write(compressor.compress(_line({"error": "unauthorized"})) + compressor.flush())
+                return
+            with metrics.timer("sync_serve"):
+                count, until = await self._send_changes(writer, compressor, changes, since, request.get("node"))
+            metrics.inc("sync_changes_sent", count)
+            logger.info("Sent %s changes (%s..%s] to node %s", count, since, until, request.get("node"))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            logger.error("Error serving sync request: %s", e)
+        finally:
+            changes.close()
+            writer.close()
+
+    @staticmethod
+    async def _send_changes(writer, compressor, changes, since, node):
+        # seq پایان پیش از خواندن گرفته می‌شود؛ تغییرات بعدی seq بزرگ‌تری دارند و در دور بعد می‌آیند
+        until = changes.seq
+        count = 0
+        chunk = []
+        for seq, clock, origin, hardware_id, customer in changes.since(since, until, node):
+            # متن JSON مشتری همان‌طور که در فهرست تغییرات ذخیره شده فرستاده می‌شود
+            chunk.append(f'[{seq},{clock},{json.dumps(origin)},{json.dumps(hardware_id)},{customer or "null"}]\n')
+            count += 1
+            if len(chunk) >= MERGE_BATCH_SIZE:
+                writer.write(compressor.compress("".join(chunk).encode("utf-8")))
+                await writer.drain()
+                chunk = []
+        chunk.append(json.dumps({"end": until, "count": count}) + "\n")
+        writer.write(compressor.compress("".join(chunk).encode("utf-8")) + compressor.flush())
+        await writer.drain()
+        return count, until
+
+    async def start(self):
+        self._server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Sync server listening on %s:%s", self.host, self.port)
+        return self._server
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+
+def serve(changes_file, host=DEFAULT_HOST, port=DEFAULT_SYNC_PORT, key=None):
+    """اجرای سرور همگام‌سازی تا Ctrl+C"""
+    try:
+        asyncio.run(ReplicationServer(changes_file, host, port, key).serve_forever())
+    except KeyboardInterrupt:
+        logger.info("Sync server stopped")
+
+
+# ==================== کلاینت ====================
+class SyncReport:
+    """نتیجه‌ی یک دریافت تغییرات از گره دیگر"""
+
+    def __init__(self, peer):
+        self.peer = peer
+        self.node = None
+        self.since = 0
+        self.until = 0
+        self.received = 0
+        self.bytes = 0
+        self.elapsed = 0.0
+
+    def summary(self):
+        return (f"{self.received} changes from node {self.node} ({self.peer}) in ({self.since}..{self.until}], "
+                f"{self.bytes} bytes in {self.elapsed:.2f}s")
+
+
+def load_peers(data_dir):
+    """آخرین seq دریافتی از هر گره"""
+    try:
+        with open(os.path.join(data_dir, PEERS_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_peers(data_dir, peers):
+    path = os.path.join(data_dir, PEERS_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(peers, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _record(item):
+    seq, clock, node, hardware_id, customer = item
+    if customer is None:
+        record = {"op": "delete", "hardware_id": hardware_id}
+    else:
+        record = {"op": "add", "customer": customer}
+    record["version"] = [clock, node]
+    return record
+
+
+def pull(store, host, port=DEFAULT_SYNC_PORT, key=None, timeout=CONNECT_TIMEOUT):
+    """دریافت تغییرات گره دیگر پس از آخرین seq دریافتی و سپردن آنها به store.merge_remote
+
+    since فقط پس از نوشته شدن همه‌ی تغییرات ذخیره می‌شود؛ قطع اتصال یعنی تکرار همان بازه در دور بعد که
+    چون نسخه‌ها برابرند بی‌اثر است. SyncReport برگردانده می‌شود.
+    """
+    report = SyncReport(f"{host}:{port}")
+    started = time.perf_counter()
+    peers = load_peers(store.data_dir)
+
+    def merge(batch):
+        # گروه قبلی باید نوشته شده باشد؛ در هر لحظه حداکثر دو گروه در حافظه است
+        if not store.flush():
+            raise SyncError(f"could not save received changes: {store.last_error}")
+        store.merge_remote(batch)
+        report.received += len(batch)
+
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        f = sock.makefile('rb')
+        hello = json.loads(f.readline(MAX_LINE))
+        report.node = hello["node"]
+        if report.node == store.changes.node:
+            raise SyncError("peer is this node")
+        report.since = peers.get(report.node, 0)
+        request = {"since": report.since, "node": store.changes.node}
+        if key:
+            request["auth"] = sign(key, hello["nonce"])
+        sock.sendall(_line(request))
+
+        decompressor = zlib.decompressobj()
+        pending = b""
+        batch = []
+        end = None
+        while end is None:
+            data = f.read1(READ_SIZE)
+            if not data:
+                raise SyncError("connection closed before the end of the change stream")
+            report.bytes += len(data)
+            *lines, pending = (pending + decompressor.decompress(data)).split(b"\n")
+            for line in lines:
+                item = json.loads(line)
+                if isinstance(item, dict):
+                    if "error" in item:
+                        raise SyncError(item["error"])
+                    end = item["end"]
+                    break
+                batch.append(_record(item))
+                if len(batch) >= MERGE_BATCH_SIZE:
+                    merge(batch)
+                    batch = []
+    if batch:
+        merge(batch)
+    if not store.flush():
+        raise SyncError(f"could not save received changes: {store.last_error}")
+    report.until = end
+    peers[report.node] = end
+    save_peers(store.data_dir, peers)
+    report.elapsed = time.perf_counter() - started
+    metrics.inc("sync_changes_received", report.received)
+    logger.info("Sync: %s", report.summary())
+    return report
@@ -0,0 +1,133 @@
+"""جستجوی افزایشی مشتریان با نمایه‌ی سه‌حرفی (trigram)"""
+import re
+import unicodedata
+
+SEARCH_FIELDS = ("name", "phone", "hardware_id", "access_code")
+GRAM_SIZE = 3
+
+_FIELD_SEPARATOR = "\x00"
+_TRANSLATION = str.maketrans({
+    "ي": "ی",  # ي عربی -> ی فارسی
+    "ى": "ی",  # ى -> ی
+    "ك": "ک",  # ك عربی -> ک فارسی
+    "ة": "ه",  # ة -> ه
+    "\u200c": None,  # نیم‌فاصله
+    "\u200d": None,
+    "\u200e": None,
+    "\u200f": None,
+    **{chr(0x06F0 + i): str(i) for i in range(10)},  # ارقام فارسی
+    **{chr(0x0660 + i): str(i) for i in range(10)},  # ارقام عربی
+})
+
+
+# فرم‌های نمایشی عربی (بدون U+FEFF) فقط در متن شکل‌دهی‌شده برای نمایش می‌آیند
+_PRESENTATION_FORMS = re.compile("[\uFB50-\uFDFF\uFE70-\uFEFC]")
+_LTR_RUN = re.compile("[0-9A-Za-z\u06F0-\u06F9\u0660-\u0669]+")
+
+
+def _logical_order(text):
+    """متن شکل‌دهی‌شده به ترتیب دیداری (نام‌هایی که پیش‌تر از کادر فارسی ذخیره شده‌اند) به ترتیب منطقی
+
+    کل متن وارونه و بخش‌های چپ‌به‌راست (ارقام و حروف لاتین) دوباره راست می‌شوند؛ NFKC سپس فرم‌های نمایشی را
+    به حروف پایه برمی‌گرداند.
+    """
+    if not _PRESENTATION_FORMS.search(text):
+        return text
+    return _LTR_RUN.sub(lambda match: match.group()[::-1], text[::-1])
+
+
+def normalize_text(text):
+    """یکسان‌سازی حروف عربی/فارسی، ارقام، نیم‌فاصله و متن نمایشی شکل‌دهی‌شده برای جستجو"""
+    if not text:
+        return ""
+    return unicodedata.normalize("NFKC", _logical_order(text)).translate(_TRANSLATION).casefold()
+
+
+def _document(customer):
+    return _FIELD_SEPARATOR.join(normalize_text(str(customer.get(field, ""))) for field in SEARCH_FIELDS)
+
+
+def filter_customers(customers, query):
+    """جستجوی خطی بدون ساخت نمایه؛ برای جستجوهای یک‌باره (مثلاً در خط فرمان)"""
+    query = normalize_text(query).strip()
+    if not query:
+        return []
+    return [customer for customer in customers if query in _document(customer)]
+
+
+def _grams(text):
+    return {field[i:i + GRAM_SIZE]
+            for field in text.split(_FIELD_SEPARATOR)
+            for i in range(len(field) - GRAM_SIZE + 1)}
+
+
+class SearchIndex:
+    """نمایه‌ی جستجوی مشتریان که با افزودن/حذف در مجموعه به‌روز می‌شود"""
+
+    def __init__(self, customers=()):
+        self._postings = {}
+        self._doc_ids = {}
+        self._docs = {}
+        self._next_id = 0
+        for customer in customers:
+            self.on_upsert(customer, None)
+
+    def __len__(self):
+        return len(self._docs)
+
+    # ==================== به‌روزرسانی افزایشی ====================
+    def on_upsert(self, customer, previous):
+        hardware_id = customer["hardware_id"]
+        doc_id = self._doc_ids.get(hardware_id)
+        if doc_id is None:
+            doc_id = self._next_id
+            self._next_id += 1
+            self._doc_ids[hardware_id] = doc_id
+        else:
+            self._unindex(doc_id)
+        text = _document(customer)
+        self._docs[doc_id] = (text, customer)
+        postings = self._postings
+        for gram in _grams(text):
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = {doc_id}
+            else:
+                posting.add(doc_id)
+
+    def on_remove(self, customer):
+        doc_id = self._doc_ids.pop(customer["hardware_id"], None)
+        if doc_id is not None:
+            self._unindex(doc_id)
+            del self._docs[doc_id]
+
+    def _unindex(self, doc_id):
+        text = self._docs[doc_id][0]
+        for gram in _grams(text):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(doc_id)
+                if not posting:
+                    del self._postings[gram]
+
+    # ==================== جستجو ====================
+    def search(self, query, limit=None):
+        """مشتریانی که عبارت جستجو در یکی از فیلدهایشان آمده، به ترتیب درج"""
+        query = normalize_text(query).strip()
+        if not query:
+            return []
+        if len(query) < GRAM_SIZE:
+            candidates = self._docs.keys()
+        else:
+            postings = []
+            for gram in _grams(query):
+                posting = self._postings.get(gram)
+                if posting is None:
+                    return []
+                postings.append(posting)
+            postings.sort(key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+        matches = sorted(doc_id for doc_id in candidates if query in self._docs[doc_id][0])
+        if limit is not None:
+            matches = matches[:limit]
+        return [self._docs[doc_id][1] for doc_id in matches]
@@ -0,0 +1,209 @@
+"""سرویس محلی تایید لایسنس روی asyncio
+
+    python -m license_core serve --port 8302
+
+    GET  /verify?hardware_id=...&access_code=...   -> {"valid": true}
+    POST /verify  {"hardware_id": "...", "access_code": "..."}
+    GET  /lookup?hardware_id=...                   -> {"found": true, "customer": {...}}
+    GET  /health                                   -> {"customers": N, "seq": N}
+    GET  /metrics                                  -> متن Prometheus
+
+داده‌ها فقط خوانده می‌شوند و با تغییر فایل‌های ذخیره‌ساز در پس‌زمینه دوباره بارگذاری می‌شوند.
+"""
+import asyncio
+import hmac
+import json
+import logging
+import os
+from urllib.parse import parse_qsl, urlsplit
+
+from .collection import CustomerCollection
+from .dates import display_date
+from .storage import create_store
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8302
+RELOAD_INTERVAL = 1.0
+MAX_BODY = 64 * 1024
+# فیلدهایی که lookup برمی‌گرداند؛ کد دسترسی هرگز از سرویس خارج نمی‌شود
+LOOKUP_FIELDS = ("name", "hardware_id", "created_at")
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large"}
+
+
+class VerificationServer:
+    """پاسخ‌گویی هم‌زمان به verify و lookup از نمایه‌ی هش درون حافظه"""
+
+    def __init__(self, data_dir, host=DEFAULT_HOST, port=DEFAULT_PORT, reload_interval=RELOAD_INTERVAL):
+        self.store = create_store(data_dir)
+        self.host = host
+        self.port = port
+        self.reload_interval = reload_interval
+        self.customers = CustomerCollection()
+        self.seq = 0
+        self._stamp = None
+        self._server = None
+        self._watcher = None
+
+    # ==================== بارگذاری ====================
+    def _file_stamp(self):
+        stamp = []
+        for path in (self.store.snapshot_file, self.store.journal_file):
+            try:
+                st = os.stat(path)
+                stamp.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def reload(self):
+        """خواندن دوباره‌ی ذخیره‌ساز و جایگزینی یکجای نمایه"""
+        # مهر زمانی پیش از خواندن گرفته می‌شود تا تغییرات حین خواندن در دور بعد دیده شوند
+        stamp = self._file_stamp()
+        with metrics.timer("server_reload"):
+            customers, seq = self.store.read()
+        self.customers, self.seq, self._stamp = customers, seq, stamp
+        logger.info("Verification index loaded: %s customers at seq %s", len(customers), seq)
+
+    async def _watch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            if self._file_stamp() == self._stamp:
+                continue
+            try:
+                await loop.run_in_executor(None, self.reload)
+            except Exception as e:
+                logger.error("Error reloading customer store: %s", e)
+
+    # ==================== پاسخ‌ها ====================
+    def verify(self, hardware_id, access_code):
+        customer = self.customers.get(hardware_id.strip().upper())
+        valid = customer is not None and hmac.compare_digest(
+            customer["access_code"].encode(), access_code.strip().upper().encode()
+        )
+        metrics.inc("verify_valid" if valid else "verify_invalid")
+        return valid
+
+    def lookup(self, hardware_id):
+        customer = self.customers.get(hardware_id.strip().upper())
+        if customer is None:
+            return {"found": False}
+        found = {field: customer.get(field, "") for field in LOOKUP_FIELDS}
+        found["created_date"] = display_date(customer)
+        return {"found": True, "customer": found}
+
+    def route(self, method, target, body):
+        """(status, content_type, payload) برای یک درخواست"""
+        url = urlsplit(target)
+        params = dict(parse_qsl(url.query))
+        if method == "POST" and body:
+            try:
+                params.update(json.loads(body))
+            except (ValueError, TypeError):
+                return 400, None, {"error": "invalid JSON body"}
+        elif method != "GET":
+            return 405, None, {"error": "method not allowed"}
+
+        if url.path == "/verify":
+            hardware_id = params.get("hardware_id")
+            access_code = params.get("access_code")
+            if not isinstance(hardware_id, str) or not isinstance(access_code, str):
+                return 400, None, {"error": "hardware_id and access_code are required"}
+            with metrics.timer("verify"):
+                return 200, None, {"valid": self.verify(hardware_id, access_code)}
+        if url.path == "/lookup":
+            hardware_id = params.get("hardware_id")
+            if not isinstance(hardware_id, str):
+                return 400, None, {"error": "hardware_id is required"}
+            with metrics.timer("lookup"):
+                return 200, None, self.lookup(hardware_id)
+        if url.path == "/health":
+            return 200, None, {"customers": len(self.customers), "seq": self.seq}
+        if url.path == "/metrics":
+            return 200, "text/plain; version=0.0.4", metrics.render_prometheus()
+        return 404, None, {"error": "not found"}
+
+    # ==================== HTTP ====================
+    async def handle(self, reader, writer):
+        """یک اتصال با پشتیبانی keep-alive"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, None, {"error": "bad request line"}, False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, None, {"error": "body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection == "keep-alive" or (version == "HTTP/1.1" and connection != "close")
+                status, content_type, payload = self.route(method.upper(), target, body)
+                await self._respond(writer, status, content_type, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            logger.error("Error handling verification request: %s", e)
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, content_type, payload, keep_alive):
+        if content_type is None:
+            content_type = "application/json"
+            payload = json.dumps(payload, ensure_ascii=False)
+        data = payload.encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+        )
+        await writer.drain()
+
+    # ==================== اجرا ====================
+    async def start(self):
+        self.reload()
+        self._server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._watcher = asyncio.ensure_future(self._watch())
+        logger.info("Verification server listening on %s:%s", self.host, self.port)
+        return self._server
+
+    async def stop(self):
+        self._watcher.cancel()
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+
+def run(data_dir, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """اجرای سرویس تا Ctrl+C"""
+    try:
+        asyncio.run(VerificationServer(data_dir, host, port).serve_forever())
+    except KeyboardInterrupt:
+        logger.info("Verification server stopped")
@@ -0,0 +1,182 @@
+"""آمار افزایشی مشتریان: شمار لایسنس‌ها به تفکیک روز و ماه شمسی و نام مشتری
+
+CustomerStats ناظر CustomerCollection است و با هر افزودن، ویرایش یا حذف فقط شمارنده‌های همان مشتری را
+تغییر می‌دهد؛ پرس‌وجوی داشبورد به تعداد مشتریان بستگی ندارد. ذخیره‌ساز JSON آمار را هنگام فشرده‌سازی کنار
+اسنپ‌شات در customers.stats.json می‌نویسد و ذخیره‌ساز SQLite آن را در جدول stats در همان تراکنش نوشتن
+به‌روز می‌کند؛ در شروع برنامه آمار بدون پیمایش مشتریان بارگذاری می‌شود.
+"""
+import heapq
+import json
+import logging
+import os
+from collections import Counter
+
+from .dates import jalali_day_key
+
+logger = logging.getLogger(__name__)
+
+STATS_FORMAT = 1
+KINDS = ("days", "months", "names")
+TOP_NAMES = 10
+# چند نام پرتکرار اول نگه داشته می‌شوند تا top_names بدون مرتب‌سازی همه‌ی نام‌ها پاسخ دهد
+TOP_CACHE_SIZE = 50
+
+
+def stat_keys(customer):
+    """(روز، ماه، نام) شمرده‌شده برای یک مشتری؛ روز و ماه برای مشتری بدون created_at None است"""
+    timestamp = customer.get("created_at")
+    day = jalali_day_key(timestamp) if timestamp is not None else None
+    return day, day[:7] if day is not None else None, str(customer.get("name", "")).strip()
+
+
+def _add(counter, key, delta):
+    value = counter[key] + delta
+    if value:
+        counter[key] = value
+    else:
+        del counter[key]
+
+
+class CustomerStats:
+    """شمارنده‌های روز ('1403/01/15')، ماه ('1403/01') و نام همراه با شمار کل
+
+    شمارنده‌ها می‌توانند منفی باشند؛ ذخیره‌ساز SQLite همین کلاس را برای تفاضل یک گروه نوشتن به کار می‌برد.
+    """
+
+    def __init__(self, customers=()):
+        self.total = 0
+        self.days = Counter()
+        self.months = Counter()
+        self.names = Counter()
+        self._top = None
+        self.update(customers)
+
+    # ==================== ناظر مجموعه ====================
+    def on_upsert(self, customer, previous):
+        if previous is not None:
+            if stat_keys(previous) == stat_keys(customer):
+                return
+            self.count(previous, -1)
+        self.count(customer, 1)
+
+    def on_remove(self, customer):
+        self.count(customer, -1)
+
+    def count(self, customer, delta):
+        day, month, name = stat_keys(customer)
+        self.total += delta
+        if day is not None:
+            _add(self.days, day, delta)
+            _add(self.months, month, delta)
+        _add(self.names, name, delta)
+        self._update_top(name, delta)
+
+    def update(self, customers, delta=1):
+        """count برای گروهی از مشتریان؛ شمارش هر کلید با Counter یک بار انجام می‌شود"""
+        keys = [stat_keys(customer) for customer in customers]
+        if not keys:
+            return
+        self.total += delta * len(keys)
+        for counter, counts in (
+            (self.days, Counter(day for day, _, _ in keys if day is not None)),
+            (self.months, Counter(month for _, month, _ in keys if month is not None)),
+            (self.names, Counter(name for _, _, name in keys)),
+        ):
+            for key, value in counts.items():
+                _add(counter, key, delta * value)
+        self._top = None
+
+    def _update_top(self, name, delta):
+        # هر نامی که در _top نیست حداکثر به اندازه‌ی آخرین نام آن تکرار شده است
+        top = self._top
+        if top is None:
+            return
+        if delta < 0:
+            if name in top:
+                self._top = None
+            return
+        if name in top or len(top) < TOP_CACHE_SIZE or self.names[name] > self.names[top[-1]]:
+            if name not in top:
+                top.append(name)
+            top.sort(key=self.names.__getitem__, reverse=True)
+            del top[TOP_CACHE_SIZE:]
+
+    # ==================== پرس‌وجو ====================
+    def day_count(self, day=None):
+        """شمار لایسنس‌های یک روز شمسی (پیش‌فرض امروز)"""
+        return self.days.get(day or jalali_day_key(), 0)
+
+    def month_count(self, month=None):
+        """شمار لایسنس‌های یک ماه شمسی (پیش‌فرض ماه جاری)"""
+        return self.months.get(month or jalali_day_key()[:7], 0)
+
+    def recent_days(self, limit=7):
+        """(روز، شمار) آخرین روزهای دارای لایسنس، جدیدترین اول"""
+        return heapq.nlargest(limit, self.days.items())
+
+    def recent_months(self, limit=6):
+        """(ماه، شمار) آخرین ماه‌های دارای لایسنس، جدیدترین اول"""
+        return heapq.nlargest(limit, self.months.items())
+
+    def top_names(self, limit=TOP_NAMES):
+        """(نام، شمار) مشتریان با بیشترین لایسنس"""
+        if limit > TOP_CACHE_SIZE:
+            return self.names.most_common(limit)
+        if self._top is None:
+            self._top = [name for name, _ in self.names.most_common(TOP_CACHE_SIZE)]
+        return [(name, self.names[name]) for name in self._top[:limit]]
+
+    # ==================== ذخیره ====================
+    def rows(self):
+        """(نوع، کلید، شمار) همه‌ی شمارنده‌ها؛ شمار کل با نوع total و کلید خالی"""
+        yield "total", "", self.total
+        for kind in KINDS:
+            for key, value in getattr(self, kind).items():
+                yield kind, key, value
+
+    @classmethod
+    def from_rows(cls, rows):
+        stats = cls()
+        for kind, key, value in rows:
+            if kind == "total":
+                stats.total = value
+            elif kind in KINDS:
+                getattr(stats, kind)[key] = value
+        return stats
+
+    def to_dict(self):
+        return {"total": self.total, **{kind: dict(getattr(self, kind)) for kind in KINDS}}
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.total = data["total"]
+        for kind in KINDS:
+            getattr(stats, kind).update(data[kind])
+        return stats
+
+
+def save_stats(path, stats, seq):
+    """نوشتن اتمی آمار همراه با seq اسنپ‌شاتی که از آن ساخته شده است"""
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({"format": STATS_FORMAT, "seq": seq, **stats}, ensure_ascii=False))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_stats(path, seq, total):
+    """آمار ذخیره‌شده اگر با اسنپ‌شات seq و total مشتری بخواند؛ در غیر این صورت None"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except ValueError as e:
+        logger.warning("Ignoring unreadable statistics file %s: %s", path, e)
+        return None
+    if data.get("format") != STATS_FORMAT or data.get("seq") != seq or data.get("total") != total:
+        logger.info("Statistics file %s is out of date, recounting", path)
+        return None
+    return CustomerStats.from_dict(data)
@@ -0,0 +1,30 @@
+"""انتخاب ذخیره‌ساز مشتریان: ژورنال JSON (پیش‌فرض) یا SQLite"""
+import os
+
+from .journal import JournalStore
+from .sqlite_store import DB_NAME, SqliteStore
+
+ENV_BACKEND = "LICENSE_MANAGER_BACKEND"
+BACKENDS = {
+    "json": JournalStore,
+    "sqlite": SqliteStore,
+}
+
+
+def detect_backend(data_dir):
+    """متغیر محیطی، سپس وجود customers.db؛ در غیر این صورت json"""
+    backend = os.environ.get(ENV_BACKEND)
+    if backend:
+        return backend
+    return "sqlite" if os.path.exists(os.path.join(data_dir, DB_NAME)) else "json"
+
+
+def create_store(data_dir, backend=None, **options):
+    """ساخت ذخیره‌ساز؛ بارگذاری با load() یا برای SQLite با open() به عهده‌ی فراخوان است
+
+    options به سازنده‌ی ذخیره‌ساز داده می‌شود (مثلاً compact_records=True).
+    """
+    backend = backend or detect_backend(data_dir)
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown storage backend: {backend}")
+    return BACKENDS[backend](data_dir, **options)
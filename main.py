@@ -4,45 +4,40 @@ from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
 from kivy.uix.button import Button
 from kivy.uix.popup import Popup
-from kivy.uix.scrollview import ScrollView
-from kivy.uix.gridlayout import GridLayout
+from kivy.uix.progressbar import ProgressBar
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
 from kivy.core.window import Window
-from kivy.core.text import LabelBase
+from kivy.clock import Clock
+from kivy.core.text import LabelBase, Label as CoreLabel
 from kivy.metrics import dp
 import hashlib
 import os
-import jdatetime
 import arabic_reshaper
 from bidi.algorithm import get_display
-import json
-from datetime import datetime
 import sys
 import logging
 import traceback
 import functools
+import re
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+from license_core.logging_config import setup_logging
+from license_core import (
+    EXPORTERS, CustomerCollection, ExportCancelled, SearchIndex, create_store,
+    default_export_path, display_date, export_customers, generate_access_code, generate_batch,
+    import_customers, join_index, make_customer, metrics, normalize_text, validate_hardware_id,
+)
 
 # ==================== تنظیمات لاگ‌گیری ====================
-def setup_logging():
-    """تنظیمات اولیه برای سیستم لاگ‌گیری"""
-    log_dir = "logs"
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-    
-    log_file = os.path.join(log_dir, f"license_manager_{datetime.now().strftime('%Y%m%d')}.log")
-    
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file, encoding='utf-8'),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
-    
-    return logging.getLogger(__name__)
+# نوشتن فایل در رشته‌ی پس‌زمینه؛ سطح‌ها از log_config.json یا متغیرهای محیطی LICENSE_MANAGER_LOG_*
+setup_logging("logs")
 
 # ایجاد لاگر اصلی
-logger = setup_logging()
+logger = logging.getLogger(__name__)
 
 # ==================== تابع برای لاگ کردن استثناها ====================
 def log_exception(exc_type, exc_value, exc_traceback):
@@ -58,22 +53,39 @@ sys.excepthook = log_exception
 
 # ==================== دکوراتور ساده‌شده برای لاگ کردن توابع ====================
 def log_function_call(func):
-    """دکوراتور ساده‌شده برای لاگ کردن فراخوانی توابع"""
+    """دکوراتور ساده‌شده برای لاگ کردن فراخوانی توابع؛ وقتی DEBUG خاموش است تقریباً هزینه‌ای ندارد"""
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
+        if not logger.isEnabledFor(logging.DEBUG):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                logger.error("Error in %s: %s", func.__name__, e)
+                raise
+        class_name = args[0].__class__.__name__ if args else ''
         try:
-            class_name = args[0].__class__.__name__ if args else ''
-            logger.debug(f"Calling {class_name}.{func.__name__}")
+            logger.debug("Calling %s.%s", class_name, func.__name__)
             result = func(*args, **kwargs)
-            logger.debug(f"Function {class_name}.{func.__name__} completed")
+            logger.debug("Function %s.%s completed", class_name, func.__name__)
             return result
         except Exception as e:
-            logger.error(f"Error in {func.__name__}: {str(e)}")
+            logger.error("Error in %s: %s", func.__name__, e)
             raise
     return wrapper
 
 # تنظیمات اولیه پنجره - کوچک کردن ابعاد
 MAX_WIDTH = dp(450)
+# اندازه‌ی صفحه‌ی لیست در حالت صفحه‌ای و فاصله از انتهای لیست (scroll_y) برای خواندن صفحه‌ی بعد
+LIST_PAGE_SIZE = 200
+PREFETCH_SCROLL = 0.2
+SEARCH_LIMIT = 500
+# تاخیر جستجو پس از آخرین کلید تا هر حرف یک جستجوی جدا نباشد
+SEARCH_DELAY = 0.2
+SORT_LABELS = {"created": "ترتیب: تاریخ", "name": "ترتیب: نام"}
+# رویدادهای پشت سر هم (مثل گروه‌های ورود فایل) در یک به‌روزرسانی داشبورد جمع می‌شوند
+STATS_REFRESH_DELAY = 0.3
+STATS_MONTHS = 6
+STATS_TOP_NAMES = 6
 Window.size = (MAX_WIDTH, dp(600))
 Window.minimum_width = max(MAX_WIDTH, 1)
 Window.minimum_height = max(dp(450), 1)
@@ -93,7 +105,7 @@ try:
     else:
         logger.warning("Application icon file not found (app-icon.png or app-icon.ico)")
 except Exception as e:
-    logger.error(f"Error setting application icon: {e}")
+    logger.error("Error setting application icon: %s", e)
 
 # Register Persian font
 try:
@@ -105,19 +117,254 @@ try:
         LabelBase.register(name="PersianFont", fn_regular="Arial")
         logger.warning("Persian font file not found, using Arial as fallback")
 except Exception as e:
-    logger.error(f"Error registering Persian font: {e}")
+    logger.error("Error registering Persian font: %s", e)
     LabelBase.register(name="PersianFont", fn_regular="Arial")
 
+# ==================== کش شکل‌دهی متن فارسی ====================
+# متن‌های ثابت رابط کاربری؛ یک بار در شروع برنامه شکل‌دهی می‌شوند و هرگز از کش خارج نمی‌شوند
+UI_STRINGS = (
+    "ورود به سیستم مدیریت لایسنس",
+    "رمز عبور را وارد کنید",
+    "ورود به سیستم",
+    "خطا",
+    "رمز عبور نامعتبر است",
+    "تایید",
+    "حذف",
+    "سیستم مدیریت لایسنس انطباق 302",
+    "تولید لایسنس جدید",
+    "نام شرکت/مشتری:",
+    "نام را وارد کنید",
+    "شماره تلفن:",
+    "تلفن را وارد کنید",
+    "شناسه سخت‌افزاری:",
+    "16 کاراکتر",
+    "تولید لایسنس",
+    "تولید گروهی",
+    "تغییر رمز",
+    "لایسنس‌های تولید شده:",
+    "جستجو (نام، تلفن، شناسه یا رمز)",
+    "خروجی",
+    "ترتیب: تاریخ",
+    "ترتیب: نام",
+    "قالب خروجی",
+    "متنی",
+    "اکسل",
+    "آفلاین",
+    "لغو",
+    "عیب‌یابی",
+    "ذخیره متریک‌ها",
+    "در حال صدور خروجی",
+    "صدور خروجی لغو شد",
+    "خروج از برنامه",
+    "تمام فیلدها را پر کنید",
+    "شناسه سخت‌افزاری نامعتبر است (باید 16 کاراکتر و فقط شامل اعداد و حروف A-F باشد)",
+    "مسیر فایل CSV یا JSONL (ستون‌ها: name, phone, hardware_id):",
+    "انصراف",
+    "شروع",
+    "تولید گروهی لایسنس",
+    "فایل ورودی پیدا نشد",
+    "تایید حذف",
+    "رمز عبور فعلی:",
+    "رمز عبور جدید:",
+    "تکرار رمز عبور جدید:",
+    "تغییر رمز عبور",
+    "رمز عبور فعلی را وارد کنید",
+    "رمز عبور جدید را وارد کنید",
+    "رمزهای عبور جدید مطابقت ندارند",
+    "رمز عبور فعلی نادرست است",
+    "موفق",
+    "تکراری",
+    "نتیجه تولید گروهی",
+    "ورود فایل",
+    "ورود و ادغام فایل مشتریان",
+    "مسیر فایل customers.json، JSONL یا CSV:",
+    "برای شناسه‌ی تکراری:",
+    "نگه داشتن موجود",
+    "جایگزینی",
+    "جدیدترین",
+    "نتیجه ورود فایل",
+    "رمز عبور با موفقیت تغییر یافت",
+    "بستن",
+    "ماه‌های اخیر:",
+    "بیشترین لایسنس:",
+)
+
+class ReshapeCache:
+    """کش LRU محدود برای reshape_bidi با شمارنده‌ی hit/miss و جدول ثابت متن‌های رابط کاربری"""
+    
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._static = {}
+        self._entries = OrderedDict()
+
+    def preload(self, strings):
+        """شکل‌دهی پیشاپیش متن‌های ثابت"""
+        for text in strings:
+            if text and text not in self._static:
+                self._static[text] = get_display(arabic_reshaper.reshape(text))
+        logger.info("Preloaded %s reshaped UI strings", len(self._static))
+
+    def get(self, text):
+        reshaped = self._static.get(text)
+        if reshaped is not None:
+            self.hits += 1
+            return reshaped
+        reshaped = self._entries.get(text)
+        if reshaped is not None:
+            self.hits += 1
+            self._entries.move_to_end(text)
+            return reshaped
+        self.misses += 1
+        reshaped = get_display(arabic_reshaper.reshape(text))
+        self._entries[text] = reshaped
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return reshaped
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "static": len(self._static),
+        }
+
+reshape_cache = ReshapeCache()
+
 def reshape_bidi(text):
     if not text:
         return ""
     try:
-        return get_display(arabic_reshaper.reshape(text))
+        return reshape_cache.get(text)
     except Exception as e:
-        logger.error(f"Error in reshape_bidi: {e}")
+        logger.error("Error in reshape_bidi: %s", e)
         return text
 
-class PersianLabel(Label):
+# ==================== کش تکسچر متن ====================
+# سقف پیکسل‌های تکسچرهای نگه‌داشته‌شده (RGBA، حدود 16 مگابایت)
+TEXTURE_CACHE_PIXELS = 4 * 1024 * 1024
+# LICENSE_MANAGER_PREWARM=0 گرم‌کردن فونت در شروع برنامه را غیرفعال می‌کند
+PREWARM_TEXT = os.environ.get("LICENSE_MANAGER_PREWARM", "1") != "0"
+PREWARM_FONT_SIZES = (10, 11, 12, 13, 14, 15, 16)
+# چند متن در هر فریم گرم می‌شوند تا شروع برنامه یک فریم طولانی نداشته باشد
+PREWARM_BATCH = 25
+
+class TextureCache:
+    """کش LRU تکسچرهای متن مشترک بین ویجت‌ها، با کلید متن شکل‌دهی‌شده و همه‌ی گزینه‌های رندر (اندازه، رنگ، عرض...)"""
+
+    def __init__(self, max_pixels=TEXTURE_CACHE_PIXELS):
+        self.max_pixels = max_pixels
+        self.pixels = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key(core_label):
+        # options["text"] فقط مقدار اولیه است؛ متن فعلی در core_label.text و text_size ویجت در usersize است
+        return (core_label.text, tuple(core_label.usersize)) + tuple((name, tuple(value) if isinstance(value, list) else value)
+                                          for name, value in core_label.options.items() if name != "text")
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, texture, is_shortened):
+        if key in self._entries:
+            return
+        self._entries[key] = (texture, is_shortened)
+        self.pixels += texture.width * texture.height
+        while self.pixels > self.max_pixels and len(self._entries) > 1:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self.pixels -= evicted.width * evicted.height
+
+    def discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.pixels -= entry[0].width * entry[0].height
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "pixels": self.pixels,
+            "max_pixels": self.max_pixels,
+        }
+
+texture_cache = TextureCache()
+
+class CachedTextureMixin:
+    """texture_update با تکسچر مشترک برای ویجت‌هایی که متن و گزینه‌های رندر یکسان دارند
+
+    تکسچر پیش از ورود به کش پر و از Label هسته جدا می‌شود؛ در غیر این صورت Label هسته در رندر بعدی با همان
+    اندازه، پیکسل‌های متن جدید را روی همان تکسچر مشترک می‌نوشت.
+    """
+
+    def texture_update(self, *largs):
+        core_label = self._label
+        if self.markup or not core_label.text:
+            return super().texture_update(*largs)
+        key = texture_cache.key(core_label)
+        entry = texture_cache.get(key)
+        if entry is not None:
+            self.texture, self.is_shortened = entry
+            self.texture_size = list(self.texture.size)
+            return
+        super().texture_update(*largs)
+        texture = self.texture
+        if texture is None or texture is core_label.texture_1px:
+            return
+        texture.bind()
+        # Label هسته پس از جدا شدن متن دیگری دارد؛ پس از بازسازی زمینه‌ی GL همین متن دوباره روی تکسچر مشترک رندر می‌شود
+        texture.remove_reload_observer(core_label._texture_refresh)
+        text, usersize, options = core_label.text, tuple(core_label.usersize), dict(core_label.options)
+        texture.add_reload_observer(lambda texture: rerender_texture(texture, key, text, usersize, options))
+        core_label.texture = None
+        texture_cache.put(key, texture, self.is_shortened)
+
+def rerender_texture(texture, key, text, usersize, options):
+    """پر کردن دوباره‌ی تکسچر مشترک پس از از دست رفتن زمینه‌ی GL تا ویجت‌هایی که آن را نشان می‌دهند خالی نمانند"""
+    core_label = CoreLabel(**options)
+    core_label.text = text
+    core_label.usersize = usersize
+    core_label.texture = texture
+    core_label.refresh()
+    if core_label.texture is not texture:
+        # اندازه‌ی رندر تغییر کرده و تکسچر تازه‌ای ساخته شده است؛ ورودی کش کنار گذاشته می‌شود
+        texture_cache.discard(key)
+
+def prewarm_text(strings, font_sizes=PREWARM_FONT_SIZES):
+    """بارگذاری فونت فارسی در اندازه‌های رابط کاربری و گلیف‌های متن‌های ثابت، PREWARM_BATCH متن در هر فریم
+
+    فقط گذر اندازه‌گیری CoreLabel اجرا می‌شود و تکسچری ساخته نمی‌شود: کلید texture_cache شامل عرض چیدمان هر
+    ویجت است و تکسچری که این‌جا ساخته شود هرگز با کلید ویجت‌ها پیدا نمی‌شد.
+    """
+    pending = iter([(size, text) for size in font_sizes for text in strings])
+
+    def step(dt):
+        batch = list(islice(pending, PREWARM_BATCH))
+        if not batch:
+            logger.info("Prewarmed %s UI strings at %s font sizes", len(strings), len(font_sizes))
+            return
+        with metrics.timer("prewarm_text"):
+            for size, text in batch:
+                core_label = CoreLabel(text=reshape_bidi(text), font_name="PersianFont", font_size=dp(size))
+                core_label.resolve_font_name()
+                core_label.render()
+        Clock.schedule_once(step)
+
+    Clock.schedule_once(step)
+
+class PersianLabel(CachedTextureMixin, Label):
     """Label امن برای نمایش فارسی (شکل‌دهی و راست‌چین) بدون حلقه بازگشتی."""
     
     def __init__(self, **kwargs):
@@ -139,7 +386,7 @@ class PersianLabel(Label):
         try:
             self.text_size = (self.width, None)
         except Exception as e:
-            logger.error(f"Error updating text size: {e}")
+            logger.error("Error updating text size: %s", e)
 
     def _set_reshaped_text(self, raw):
         try:
@@ -148,7 +395,7 @@ class PersianLabel(Label):
             super(Label, self).__setattr__("text", reshaped)
             self._updating = False
         except Exception as e:
-            logger.error(f"Error setting reshaped text: {e}")
+            logger.error("Error setting reshaped text: %s", e)
 
     def _on_text_changed(self, instance, value):
         if self._updating:
@@ -156,7 +403,7 @@ class PersianLabel(Label):
         self._raw_text = value
         self._set_reshaped_text(value)
 
-class PersianButton(Button):
+class PersianButton(CachedTextureMixin, Button):
     """Button با پشتیبانی از متن فارسی"""
     
     def __init__(self, **kwargs):
@@ -190,7 +437,7 @@ class PersianButton(Button):
             self.text_size = (width_for_text, None)
             self.shorten = False
         except Exception as e:
-            logger.error(f"Error updating button text size: {e}")
+            logger.error("Error updating button text size: %s", e)
 
     def _set_reshaped_text(self, raw):
         try:
@@ -199,7 +446,7 @@ class PersianButton(Button):
             super(Button, self).__setattr__("text", reshaped)
             self._updating = False
         except Exception as e:
-            logger.error(f"Error setting reshaped button text: {e}")
+            logger.error("Error setting reshaped button text: %s", e)
 
     def _on_text_changed(self, instance, value):
         if self._updating:
@@ -207,8 +454,27 @@ class PersianButton(Button):
         self._raw_text = value
         self._set_reshaped_text(value)
 
+# حروف عربی/فارسی پایه که هنوز شکل‌دهی نشده‌اند (فرم‌های نمایشی FB50 به بعد شامل نمی‌شوند)
+_NEEDS_SHAPING = re.compile("[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF]")
+
+_LATIN = re.compile("[A-Za-z]")
+
+def is_rtl(text):
+    """پاراگراف راست‌به‌چپ است اگر نخستین حرف قوی آن فارسی/عربی باشد"""
+    arabic = _NEEDS_SHAPING.search(text)
+    latin = _LATIN.search(text)
+    return arabic is not None and (latin is None or arabic.start() < latin.start())
+
 class PersianTextInput(TextInput):
-    """TextInput برای ورود فارسی"""
+    """TextInput برای ورود فارسی با متن منطقی جدا از متن نمایشی شکل‌دهی‌شده
+
+    text ویجت متن شکل‌دهی‌شده به ترتیب دیداری است و raw_text متنی که کاربر تایپ کرده و باید ذخیره یا جستجو شود.
+    وقتی متن حرف فارسی دارد، تایپ و پاک کردن روی انتهای raw_text انجام می‌شود و نمایش با تاخیر RESHAPE_DELAY از
+    کل آن دوباره ساخته می‌شود؛ متن بدون حرف فارسی (شناسه، تلفن، مسیر لاتین) مانند TextInput عادی ویرایش می‌شود.
+    مقداردهی مستقیم text (مثل پاک کردن فرم) raw_text را تعیین می‌کند.
+    """
+    
+    RESHAPE_DELAY = 0.05
     
     def __init__(self, **kwargs):
         logger.debug("Creating PersianTextInput")
@@ -224,45 +490,223 @@ class PersianTextInput(TextInput):
         kwargs.setdefault("background_color", (0.9, 0.9, 0.9, 1))
         super().__init__(**kwargs)
         self._updating = False
+        self.raw_text = ""
+        self._reshape_trigger = Clock.create_trigger(self._reshape, self.RESHAPE_DELAY)
         if hint:
             try:
                 super(TextInput, self).__setattr__("hint_text", reshape_bidi(hint))
             except Exception as e:
-                logger.error(f"Error setting hint text: {e}")
+                logger.error("Error setting hint text: %s", e)
         self.bind(text=self._on_text_changed)
+        if self.text:
+            self._on_text_changed(self, self.text)
 
     def _on_text_changed(self, instance, value):
         if self._updating:
             return
-        try:
-            cursor = self.cursor_index()
-        except Exception as e:
-            logger.error(f"Error getting cursor index: {e}")
-            cursor = None
-            
-        sel = None
-        try:
-            sel = self.selection_text
-        except Exception as e:
-            logger.error(f"Error getting selection text: {e}")
-            sel = None
-            
-        reshaped = reshape_bidi(value)
-        if reshaped == value:
+        # مقداردهی مستقیم یا ویرایش عادی متن بدون حرف فارسی؛ در هر دو حالت متن فعلی همان متن منطقی است
+        self.raw_text = value
+        if _NEEDS_SHAPING.search(value):
+            self._reshape_trigger()
+
+    def insert_text(self, substring, from_undo=False):
+        if self.readonly or not (_NEEDS_SHAPING.search(substring) or _NEEDS_SHAPING.search(self.raw_text)):
+            return super().insert_text(substring, from_undo=from_undo)
+        if self._selection:
+            self.delete_selection()
+        self.raw_text += substring
+        self._reshape_trigger()
+
+    def do_backspace(self, from_undo=False, mode='bkspc'):
+        if self.readonly or not _NEEDS_SHAPING.search(self.raw_text):
+            return super().do_backspace(from_undo=from_undo, mode=mode)
+        if self._selection:
+            self.delete_selection()
+            return
+        self.raw_text = self.raw_text[:-1]
+        self._reshape_trigger()
+
+    def delete_selection(self, from_undo=False):
+        if self.readonly or not self._selection or not _NEEDS_SHAPING.search(self.raw_text):
+            return super().delete_selection(from_undo=from_undo)
+        # جایگاه‌های متن نمایشی با متن منطقی یکی نیستند؛ انتخاب همه‌ی متن پاک و انتخاب بخشی از آن لغو می‌شود
+        if len(self.selection_text) == len(self.text):
+            self.raw_text = ""
+            self._reshape_trigger()
+        self.cancel_selection()
+
+    def _reshape(self, *args):
+        """ساخت متن نمایشی از raw_text؛ reshape_bidi کش دارد و تایپ پشت سر هم یک بار شکل‌دهی می‌شود"""
+        raw = self.raw_text
+        shaped = reshape_bidi(raw) if _NEEDS_SHAPING.search(raw) else raw
+        if shaped == self.text:
             return
-            
         self._updating = True
         try:
-            super(TextInput, self).__setattr__("text", reshaped)
-            if cursor is not None:
-                self.cursor = (cursor, 0)
-            if sel:
-                self.selection_text = sel
+            super(TextInput, self).__setattr__("text", shaped)
+            # انتهای متن منطقی در پاراگراف راست‌به‌چپ ابتدای متن نمایشی است
+            self.cursor = self.get_cursor_from_index(0 if is_rtl(raw) else len(shaped))
         except Exception as e:
-            logger.error(f"Error updating text input: {e}")
+            logger.error("Error updating text input: %s", e)
         finally:
             self._updating = False
 
+# ==================== پاپ‌آپ‌های بازیافتی ====================
+def set_raw_text(widget, text):
+    """تغییر متن ویجت فارسی فقط وقتی متن خام عوض شده باشد؛ متن تکراری دوباره شکل‌دهی نمی‌شود"""
+    if widget._raw_text != text:
+        widget.text = text
+
+
+class MessageDialog(Popup):
+    """پیام با یک دکمه"""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("size_hint", (0.7, 0.35))
+        kwargs.setdefault("title_align", "center")
+        super().__init__(**kwargs)
+        content = BoxLayout(orientation="vertical", spacing=dp(8), padding=dp(12))
+        self.message_label = PersianLabel(text="", font_size=dp(13), size_hint_y=None, height=dp(40))
+        self.button = PersianButton(text="تایید", size_hint=(1, None), height=dp(30))
+        self.button.bind(on_press=self.dismiss)
+        content.add_widget(self.message_label)
+        content.add_widget(self.button)
+        self.content = content
+
+    def show(self, title, message, button_text):
+        self.title = reshape_bidi(title)
+        set_raw_text(self.message_label, message)
+        set_raw_text(self.button, button_text)
+        self.open()
+
+
+class ConfirmDialog(Popup):
+    """پرسش تایید با دو دکمه؛ on_confirm فقط با دکمه‌ی تایید فراخوانی می‌شود"""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("size_hint", (0.7, 0.4))
+        kwargs.setdefault("title_align", "center")
+        super().__init__(**kwargs)
+        self._on_confirm = None
+        content = BoxLayout(orientation="vertical", spacing=dp(10), padding=dp(15))
+        self.message_label = PersianLabel(text="", font_size=dp(14), size_hint_y=None, height=dp(50))
+        buttons_layout = BoxLayout(orientation="horizontal", spacing=dp(10), size_hint_y=None, height=dp(40))
+        self.cancel_btn = PersianButton(text="انصراف", background_color=(0.6, 0.6, 0.6, 1))
+        self.confirm_btn = PersianButton(text="حذف", background_color=(0.8, 0.2, 0.2, 1))
+        self.cancel_btn.bind(on_press=self.dismiss)
+        self.confirm_btn.bind(on_press=self._confirmed)
+        buttons_layout.add_widget(self.cancel_btn)
+        buttons_layout.add_widget(self.confirm_btn)
+        content.add_widget(self.message_label)
+        content.add_widget(buttons_layout)
+        self.content = content
+
+    def show(self, title, message, on_confirm, confirm_text, cancel_text):
+        self.title = reshape_bidi(title)
+        set_raw_text(self.message_label, message)
+        set_raw_text(self.confirm_btn, confirm_text)
+        set_raw_text(self.cancel_btn, cancel_text)
+        self._on_confirm = on_confirm
+        self.open()
+
+    def _confirmed(self, instance):
+        on_confirm, self._on_confirm = self._on_confirm, None
+        self.dismiss()
+        if on_confirm is not None:
+            on_confirm()
+
+    def on_dismiss(self):
+        # callback پس از بسته شدن نگه داشته نمی‌شود تا مشتری یا صفحه‌ی قبلی آزاد شود
+        self._on_confirm = None
+
+
+class PasswordDialog(Popup):
+    """تغییر رمز عبور؛ on_submit(current, new, confirm) با بازگرداندن True پنجره را می‌بندد"""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("size_hint", (0.8, 0.5))
+        kwargs.setdefault("title_align", "center")
+        super().__init__(**kwargs)
+        self._on_submit = None
+        content = BoxLayout(orientation="vertical", spacing=dp(8), padding=dp(12))
+        self.inputs = []
+        for label in ("رمز عبور فعلی:", "رمز عبور جدید:", "تکرار رمز عبور جدید:"):
+            content.add_widget(PersianLabel(text=label, size_hint_y=None, height=dp(25), color=(1, 1, 1, 1)))
+            password_input = PersianTextInput(password=True, size_hint_y=None, height=dp(30))
+            content.add_widget(password_input)
+            self.inputs.append(password_input)
+        buttons_layout = BoxLayout(orientation="horizontal", spacing=dp(8), size_hint_y=None, height=dp(35))
+        cancel_btn = PersianButton(text="انصراف", size_hint_x=0.5, background_color=(0.85, 0.85, 0.85, 0.9))
+        change_btn = PersianButton(text="تغییر رمز", size_hint_x=0.5, background_color=(0.85, 0.85, 0.85, 0.9))
+        cancel_btn.bind(on_press=self.dismiss)
+        change_btn.bind(on_press=self._submitted)
+        buttons_layout.add_widget(cancel_btn)
+        buttons_layout.add_widget(change_btn)
+        content.add_widget(buttons_layout)
+        self.content = content
+
+    def show(self, title, on_submit):
+        self.title = reshape_bidi(title)
+        for password_input in self.inputs:
+            password_input.text = ""
+        self._on_submit = on_submit
+        self.open()
+
+    def _submitted(self, instance):
+        if self._on_submit is not None and self._on_submit(*(password_input.text for password_input in self.inputs)):
+            self.dismiss()
+
+    def on_dismiss(self):
+        self._on_submit = None
+        # رمزها پس از بسته شدن در ویجت باقی نمی‌مانند
+        for password_input in self.inputs:
+            password_input.text = ""
+
+
+class DialogManager:
+    """استخر پاپ‌آپ‌های از پیش ساخته که بین LoginScreen و MainScreen مشترک است
+
+    هر باز شدن فقط متن و callback یک پاپ‌آپ آزاد را عوض می‌کند؛ پاپ‌آپ تازه فقط وقتی ساخته می‌شود که همه‌ی
+    نمونه‌های آن نوع باز باشند (مثلاً پیام خطا روی پنجره‌ی تغییر رمز).
+    """
+
+    def __init__(self):
+        self._pools = {}
+
+    def _acquire(self, cls):
+        pool = self._pools.setdefault(cls, [])
+        for dialog in pool:
+            # تا پایان انیمیشن بسته شدن، پاپ‌آپ هنوز فرزند Window است
+            if dialog.parent is None:
+                return dialog
+        logger.debug("Building %s", cls.__name__)
+        metrics.inc("dialogs_built")
+        dialog = cls()
+        pool.append(dialog)
+        return dialog
+
+    def prewarm(self, *args):
+        """ساخت یک نمونه از هر پاپ‌آپ پیش از نخستین استفاده"""
+        for cls in (MessageDialog, ConfirmDialog, PasswordDialog):
+            self._acquire(cls)
+
+    @metrics.timed("dialog_open")
+    def message(self, title, message, button_text="تایید"):
+        logger.debug("Showing popup: %s - %s", title, message)
+        self._acquire(MessageDialog).show(title, message, button_text)
+
+    @metrics.timed("dialog_open")
+    def confirm(self, title, message, on_confirm, confirm_text="تایید", cancel_text="انصراف"):
+        self._acquire(ConfirmDialog).show(title, message, on_confirm, confirm_text, cancel_text)
+
+    @metrics.timed("dialog_open")
+    def change_password(self, on_submit):
+        self._acquire(PasswordDialog).show("تغییر رمز عبور", on_submit)
+
+
+dialogs = DialogManager()
+
+
 class LoginScreen(BoxLayout):
     
     def __init__(self, app_instance, **kwargs):
@@ -317,7 +761,7 @@ class LoginScreen(BoxLayout):
                 f.write(self.hash_password(default_password))
             logger.info("Default password setup completed")
         except Exception as e:
-            logger.error(f"Error setting up default password: {e}")
+            logger.error("Error setting up default password: %s", e)
 
     def hash_password(self, password):
         return hashlib.sha256(password.encode()).hexdigest()
@@ -339,30 +783,19 @@ class LoginScreen(BoxLayout):
                 logger.warning("Invalid password attempt")
                 self.show_popup("خطا", "رمز عبور نامعتبر است")
         except Exception as e:
-            logger.error(f"Error during password check: {e}")
+            logger.error("Error during password check: %s", e)
             self.show_popup("خطا", str(e))
 
     def show_popup(self, title, message):
-        logger.debug(f"Showing popup: {title} - {message}")
         try:
-            content = BoxLayout(orientation="vertical", spacing=dp(8), padding=dp(12))
-            content.add_widget(PersianLabel(text=message, font_size=dp(13), size_hint_y=None, height=dp(35)))
-            btn = PersianButton(text="تایید", size_hint=(1, None), height=dp(25))
-            popup = Popup(
-                title=reshape_bidi(title), 
-                content=content, 
-                size_hint=(0.7, 0.35),
-                title_align='center'
-            )
-            btn.bind(on_press=popup.dismiss)
-            content.add_widget(btn)
-            popup.open()
+            dialogs.message(title, message)
         except Exception as e:
-            logger.error(f"Error showing popup: {e}")
+            logger.error("Error showing popup: %s", e)
 
-class CustomerItem(BoxLayout):
+class CustomerItem(RecycleDataViewBehavior, BoxLayout):
+    """ردیف قابل بازیافت لیست مشتریان"""
     
-    def __init__(self, customer, remove_callback, **kwargs):
+    def __init__(self, **kwargs):
         logger.debug("Creating CustomerItem")
         super().__init__(**kwargs)
         self.orientation = "horizontal"
@@ -370,11 +803,11 @@ class CustomerItem(BoxLayout):
         self.height = dp(25)
         self.padding = [dp(4), dp(2)]
         self.spacing = dp(4)
+        self.customer = None
+        self.list_view = None
         
-        info_text = f"{customer['name']} | {customer['phone']} | {customer['hardware_id']} | {customer['access_code']} | {customer['created_date']}"
-        
-        info_label = PersianLabel(
-            text=info_text,
+        self.info_label = PersianLabel(
+            text="",
             font_size=dp(10),
             halign="right",
             size_hint_x=0.85,
@@ -390,11 +823,249 @@ class CustomerItem(BoxLayout):
             height=dp(25),
             background_color=(0.8, 0.2, 0.2, 1)
         )
-        delete_btn.bind(on_press=lambda x: remove_callback(customer))
+        delete_btn.bind(on_press=self._on_delete)
         
-        self.add_widget(info_label)
+        self.add_widget(self.info_label)
         self.add_widget(delete_btn)
 
+    def refresh_view_attrs(self, rv, index, data):
+        customer = data["customer"]
+        self.list_view = rv
+        if customer is not self.customer:
+            self.customer = customer
+            self.info_label.text = f"{customer['name']} | {customer['phone']} | {customer['hardware_id']} | {customer['access_code']} | {display_date(customer)}"
+
+    def _on_delete(self, instance):
+        if self.customer is not None and self.list_view is not None:
+            self.list_view.remove_callback(self.customer)
+
+class CustomerList(RecycleView):
+    """لیست مجازی مشتریان که فقط برای ردیف‌های قابل مشاهده ویجت می‌سازد
+
+    ردیف‌ها پنجره‌ای نگه داشته می‌شوند: ابتدا یک صفحه و با نزدیک شدن به انتهای لیست صفحه‌ی بعد، تا
+    RecycleView با صدها هزار مشتری هم فقط ردیف‌های خوانده‌شده را چیدمان کند. فهرست ثابت (set_customers)
+    و مجموعه‌ی حافظه (mirror) در همین رشته برش داده می‌شوند و منبع صفحه‌ای (show_pages) در رشته‌ی پس‌زمینه.
+    در حالت mirror ناظر مجموعه است و هر افزودن، ویرایش یا حذف با نگاشت شناسه به ردیف فقط همان ردیف را
+    تغییر می‌دهد؛ مشتری تازه وقتی همه‌ی صفحه‌ها خوانده شده باشند به انتها اضافه می‌شود و در غیر این صورت
+    با صفحه‌ی بعد می‌آید.
+    """
+    
+    def __init__(self, remove_callback, **kwargs):
+        super().__init__(**kwargs)
+        self.remove_callback = remove_callback
+        self.mirroring = None
+        self._observed = None
+        self._rows = None
+        self._pages = None
+        self._positions = None
+        self._cursor = None
+        self._exhausted = False
+        self._loading = False
+        self._generation = 0
+        layout = RecycleBoxLayout(
+            orientation="vertical",
+            spacing=dp(4),
+            default_size=(None, dp(25)),
+            default_size_hint=(1, None),
+            size_hint_y=None
+        )
+        layout.bind(minimum_height=layout.setter("height"))
+        self.add_widget(layout)
+        self.viewclass = CustomerItem
+
+    def set_customers(self, customers):
+        """نمایش فهرست ثابت (مثل نتیجه‌ی جستجو)؛ همگامی با مجموعه متوقف می‌شود"""
+        self._show_rows(list(customers))
+
+    def mirror(self, collection):
+        """نمایش مشتریان مجموعه و دنبال کردن تغییرات آن"""
+        if self.mirroring is collection:
+            return
+        if self._observed is not collection:
+            collection.add_observer(self)
+            self._observed = collection
+        self._show_rows(collection)
+        self.mirroring = collection
+
+    def show_pages(self, source, order="created"):
+        """نمایش صفحه‌ای از منبعی با page(after, limit, order)؛ لیست از صفحه‌ی اول دوباره شروع می‌شود"""
+        self._stop_modes()
+        self._pages = (source, order)
+        self.data = []
+        self.scroll_y = 1
+        self.load_next_page()
+
+    def _show_rows(self, rows):
+        self._stop_modes()
+        self._rows = rows
+        self.data = []
+        self.scroll_y = 1
+        self.load_next_page()
+
+    def _stop_modes(self):
+        self.mirroring = None
+        self._rows = None
+        self._pages = None
+        self._positions = None
+        self._cursor = None
+        self._exhausted = False
+        self._loading = False
+        # صفحه‌هایی که پس از این برسند متعلق به نمایش قبلی‌اند و کنار گذاشته می‌شوند
+        self._generation += 1
+
+    def on_scroll_y(self, instance, value):
+        if value <= PREFETCH_SCROLL:
+            self.load_next_page()
+
+    def load_next_page(self):
+        if self._loading or self._exhausted:
+            return
+        if self._rows is not None:
+            # فهرست و مجموعه‌ی حافظه در رشته‌ی رابط کاربری تغییر می‌کنند و همین‌جا برش داده می‌شوند؛
+            # ردیف‌های حذف‌شده از data هم حذف شده‌اند و شمار data جایگاه صفحه‌ی بعد است
+            start = len(self.data)
+            rows = self._rows
+            page = rows[start:start + LIST_PAGE_SIZE] if isinstance(rows, list) else \
+                list(islice(rows, start, start + LIST_PAGE_SIZE))
+            self._exhausted = start + len(page) >= len(rows)
+            self._append(page)
+            return
+        if self._pages is None:
+            return
+        self._loading = True
+        source, order = self._pages
+        threading.Thread(target=self._fetch_page, args=(source, order, self._cursor, self._generation),
+                         name="list-page", daemon=True).start()
+
+    def _fetch_page(self, source, order, cursor, generation):
+        try:
+            with metrics.timer("list_page"):
+                customers, cursor = source.page(cursor, LIST_PAGE_SIZE, order)
+        except Exception as e:
+            logger.error("Error loading customers page: %s", e)
+            customers = None
+        Clock.schedule_once(lambda dt: self._add_page(generation, customers, cursor))
+
+    def _add_page(self, generation, customers, cursor):
+        if generation != self._generation:
+            return
+        self._loading = False
+        if customers is None:
+            return
+        self._cursor = cursor
+        self._exhausted = len(customers) < LIST_PAGE_SIZE
+        self._append(customers)
+
+    def _append(self, customers):
+        start = len(self.data)
+        self.data.extend({"customer": customer} for customer in customers)
+        if self._positions is not None:
+            self._positions.update((customer["hardware_id"], i) for i, customer in enumerate(customers, start))
+
+    def _index_of(self, customer):
+        # نگاشت شناسه به ردیف با اولین نیاز ساخته و پس از حذف یک ردیف دوباره ساخته می‌شود
+        if self._positions is None:
+            self._positions = {row["customer"]["hardware_id"]: i for i, row in enumerate(self.data)}
+        return self._positions.get(customer["hardware_id"])
+
+    def on_upsert(self, customer, previous):
+        if self.mirroring is None:
+            return
+        index = self._index_of(customer) if previous is not None else None
+        if index is not None:
+            self.data[index] = {"customer": customer}
+        elif previous is None and self._exhausted:
+            self._append([customer])
+
+    def on_remove(self, customer):
+        if self.mirroring is None:
+            return
+        index = self._index_of(customer)
+        if index is not None:
+            self.data.pop(index)
+            self._positions = None
+
+class StatsPanel(BoxLayout):
+    """داشبورد آمار: خلاصه‌ی امروز، ماه جاری و کل؛ لمس خلاصه ماه‌های اخیر و پرتکرارترین مشتریان را نشان می‌دهد
+
+    فقط store.stats خوانده می‌شود که شمارنده‌های آماده‌اند؛ هزینه‌ی به‌روزرسانی به تعداد مشتریان بستگی ندارد.
+    در حالت مجموعه‌ی حافظه ناظر مجموعه است و هر تغییر یک به‌روزرسانی تاخیری زمان‌بندی می‌کند.
+    """
+
+    def __init__(self, store, **kwargs):
+        kwargs.setdefault("orientation", "vertical")
+        kwargs.setdefault("size_hint_y", None)
+        super().__init__(**kwargs)
+        self.store = store
+        self.expanded = False
+        self.summary_btn = PersianButton(
+            text="",
+            font_size=dp(11),
+            height=dp(26),
+            background_color=(0.15, 0.35, 0.45, 1)
+        )
+        self.summary_btn.bind(on_press=self.toggle)
+        self.details = BoxLayout(orientation="horizontal", spacing=dp(8), size_hint_y=None, height=0, opacity=0)
+        self.months_label = PersianLabel(text="", font_size=dp(10), size_hint_y=1, valign="top")
+        self.names_label = PersianLabel(text="", font_size=dp(10), size_hint_y=1, valign="top")
+        self.details.add_widget(self.names_label)
+        self.details.add_widget(self.months_label)
+        self.add_widget(self.summary_btn)
+        self.add_widget(self.details)
+        self.height = self.summary_btn.height
+        self._refresh_trigger = Clock.create_trigger(self.refresh, STATS_REFRESH_DELAY)
+        self.refresh()
+
+    def toggle(self, instance=None):
+        self.expanded = not self.expanded
+        self.details.height = dp(20) * (max(STATS_MONTHS, STATS_TOP_NAMES) + 1) if self.expanded else 0
+        self.details.opacity = 1 if self.expanded else 0
+        self.height = self.summary_btn.height + self.details.height
+        if self.expanded:
+            self.refresh()
+
+    def schedule_refresh(self):
+        self._refresh_trigger()
+
+    def refresh(self, dt=None):
+        try:
+            with metrics.timer("stats_refresh"):
+                stats = self.store.stats
+                self.summary_btn.text = (f"امروز: {stats.day_count()}  |  این ماه: {stats.month_count()}  |  "
+                                         f"کل: {stats.total}")
+                if not self.expanded:
+                    return
+                self.months_label.text = "\n".join(["ماه‌های اخیر:"] + [
+                    f"{month}: {count}" for month, count in stats.recent_months(STATS_MONTHS)])
+                self.names_label.text = "\n".join(["بیشترین لایسنس:"] + [
+                    f"{name}: {count}" for name, count in stats.top_names(STATS_TOP_NAMES)])
+        except Exception as e:
+            logger.error("Error refreshing statistics: %s", e)
+
+    def on_upsert(self, customer, previous):
+        self._refresh_trigger()
+
+    def on_remove(self, customer):
+        self._refresh_trigger()
+
+class ChangeRecorder:
+    """ناظری که تغییرات مجموعه را تا آماده شدن نمایه‌ی پس‌زمینه نگه می‌دارد"""
+
+    def __init__(self):
+        self.events = []
+
+    def on_upsert(self, customer, previous):
+        self.events.append(("on_upsert", (customer, previous)))
+
+    def on_remove(self, customer):
+        self.events.append(("on_remove", (customer,)))
+
+    def replay(self, observer):
+        """اعمال تغییرات ضبط‌شده به ترتیب؛ تغییری که در اسنپ‌شات هم آمده دوباره بی‌اثر است"""
+        for name, args in self.events:
+            getattr(observer, name)(*args)
+        self.events = []
+
 class MainScreen(BoxLayout):
     
     def __init__(self, **kwargs):
@@ -407,10 +1078,23 @@ class MainScreen(BoxLayout):
         self.width = MAX_WIDTH
 
         self.data_dir = "license_data"
-        os.makedirs(self.data_dir, exist_ok=True)
-        self.customers_file = os.path.join(self.data_dir, "customers.json")
+        # ژورنال JSON یا SQLite بر اساس LICENSE_MANAGER_BACKEND یا وجود customers.db؛
+        # مشتریان به صورت CustomerRecord فشرده در حافظه نگه داشته می‌شوند
+        self.store = create_store(self.data_dir, compact_records=True)
+        self.store.on_error = self.on_store_error
+        self.store.on_written = lambda: Clock.schedule_once(self.on_store_written)
+        # تغییرات ایستگاه‌های دیگری که همین پوشه را باز کرده‌اند
+        self.store.on_change = lambda: Clock.schedule_once(self.on_store_changed)
+        self.customers_file = self.store.snapshot_file
 
         self.customers = self.load_customers()
+        self.paged = hasattr(self.customers, "page")
+        self.sort_order = "created"
+        self.search_index = None
+        self.search_query = ""
+        self._search_trigger = Clock.create_trigger(self.apply_search, SEARCH_DELAY)
+        if not self.paged:
+            self.build_search_index()
         
         title_layout = BoxLayout(orientation='horizontal', size_hint_y=None, height=dp(35))
                 
@@ -422,13 +1106,15 @@ class MainScreen(BoxLayout):
                 title_layout.add_widget(logo)
                 logger.info("Logo loaded successfully")
         except Exception as e:
-            logger.error(f"Error loading logo: {e}")
+            logger.error("Error loading logo: %s", e)
 
         title_label = PersianLabel(
             text="سیستم مدیریت لایسنس انطباق 302", 
             font_size=dp(16),
             size_hint_x=1
         )
+        # سه بار لمس عنوان، پنجره‌ی پنهان عیب‌یابی را باز می‌کند
+        title_label.bind(on_touch_down=self.on_title_touch)
         title_layout.add_widget(title_label)
         self.add_widget(title_layout)
 
@@ -504,19 +1190,27 @@ class MainScreen(BoxLayout):
         
         generate_btn = PersianButton(
             text="تولید لایسنس", 
-            size_hint_x=0.5,
+            size_hint_x=0.34,
             background_color=(0, 0.4, 0, 1)
         )
         generate_btn.bind(on_press=self.generate_license)
         
+        batch_btn = PersianButton(
+            text="تولید گروهی", 
+            size_hint_x=0.33,
+            background_color=(0, 0.3, 0.4, 1)
+        )
+        batch_btn.bind(on_press=self.show_batch_popup)
+        
         change_pass_btn = PersianButton(
             text="تغییر رمز", 
-            size_hint_x=0.5,
+            size_hint_x=0.33,
             background_color=(0.4, 0.2, 0.6, 1)
         )
         change_pass_btn.bind(on_press=self.show_change_password_popup)
         
         button_layout.add_widget(generate_btn)
+        button_layout.add_widget(batch_btn)
         button_layout.add_widget(change_pass_btn)
         form_layout.add_widget(button_layout)
 
@@ -530,107 +1224,130 @@ class MainScreen(BoxLayout):
         )
         self.add_widget(list_title)
 
-        self.scroll_layout = GridLayout(cols=1, spacing=dp(4), size_hint_y=None)
-        self.scroll_layout.bind(minimum_height=self.scroll_layout.setter("height"))
-        
-        scroll = ScrollView(size_hint=(1, 1))
-        scroll.add_widget(self.scroll_layout)
-        self.add_widget(scroll)
+        self.stats_panel = StatsPanel(self.store)
+        if hasattr(self.customers, "add_observer"):
+            self.customers.add_observer(self.stats_panel)
+        self.add_widget(self.stats_panel)
+
+        # TextInput ساده تا عبارت جستجو متن منطقی بماند؛ متن شکل‌دهی‌شده‌ی PersianTextInput ترتیب نمایشی دارد
+        self.search_input = TextInput(
+            hint_text=reshape_bidi("جستجو (نام، تلفن، شناسه یا رمز)"),
+            font_name="PersianFont",
+            font_size=dp(12),
+            halign="right",
+            multiline=False,
+            write_tab=False,
+            size_hint_y=None,
+            height=dp(28),
+            padding=[dp(6), dp(4)],
+            foreground_color=(0.1, 0.1, 0.1, 1),
+            background_color=(0.9, 0.9, 0.9, 1)
+        )
+        self.search_input.bind(text=self.on_search_text)
+        self.sort_btn = PersianButton(
+            text=SORT_LABELS[self.sort_order],
+            font_size=dp(11),
+            size_hint_x=0.3,
+            background_color=(0.2, 0.4, 0.6, 1)
+        )
+        self.sort_btn.bind(on_press=self.toggle_sort_order)
+        search_layout = BoxLayout(orientation="horizontal", spacing=dp(6), size_hint_y=None, height=dp(28))
+        search_layout.add_widget(self.search_input)
+        search_layout.add_widget(self.sort_btn)
+        self.add_widget(search_layout)
+
+        self.customer_list = CustomerList(self.confirm_remove_customer, size_hint=(1, 1))
+        self.add_widget(self.customer_list)
 
         manage_buttons = BoxLayout(orientation="horizontal", spacing=dp(8), size_hint_y=None, height=dp(35))
         
         export_btn = PersianButton(
-            text="خروجی متنی",
+            text="خروجی",
             background_color=(0.4, 0.2, 0.6, 1)
         )
         export_btn.bind(on_press=self.export_customers)
         
+        import_btn = PersianButton(
+            text="ورود فایل",
+            background_color=(0, 0.3, 0.4, 1)
+        )
+        import_btn.bind(on_press=self.show_import_popup)
+
         exit_btn = PersianButton(
             text="خروج از برنامه", 
             background_color=(0.6, 0, 0, 1)
         )
         exit_btn.bind(on_press=self.exit_app)
         
+        manage_buttons.add_widget(import_btn)
         manage_buttons.add_widget(export_btn)
         manage_buttons.add_widget(exit_btn)
         self.add_widget(manage_buttons)
 
         self.refresh_customers_list()
 
+    @metrics.timed("load")
     def load_customers(self):
         """بارگذاری اطلاعات مشتریان"""
         logger.info("Loading customers data")
-        if os.path.exists(self.customers_file):
-            try:
-                with open(self.customers_file, 'r', encoding='utf-8') as f:
-                    customers = json.load(f)
-                logger.info(f"Loaded {len(customers)} customers")
-                return customers
-            except Exception as e:
-                logger.error(f"Error loading customers: {e}")
-                return []
-        logger.info("No customers file found, starting with empty list")
-        return []
+        try:
+            # ذخیره‌سازی که open() دارد (SQLite) بدون بارگذاری مشتریان در حافظه باز و لیست صفحه‌ای نمایش داده می‌شود
+            return getattr(self.store, "open", self.store.load)()
+        except Exception as e:
+            logger.error("Error loading customers: %s", e)
+            return CustomerCollection()
 
+    @metrics.timed("save")
     def save_customers(self):
-        """ذخیره اطلاعات مشتریان"""
+        """درخواست ادغام ژورنال در فایل اصلی مشتریان؛ در پس‌زمینه انجام می‌شود"""
         logger.info("Saving customers data")
+        self.store.compact()
+        return True
+
+    def on_store_error(self, error):
+        """گزارش خطای نوشتن از رشته‌ی ذخیره‌ساز به رابط کاربری"""
+        Clock.schedule_once(lambda dt: self.show_popup("خطا", f"خطا در ذخیره اطلاعات: {error}"))
+
+    def on_store_written(self, dt=None):
+        """نمایش تغییرات ثبت‌شده در لیست صفحه‌ای؛ لیست حافظه با رویدادهای مجموعه به‌روز می‌ماند"""
+        if self.paged:
+            self.refresh_customers_list()
+
+    def on_store_changed(self, dt=None):
+        """اعمال تغییرات ایستگاه‌های دیگر؛ لیست و نمایه‌ی جستجو از طریق ناظرهای مجموعه به‌روز می‌شوند"""
+        applied = self.store.apply_changes()
+        if not applied:
+            return
+        logger.info("Merged %s changes from other stations", len(applied))
+        metrics.inc("remote_changes", len(applied))
+        if self.customer_list.mirroring is None:
+            self.refresh_customers_list()
+
+    def add_customer(self, customer):
+        """افزودن مشتری و ثبت آن در ژورنال"""
         try:
-            with open(self.customers_file, 'w', encoding='utf-8') as f:
-                json.dump(self.customers, f, ensure_ascii=False, indent=2)
-            logger.info(f"Successfully saved {len(self.customers)} customers")
+            self.store.add(customer)
             return True
         except Exception as e:
-            logger.error(f"Error saving customers: {e}")
+            logger.error("Error saving customer: %s", e)
             self.show_popup("خطا", f"خطا در ذخیره اطلاعات: {e}")
             return False
 
     def generate_access_code(self, hardware_id):
         """تولید کد دسترسی بر اساس شناسه سخت‌افزاری"""
-        logger.debug(f"Generating access code for hardware ID: {hardware_id}")
-        try:
-            salt = "SIEVE_ANALYSIS_APP_SECURE_SALT_2024"
-            combined = hardware_id + salt
-            
-            hash1 = hashlib.sha512(combined.encode()).hexdigest()
-            hash2 = hashlib.md5(hash1.encode()).hexdigest()
-            hash3 = hashlib.sha256((hash2 + hardware_id).encode()).hexdigest()
-            
-            access_code = ""
-            for i in range(0, len(hash3), 4):
-                if len(access_code) >= 12:
-                    break
-                segment = hash3[i:i+4]
-                access_code += segment.upper() + "-"
-            
-            access_code = access_code.rstrip("-")
-            
-            if len(access_code) < 8:
-                alternative_code = hashlib.sha384((hardware_id + "BACKUP_SALT").encode()).hexdigest()[:12].upper()
-                access_code = '-'.join([alternative_code[i:i+4] for i in range(0, len(alternative_code), 4)])
-            
-            logger.debug(f"Generated access code: {access_code}")
-            return access_code[:15]
-        except Exception as e:
-            logger.error(f"Error generating access code: {e}")
-            raise
+        return generate_access_code(hardware_id)
 
     def validate_hardware_id(self, hardware_id):
         """اعتبارسنجی شناسه سخت‌افزاری"""
-        logger.debug(f"Validating hardware ID: {hardware_id}")
-        if not hardware_id or len(hardware_id) != 16:
-            logger.warning(f"Invalid hardware ID length: {hardware_id}")
-            return False
-        valid = all(c in "0123456789ABCDEF" for c in hardware_id.upper())
-        if not valid:
-            logger.warning(f"Invalid hardware ID characters: {hardware_id}")
-        return valid
+        return validate_hardware_id(hardware_id)
 
+    @metrics.timed("generate")
     def generate_license(self, instance):
         logger.info("License generation initiated")
-        buyer = self.buyer_name.text.strip()
-        phone = self.phone.text.strip()
-        hardware_id = self.hardware_id.text.strip().upper()
+        # raw_text متن منطقی است؛ text کادرهای فارسی شکل‌دهی‌شده و به ترتیب دیداری است
+        buyer = self.buyer_name.raw_text.strip()
+        phone = self.phone.raw_text.strip()
+        hardware_id = self.hardware_id.raw_text.strip().upper()
 
         if not (buyer and phone and hardware_id):
             logger.warning("License generation failed: empty fields")
@@ -638,36 +1355,207 @@ class MainScreen(BoxLayout):
             return
 
         if not self.validate_hardware_id(hardware_id):
-            logger.warning(f"License generation failed: invalid hardware ID {hardware_id}")
+            logger.warning("License generation failed: invalid hardware ID %s", hardware_id)
             self.show_popup("خطا", "شناسه سخت‌افزاری نامعتبر است (باید 16 کاراکتر و فقط شامل اعداد و حروف A-F باشد)")
             return
 
+        existing = self.customers.get(hardware_id)
+        if existing is not None:
+            logger.warning("License generation skipped: hardware ID %s already licensed", hardware_id)
+            self.show_popup("تکراری", f"برای این شناسه قبلاً لایسنس صادر شده است\nمشتری: {existing['name']}\nرمز: {existing['access_code']}")
+            return
+
         try:
-            access_code = self.generate_access_code(hardware_id)
-            
-            jalali_date = jdatetime.datetime.now().strftime("%Y/%m/%d %H:%M:%S")
-            
-            customer = {
-                "name": buyer,
-                "phone": phone,
-                "hardware_id": hardware_id,
-                "access_code": access_code,
-                "created_date": jalali_date
-            }
+            customer = make_customer(buyer, phone, hardware_id)
+            access_code = customer["access_code"]
             
-            self.customers.append(customer)
-            
-            if self.save_customers():
-                logger.info(f"License generated successfully for {buyer}, hardware ID: {hardware_id}")
+            if self.add_customer(customer):
+                logger.info("License generated successfully for %s, hardware ID: %s", buyer, hardware_id)
+                metrics.inc("licenses_generated")
                 self.show_popup("موفق", f"مشتری با موفقیت اضافه شد\nرمز تولید شده: {access_code}")
                 self.refresh_customers_list()
                 self.clear_fields()
             else:
                 logger.error("Failed to save customer data")
         except Exception as e:
-            logger.error(f"Error generating license: {e}")
+            logger.error("Error generating license: %s", e)
             self.show_popup("خطا", f"خطا در تولید لایسنس: {e}")
 
+    def show_batch_popup(self, instance):
+        """نمایش پاپ‌آپ تولید گروهی لایسنس از فایل CSV/JSONL"""
+        logger.info("Showing batch generation popup")
+        try:
+            content = BoxLayout(orientation="vertical", spacing=dp(8), padding=dp(12))
+            content.add_widget(PersianLabel(
+                text="مسیر فایل CSV یا JSONL (ستون‌ها: name, phone, hardware_id):",
+                size_hint_y=None,
+                height=dp(35),
+                color=(1, 1, 1, 1)
+            ))
+            path_input = PersianTextInput(size_hint_y=None, height=dp(30))
+            content.add_widget(path_input)
+
+            buttons_layout = BoxLayout(orientation="horizontal", spacing=dp(8), size_hint_y=None, height=dp(35))
+            cancel_btn = PersianButton(text="انصراف", size_hint_x=0.5, background_color=(0.85, 0.85, 0.85, 0.9))
+            start_btn = PersianButton(text="شروع", size_hint_x=0.5, background_color=(0, 0.4, 0, 1))
+            buttons_layout.add_widget(cancel_btn)
+            buttons_layout.add_widget(start_btn)
+            content.add_widget(buttons_layout)
+
+            popup = Popup(
+                title=reshape_bidi("تولید گروهی لایسنس"),
+                content=content,
+                size_hint=(0.8, 0.4),
+                title_align='center'
+            )
+
+            def start_batch(btn):
+                path = path_input.raw_text.strip()
+                if not os.path.isfile(path):
+                    self.show_popup("خطا", "فایل ورودی پیدا نشد")
+                    return
+                popup.dismiss()
+                self.run_batch(path)
+
+            start_btn.bind(on_press=start_batch)
+            cancel_btn.bind(on_press=popup.dismiss)
+            popup.open()
+        except Exception as e:
+            logger.error("Error showing batch popup: %s", e)
+
+    def run_batch(self, path):
+        """اجرای تولید گروهی در پس‌زمینه و ثبت یکجای نتیجه در رشته‌ی رابط کاربری"""
+        logger.info("Batch generation started: %s", path)
+        created_at = int(time.time())
+
+        def worker():
+            try:
+                report = generate_batch(path, existing=self.customers, created_at=created_at)
+            except Exception as e:
+                logger.error("Error in batch generation: %s", e)
+                error = e
+                Clock.schedule_once(lambda dt: self.show_popup("خطا", f"خطا در تولید گروهی: {error}"))
+                return
+            Clock.schedule_once(lambda dt: self.commit_batch(report))
+
+        threading.Thread(target=worker, name="batch-generate", daemon=True).start()
+
+    def commit_batch(self, report):
+        """ثبت نتیجه‌ی تولید گروهی با یک نوشتن در ذخیره‌ساز"""
+        customers = [c for c in report.customers if c["hardware_id"] not in self.customers]
+        try:
+            self.store.add_many(customers)
+        except Exception as e:
+            logger.error("Error saving batch: %s", e)
+            self.show_popup("خطا", f"خطا در ذخیره اطلاعات: {e}")
+            return
+        self.refresh_customers_list()
+        message = (f"ردیف‌ها: {report.rows}\nثبت‌شده: {len(customers)}\n"
+                   f"خطا: {len(report.errors) + len(report.customers) - len(customers)}\n"
+                   f"سرعت: {report.rows_per_second:.0f} ردیف در ثانیه")
+        for line_no, hardware_id, error in report.errors[:5]:
+            message += f"\nخط {line_no}: {hardware_id} - {error}"
+        self.show_popup("نتیجه تولید گروهی", message)
+
+    def show_import_popup(self, instance):
+        """نمایش پاپ‌آپ ورود و ادغام فایل مشتریان دفترهای دیگر"""
+        logger.info("Showing import popup")
+        try:
+            content = BoxLayout(orientation="vertical", spacing=dp(8), padding=dp(12))
+            content.add_widget(PersianLabel(
+                text="مسیر فایل customers.json، JSONL یا CSV:",
+                size_hint_y=None,
+                height=dp(30),
+                color=(1, 1, 1, 1)
+            ))
+            path_input = PersianTextInput(size_hint_y=None, height=dp(30))
+            content.add_widget(path_input)
+            content.add_widget(PersianLabel(
+                text="برای شناسه‌ی تکراری:",
+                size_hint_y=None,
+                height=dp(25),
+                color=(1, 1, 1, 1)
+            ))
+            policies_layout = BoxLayout(orientation="horizontal", spacing=dp(8), size_hint_y=None, height=dp(35))
+            content.add_widget(policies_layout)
+            cancel_btn = PersianButton(text="انصراف", size_hint=(1, None), height=dp(30),
+                                       background_color=(0.85, 0.85, 0.85, 0.9))
+            content.add_widget(cancel_btn)
+
+            popup = Popup(
+                title=reshape_bidi("ورود و ادغام فایل مشتریان"),
+                content=content,
+                size_hint=(0.8, 0.5),
+                title_align='center'
+            )
+
+            def choose(policy):
+                def on_press(btn):
+                    path = path_input.raw_text.strip()
+                    if not os.path.isfile(path):
+                        self.show_popup("خطا", "فایل ورودی پیدا نشد")
+                        return
+                    popup.dismiss()
+                    self.run_import(path, policy)
+                return on_press
+
+            for policy, label in (("keep", "نگه داشتن موجود"), ("overwrite", "جایگزینی"), ("newest", "جدیدترین")):
+                btn = PersianButton(text=label, background_color=(0, 0.3, 0.4, 1))
+                btn.bind(on_press=choose(policy))
+                policies_layout.add_widget(btn)
+            cancel_btn.bind(on_press=popup.dismiss)
+            popup.open()
+        except Exception as e:
+            logger.error("Error showing import popup: %s", e)
+
+    def run_import(self, path, policy):
+        """ورود فایل در پس‌زمینه؛ هر گروه پذیرفته‌شده در رشته‌ی رابط کاربری با یک add_many ثبت می‌شود"""
+        logger.info("Import started: %s (%s)", path, policy)
+        # مجموعه و اتصال SQLite فقط در رشته‌ی رابط کاربری خوانده می‌شوند؛ سمت ساخت join همین‌جا ساخته می‌شود
+        index = join_index(self.customers)
+        if self.customer_list.mirroring is not None:
+            # تا پایان ورود لیست ثابت می‌ماند و گروه‌های ورود ردیف‌های لیست را یکی‌یکی تغییر نمی‌دهند
+            self.customer_list.set_customers([row["customer"] for row in self.customer_list.data])
+
+        def commit(customers):
+            Clock.schedule_once(lambda dt: self.commit_import_batch(customers))
+
+        def worker():
+            try:
+                with metrics.timer("import"):
+                    report = import_customers(path, index, commit, policy=policy)
+            except Exception as e:
+                logger.error("Error importing customers: %s", e)
+                error = e
+                Clock.schedule_once(lambda dt: self.finish_import(None, error))
+                return
+            # پس از همه‌ی گروه‌های زمان‌بندی‌شده اجرا می‌شود
+            Clock.schedule_once(lambda dt: self.finish_import(report))
+
+        threading.Thread(target=worker, name="import", daemon=True).start()
+
+    def commit_import_batch(self, customers):
+        """ثبت یک گروه از ورود فایل با یک نوشتن در ذخیره‌ساز"""
+        try:
+            self.store.add_many(customers)
+        except Exception as e:
+            logger.error("Error saving imported customers: %s", e)
+            self.show_popup("خطا", f"خطا در ذخیره اطلاعات: {e}")
+
+    def finish_import(self, report, error=None):
+        """نمایش خلاصه‌ی ورود و بازگرداندن لیست به حالت عادی"""
+        self.refresh_customers_list()
+        if report is None:
+            self.show_popup("خطا", f"خطا در ورود فایل: {error}")
+            return
+        metrics.inc("imported_customers", report.committed)
+        message = (f"ردیف‌ها: {report.rows}\nافزوده: {report.added}\nجایگزین: {report.replaced}\n"
+                   f"بدون تغییر: {report.unchanged}\nنگه‌داشته: {report.kept}\nخطا: {len(report.errors)}\n"
+                   f"سرعت: {report.rows_per_second:.0f} ردیف در ثانیه")
+        for line_no, hardware_id, error in report.errors[:5]:
+            message += f"\nخط {line_no}: {hardware_id} - {error}"
+        self.show_popup("نتیجه ورود فایل", message)
+
     def clear_fields(self):
         """پاک کردن فیلدهای ورودی"""
         try:
@@ -676,241 +1564,340 @@ class MainScreen(BoxLayout):
             self.hardware_id.text = ""
             logger.debug("Input fields cleared")
         except Exception as e:
-            logger.error(f"Error clearing fields: {e}")
+            logger.error("Error clearing fields: %s", e)
 
+    @metrics.timed("refresh")
     def refresh_customers_list(self):
         """به‌روزرسانی لیست مشتریان"""
         logger.debug("Refreshing customers list")
         try:
-            self.scroll_layout.clear_widgets()
-            self.scroll_layout.height = 0
-            
-            for customer in self.customers:
-                item = CustomerItem(customer, self.confirm_remove_customer)  # تغییر این خط
-                self.scroll_layout.add_widget(item)
-                self.scroll_layout.height += item.height
+            if self.paged:
+                # نوشتن‌ها در رشته‌ی کارگر انجام می‌شوند و تغییرات در صف با on_store_written نمایش داده می‌شوند؛
+                # جدول آمار در همان تراکنش نوشتن به‌روز می‌شود
+                self.stats_panel.schedule_refresh()
+                if self.search_query:
+                    self.customer_list.set_customers(self.customers.search(self.search_query, limit=SEARCH_LIMIT))
+                else:
+                    self.customer_list.show_pages(self.customers, self.sort_order)
+            elif self.search_query:
+                if self.search_index is None:
+                    # نمایه هنوز در پس‌زمینه ساخته می‌شود و پس از آماده شدن جستجو را اجرا می‌کند
+                    return
+                self.customer_list.set_customers(self.sorted(self.search_index.search(self.search_query)))
+            elif self.sort_order == "name":
+                self.customer_list.set_customers(self.sorted(self.customers))
+            else:
+                # پس از اولین بار، لیست با رویدادهای مجموعه به‌روز می‌ماند و دوباره ساخته نمی‌شود
+                self.customer_list.mirror(self.customers)
             logger.debug("Customers list refreshed successfully")
         except Exception as e:
-            logger.error(f"Error refreshing customers list: {e}")
+            logger.error("Error refreshing customers list: %s", e)
+
+    def build_search_index(self):
+        """ساخت نمایه‌ی جستجو در رشته‌ی پس‌زمینه هنگام بارگذاری؛ پس از آن با هر تغییر به‌روز می‌شود
+
+        تغییرات مجموعه در مدت ساخت ضبط و پیش از ثبت نمایه به عنوان ناظر، به ترتیب روی آن اعمال می‌شوند.
+        """
+        recorder = ChangeRecorder()
+        self.customers.add_observer(recorder)
+
+        def ready(index):
+            self.customers.remove_observer(recorder)
+            recorder.replay(index)
+            self.customers.add_observer(index)
+            self.search_index = index
+            logger.info("Search index ready with %s customers", len(index))
+            if self.search_query:
+                self.refresh_customers_list()
+
+        def failed():
+            self.customers.remove_observer(recorder)
+
+        def worker():
+            try:
+                with metrics.timer("search_index"):
+                    index = SearchIndex(self.store.snapshot())
+            except Exception as e:
+                logger.error("Error building search index: %s", e)
+                Clock.schedule_once(lambda dt: failed())
+            else:
+                Clock.schedule_once(lambda dt: ready(index))
+
+        logger.info("Building search index")
+        threading.Thread(target=worker, name="search-index", daemon=True).start()
+
+    def sorted(self, customers):
+        if self.sort_order == "name":
+            return sorted(customers, key=lambda customer: customer["name"])
+        return customers
+
+    def toggle_sort_order(self, instance):
+        """جابجایی ترتیب لیست بین تاریخ ایجاد و نام"""
+        self.sort_order = "name" if self.sort_order == "created" else "created"
+        self.sort_btn.text = SORT_LABELS[self.sort_order]
+        self.refresh_customers_list()
+
+    def on_search_text(self, instance, value):
+        """فیلتر زنده‌ی لیست مشتریان هنگام تایپ؛ جستجو SEARCH_DELAY پس از آخرین تغییر اجرا می‌شود"""
+        # تریگر در انتظار با فراخوانی دوباره عقب نمی‌افتد؛ لغو و زمان‌بندی دوباره آن را از آخرین کلید می‌شمارد
+        self._search_trigger.cancel()
+        self._search_trigger()
+
+    def apply_search(self, dt=None):
+        """اجرای جستجو با متن فعلی کادر؛ عبارت با normalize_text یکسان‌سازی می‌شود"""
+        query = normalize_text(self.search_input.text).strip()
+        if query == self.search_query:
+            return
+        self.search_query = query
+        self.refresh_customers_list()
 
     def confirm_remove_customer(self, customer):
         """نمایش پاپ‌آپ تایید برای حذف مشتری"""
-        logger.info(f"Showing confirmation popup for customer removal: {customer['name']}")
+        logger.info("Showing confirmation popup for customer removal: %s", customer['name'])
+
+        def remove_customer_confirmed():
+            logger.info("Customer removal confirmed for: %s", customer['name'])
+            self.remove_customer(customer)
+
         try:
-            content = BoxLayout(orientation="vertical", spacing=dp(10), padding=dp(15))
-            
-            message_label = PersianLabel(
-                text=f"آیا از حذف مشتری '{customer['name']}' مطمئن هستید؟",
-                font_size=dp(14),
-                size_hint_y=None,
-                height=dp(50)
-            )
-            content.add_widget(message_label)
-            
-            buttons_layout = BoxLayout(orientation="horizontal", spacing=dp(10), size_hint_y=None, height=dp(40))
-            
-            cancel_btn = PersianButton(
-                text="انصراف",
-                background_color=(0.6, 0.6, 0.6, 1)
-            )
-            
-            confirm_btn = PersianButton(
-                text="حذف",
-                background_color=(0.8, 0.2, 0.2, 1)
-            )
-            
-            buttons_layout.add_widget(cancel_btn)
-            buttons_layout.add_widget(confirm_btn)
-            content.add_widget(buttons_layout)
-            
-            popup = Popup(
-                title=reshape_bidi("تایید حذف"),
-                content=content,
-                size_hint=(0.7, 0.4),
-                title_align='center'
-            )
-            
-            def remove_customer_confirmed(instance):
-                logger.info(f"Customer removal confirmed for: {customer['name']}")
-                popup.dismiss()
-                self.remove_customer(customer)
-            
-            def cancel_removal(instance):
-                logger.debug("Customer removal cancelled")
-                popup.dismiss()
-            
-            confirm_btn.bind(on_press=remove_customer_confirmed)
-            cancel_btn.bind(on_press=cancel_removal)
-            
-            popup.open()
+            dialogs.confirm("تایید حذف", f"آیا از حذف مشتری '{customer['name']}' مطمئن هستید؟",
+                            remove_customer_confirmed, confirm_text="حذف")
         except Exception as e:
-            logger.error(f"Error showing confirmation popup: {e}")
+            logger.error("Error showing confirmation popup: %s", e)
 
+    @metrics.timed("remove")
     def remove_customer(self, customer):
         """حذف مشتری از لیست"""
-        logger.info(f"Removing customer: {customer['name']}")
-        if customer in self.customers:
-            self.customers.remove(customer)
-            self.save_customers()
+        logger.info("Removing customer: %s", customer['name'])
+        try:
+            removed = self.store.remove(customer['hardware_id'])
+        except Exception as e:
+            logger.error("Error removing customer: %s", e)
+            self.show_popup("خطا", f"خطا در ذخیره اطلاعات: {e}")
+            return
+        if removed is not None:
+            metrics.inc("customers_removed")
             self.refresh_customers_list()
-            logger.info(f"Customer {customer['name']} removed successfully")
+            logger.info("Customer %s removed successfully", customer['name'])
             self.show_popup("موفق", f"مشتری '{customer['name']}' با موفقیت حذف شد")
 
     def export_customers(self, instance):
-        """صدور لیست مشتریان به فایل متنی"""
-        logger.info("Exporting customers to text file")
-        try:
-            filename = f"customers_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-            filepath = os.path.join(self.data_dir, filename)
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write("=" * 60 + "\n")
-                f.write("     لیست مشتریان انطباق302\n")
-                f.write("=" * 60 + "\n\n")
-                
-                for i, customer in enumerate(self.customers, 1):
-                    f.write(f"ردیف: {i}\n")
-                    f.write(f"نام: {customer['name']}\n")
-                    f.write(f"تلفن: {customer['phone']}\n")
-                    f.write(f"شناسه: {customer['hardware_id']}\n")
-                    f.write(f"رمز: {customer['access_code']}\n")
-                    f.write(f"تاریخ ایجاد: {customer['created_date']}\n")
-                    f.write("-" * 40 + "\n")
-            
-            logger.info(f"Customers exported successfully to {filepath}")
-            self.show_popup("موفق", f"لیست مشتریان با موفقیت در فایل ذخیره شد:\n{filepath}")
-        except Exception as e:
-            logger.error(f"Error exporting customers: {e}")
-            self.show_popup("خطا", f"خطا در ذخیره فایل: {e}")
-
-    def show_change_password_popup(self, instance):
-        """نمایش پاپ‌آپ برای تغییر رمز عبور"""
-        logger.info("Showing change password popup")
+        """انتخاب قالب خروجی لیست مشتریان"""
+        logger.info("Showing export format popup")
         try:
             content = BoxLayout(orientation="vertical", spacing=dp(8), padding=dp(12))
-            
-            content.add_widget(PersianLabel(
-                text="رمز عبور فعلی:", 
-                size_hint_y=None, 
-                height=dp(25),
-                color=(1, 1, 1, 1)
-            ))
-            current_password = PersianTextInput(password=True, size_hint_y=None, height=dp(30))
-            content.add_widget(current_password)
-            
-            content.add_widget(PersianLabel(
-                text="رمز عبور جدید:", 
-                size_hint_y=None, 
-                height=dp(25),
-                color=(1, 1, 1, 1)
-            ))
-            new_password = PersianTextInput(password=True, size_hint_y=None, height=dp(30))
-            content.add_widget(new_password)
-            
-            content.add_widget(PersianLabel(
-                text="تکرار رمز عبور جدید:", 
-                size_hint_y=None, 
-                height=dp(25),
-                color=(1, 1, 1, 1)
-            ))
-            confirm_password = PersianTextInput(password=True, size_hint_y=None, height=dp(30))
-            content.add_widget(confirm_password)
-            
-            buttons_layout = BoxLayout(orientation="horizontal", spacing=dp(8), size_hint_y=None, height=dp(35))
-            
-            cancel_btn = PersianButton(text="انصراف", size_hint_x=0.5, background_color=(0.85, 0.85, 0.85, 0.9))
-            change_btn = PersianButton(text="تغییر رمز", size_hint_x=0.5, background_color=(0.85, 0.85, 0.85, 0.9))
-            
-            buttons_layout.add_widget(cancel_btn)
-            buttons_layout.add_widget(change_btn)
-            content.add_widget(buttons_layout)
-            
+            formats_layout = BoxLayout(orientation="horizontal", spacing=dp(8), size_hint_y=None, height=dp(35))
+            content.add_widget(formats_layout)
+            cancel_btn = PersianButton(text="انصراف", size_hint=(1, None), height=dp(30),
+                                       background_color=(0.85, 0.85, 0.85, 0.9))
+            content.add_widget(cancel_btn)
+
             popup = Popup(
-                title=reshape_bidi("تغییر رمز عبور"), 
-                content=content, 
-                size_hint=(0.8, 0.5),
+                title=reshape_bidi("قالب خروجی"),
+                content=content,
+                size_hint=(0.8, 0.3),
                 title_align='center'
             )
-            
-            def change_password(btn):
-                logger.info("Password change initiated")
-                if not current_password.text:
-                    logger.warning("Password change failed: empty current password")
-                    self.show_popup("خطا", "رمز عبور فعلی را وارد کنید")
-                    return
-                    
-                if not new_password.text:
-                    logger.warning("Password change failed: empty new password")
-                    self.show_popup("خطا", "رمز عبور جدید را وارد کنید")
-                    return
-                    
-                if new_password.text != confirm_password.text:
-                    logger.warning("Password change failed: passwords don't match")
-                    self.show_popup("خطا", "رمزهای عبور جدید مطابقت ندارند")
-                    return
-                    
-                password_file = "admin_pass.hash"
-                try:
-                    with open(password_file, "r") as f:
-                        stored_hash = f.read().strip()
-                    
-                    if self.hash_password(current_password.text) != stored_hash:
-                        logger.warning("Password change failed: incorrect current password")
-                        self.show_popup("خطا", "رمز عبور فعلی نادرست است")
-                        return
-                        
-                    with open(password_file, "w") as f:
-                        f.write(self.hash_password(new_password.text))
-                        
-                    logger.info("Password changed successfully")
-                    self.show_popup("موفق", "رمز عبور با موفقیت تغییر یافت")
+
+            def choose(fmt):
+                def on_press(btn):
                     popup.dismiss()
-                    
-                except Exception as e:
-                    logger.error(f"Error changing password: {e}")
-                    self.show_popup("خطا", f"خطا در تغییر رمز عبور: {e}")
-            
-            def cancel_change(btn):
-                logger.debug("Password change cancelled")
-                popup.dismiss()
-            
-            change_btn.bind(on_press=change_password)
-            cancel_btn.bind(on_press=cancel_change)
-            
+                    self.start_export(fmt)
+                return on_press
+
+            for fmt, label in (("txt", "متنی"), ("csv", "CSV"), ("jsonl", "JSONL"), ("xlsx", "اکسل"), ("bundle", "آفلاین")):
+                btn = PersianButton(text=label, background_color=(0.4, 0.2, 0.6, 1))
+                btn.bind(on_press=choose(fmt))
+                formats_layout.add_widget(btn)
+            cancel_btn.bind(on_press=popup.dismiss)
             popup.open()
         except Exception as e:
-            logger.error(f"Error showing change password popup: {e}")
+            logger.error("Error showing export popup: %s", e)
+
+    def start_export(self, fmt):
+        """صدور خروجی در رشته‌ی پس‌زمینه با نوار پیشرفت و امکان لغو"""
+        logger.info("Exporting customers as %s", fmt)
+        # شمارش و پیمایش مشتریان در رشته‌ی صدور انجام می‌شود؛ شمار اینجا فقط برای نوار پیشرفت است
+        total = len(self.customers)
+        filepath = default_export_path(self.data_dir, EXPORTERS[fmt].extension)
+        cancel_event = threading.Event()
+
+        content = BoxLayout(orientation="vertical", spacing=dp(8), padding=dp(12))
+        status_label = PersianLabel(text=f"0 / {total}", size_hint_y=None, height=dp(25), color=(1, 1, 1, 1))
+        progress_bar = ProgressBar(max=max(total, 1), size_hint_y=None, height=dp(20))
+        cancel_btn = PersianButton(text="لغو", size_hint=(1, None), height=dp(30), background_color=(0.8, 0.2, 0.2, 1))
+        content.add_widget(status_label)
+        content.add_widget(progress_bar)
+        content.add_widget(cancel_btn)
+        popup = Popup(
+            title=reshape_bidi("در حال صدور خروجی"),
+            content=content,
+            size_hint=(0.8, 0.3),
+            title_align='center',
+            auto_dismiss=False
+        )
+        cancel_btn.bind(on_press=lambda btn: cancel_event.set())
+        popup.open()
+
+        def update_progress(count):
+            progress_bar.value = count
+            progress_bar.max = max(progress_bar.max, count)
+            status_label.text = f"{count} / {max(total, count)}"
+
+        def finished(title, message):
+            popup.dismiss()
+            self.show_popup(title, message)
+
+        def worker():
+            try:
+                with metrics.timer("export"):
+                    export_customers(
+                        self.store.snapshot(), filepath, fmt,
+                        progress=lambda count: Clock.schedule_once(lambda dt: update_progress(count)),
+                        cancel_event=cancel_event
+                    )
+            except ExportCancelled:
+                logger.info("Export cancelled")
+                metrics.inc("exports_cancelled")
+                Clock.schedule_once(lambda dt: finished("لغو", "صدور خروجی لغو شد"))
+            except Exception as e:
+                logger.error("Error exporting customers: %s", e)
+                error = e
+                Clock.schedule_once(lambda dt: finished("خطا", f"خطا در ذخیره فایل: {error}"))
+            else:
+                logger.info("Customers exported successfully to %s", filepath)
+                metrics.inc("exports")
+                Clock.schedule_once(lambda dt: finished("موفق", f"لیست مشتریان با موفقیت در فایل ذخیره شد:\n{filepath}"))
+
+        threading.Thread(target=worker, name="export", daemon=True).start()
+
+    def show_change_password_popup(self, instance):
+        """نمایش پاپ‌آپ برای تغییر رمز عبور"""
+        logger.info("Showing change password popup")
+        try:
+            dialogs.change_password(self.change_password)
+        except Exception as e:
+            logger.error("Error showing change password popup: %s", e)
+
+    def change_password(self, current_password, new_password, confirm_password):
+        """بررسی و ذخیره‌ی رمز جدید؛ True اگر رمز تغییر کرده و پنجره باید بسته شود"""
+        logger.info("Password change initiated")
+        if not current_password:
+            logger.warning("Password change failed: empty current password")
+            self.show_popup("خطا", "رمز عبور فعلی را وارد کنید")
+            return False
+
+        if not new_password:
+            logger.warning("Password change failed: empty new password")
+            self.show_popup("خطا", "رمز عبور جدید را وارد کنید")
+            return False
+
+        if new_password != confirm_password:
+            logger.warning("Password change failed: passwords don't match")
+            self.show_popup("خطا", "رمزهای عبور جدید مطابقت ندارند")
+            return False
+
+        password_file = "admin_pass.hash"
+        try:
+            with open(password_file, "r") as f:
+                stored_hash = f.read().strip()
+
+            if self.hash_password(current_password) != stored_hash:
+                logger.warning("Password change failed: incorrect current password")
+                self.show_popup("خطا", "رمز عبور فعلی نادرست است")
+                return False
+
+            with open(password_file, "w") as f:
+                f.write(self.hash_password(new_password))
+
+            logger.info("Password changed successfully")
+            self.show_popup("موفق", "رمز عبور با موفقیت تغییر یافت")
+            return True
+
+        except Exception as e:
+            logger.error("Error changing password: %s", e)
+            self.show_popup("خطا", f"خطا در تغییر رمز عبور: {e}")
+            return False
 
     def hash_password(self, password):
         return hashlib.sha256(password.encode()).hexdigest()
 
     def show_popup(self, title, message):
-        logger.debug(f"Showing popup: {title} - {message}")
         try:
+            dialogs.message(title, message, "بستن")
+        except Exception as e:
+            logger.error("Error showing popup: %s", e)
+
+    def on_title_touch(self, label, touch):
+        if touch.is_triple_tap and label.collide_point(*touch.pos):
+            self.show_diagnostics_popup()
+            return True
+        return False
+
+    def show_diagnostics_popup(self):
+        """نمایش متریک‌های زمان‌سنجی و شمارنده‌ها با امکان ذخیره در قالب Prometheus"""
+        logger.info("Showing diagnostics popup")
+        try:
+            snapshot = metrics.snapshot()
+            lines = [f"{'timer':<16}{'count':>7}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"]
+            for name, timer in sorted(snapshot["timers"].items()):
+                quantiles = timer["quantiles"]
+                lines.append(
+                    f"{name:<16}{timer['count']:>7}{timer['mean'] * 1000:>10.2f}"
+                    f"{quantiles.get(0.5, 0) * 1000:>10.2f}{quantiles.get(0.95, 0) * 1000:>10.2f}"
+                    f"{timer['max'] * 1000:>10.2f}"
+                )
+            lines.append("")
+            for name, value in sorted(snapshot["counters"].items()):
+                lines.append(f"{name:<32}{value:>10}")
+            lines.append(f"{'customers':<32}{len(self.customers):>10}")
+            for name, value in texture_cache.stats().items():
+                lines.append(f"{'text_textures_' + name:<32}{value:>10}")
+
             content = BoxLayout(orientation="vertical", spacing=dp(8), padding=dp(12))
-            content.add_widget(PersianLabel(text=message, font_size=dp(13), size_hint_y=None, height=dp(40)))
-            btn = PersianButton(text="بستن", size_hint=(1, None), height=dp(30))
+            report_label = Label(text="\n".join(lines), font_name="RobotoMono-Regular", font_size=dp(11),
+                                 halign="left", valign="top", color=(1, 1, 1, 1))
+            report_label.bind(size=lambda label, size: setattr(label, "text_size", size))
+            content.add_widget(report_label)
+            status_label = PersianLabel(text="", size_hint_y=None, height=dp(25), color=(1, 1, 1, 1))
+            content.add_widget(status_label)
+            buttons_layout = BoxLayout(orientation="horizontal", spacing=dp(8), size_hint_y=None, height=dp(35))
+            dump_btn = PersianButton(text="ذخیره متریک‌ها", background_color=(0, 0.4, 0, 1))
+            close_btn = PersianButton(text="بستن", background_color=(0.85, 0.85, 0.85, 0.9))
+            buttons_layout.add_widget(dump_btn)
+            buttons_layout.add_widget(close_btn)
+            content.add_widget(buttons_layout)
+
             popup = Popup(
-                title=reshape_bidi(title), 
-                content=content, 
-                size_hint=(0.7, 0.35),
+                title=reshape_bidi("عیب‌یابی"),
+                content=content,
+                size_hint=(0.9, 0.7),
                 title_align='center'
             )
-            btn.bind(on_press=popup.dismiss)
-            content.add_widget(btn)
+
+            def dump_metrics(btn):
+                try:
+                    status_label.text = metrics.dump(os.path.join(self.data_dir, "metrics.prom"))
+                except Exception as e:
+                    logger.error("Error writing metrics: %s", e)
+                    status_label.text = f"خطا: {e}"
+
+            dump_btn.bind(on_press=dump_metrics)
+            close_btn.bind(on_press=popup.dismiss)
             popup.open()
         except Exception as e:
-            logger.error(f"Error showing popup: {e}")
+            logger.error("Error showing diagnostics popup: %s", e)
 
     def exit_app(self, instance):
         """خروج از برنامه"""
         logger.info("Exiting application")
         try:
+            self.store.close()
             App.get_running_app().stop()
             Window.close()
             sys.exit(0)
         except Exception as e:
-            logger.error(f"Error exiting application: {e}")
+            logger.error("Error exiting application: %s", e)
             import os
             os._exit(0)
 
@@ -944,11 +1931,16 @@ class LicenseManagerApp(App):
             else:
                 logger.warning("No application icon file found")
         except Exception as e:
-            logger.error(f"Error setting application icon: {e}")
+            logger.error("Error setting application icon: %s", e)
         
+        reshape_cache.preload(UI_STRINGS)
         Window.clearcolor = (0.85, 0.85, 0.85, 0.9)
         self.main_layout = BoxLayout(orientation="vertical", padding=dp(12))
         self.show_login_screen()
+        # پاپ‌آپ‌ها پس از نخستین فریم ساخته می‌شوند تا نخستین پیام یا تایید حذف منتظر ساخت ویجت نماند
+        Clock.schedule_once(dialogs.prewarm)
+        if PREWARM_TEXT:
+            prewarm_text(UI_STRINGS)
         return self.main_layout
 
     def show_login_screen(self):
@@ -959,10 +1951,16 @@ class LicenseManagerApp(App):
     def show_main_screen(self):
         logger.debug("Showing main screen")
         self.main_layout.clear_widgets()
-        self.main_layout.add_widget(MainScreen())
+        self.main_screen = MainScreen()
+        self.main_layout.add_widget(self.main_screen)
+
+    def on_stop(self):
+        main_screen = getattr(self, "main_screen", None)
+        if main_screen is not None:
+            main_screen.store.close()
 
 if __name__ == "__main__":
     try:
         LicenseManagerApp().run()
     except Exception as e:
-        logger.critical(f"Critical application error: {e}", exc_info=True)
+        logger.critical("Critical application error: %s", e, exc_info=True)